@@ -0,0 +1,146 @@
+#!/usr/bin/python
+"""
+This module contains the asyncio counterparts of the functions in communications.py (used by the asyncio engine).
+
+The Reddit models are Async PRAW models, whose network calls are coroutines.
+Private Messages are sent concurrently through the outbound message queue (see message_queue.py),
+    paced by the shared rate limiter.
+"""
+from typing import Any, List, Optional, Tuple
+
+from hon_patch_notes_game_bot.communications import (
+    queue_staff_messages,
+    queue_winner_messages,
+)
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.line_classifier import LineClassificationTable
+from hon_patch_notes_game_bot.message_queue import OutboundMessageQueue
+from hon_patch_notes_game_bot.patch_notes_file_handler import PatchNotesFile
+from hon_patch_notes_game_bot.rate_limiter import RateLimiter
+from hon_patch_notes_game_bot.reward_codes import RewardCodeAllocator
+from hon_patch_notes_game_bot.utils import (
+    processed_submission_content,
+    processed_community_notes_thread_submission_content,
+    tprint,
+)
+from hon_patch_notes_game_bot.config.config import (
+    COMMUNITY_SUBMISSION_TITLE,
+    SUBMISSION_TITLE,
+)
+
+
+async def init_submissions_async(
+    reddit: Any,
+    subreddit: Any,
+    database: Database,
+    patch_notes_file: PatchNotesFile,
+    submission_content_path: str,
+    community_submission_content_path: str,
+    line_classifications: Optional[LineClassificationTable] = None,
+) -> Tuple[Any, Any]:
+    """
+    Same as communications.init_submissions(), with Async PRAW models.
+
+    Returns:
+        - A tuple containing the primary submission and community submission objects (both fetched)
+    """
+    # Main submission
+    if line_classifications is None:
+        line_classifications = LineClassificationTable(patch_notes_file)
+    submission_content = processed_submission_content(
+        submission_content_path, patch_notes_file, line_classifications
+    )
+    submission_url = database.get_submission_url(tag="main")
+
+    # Get main submission if it does not exist
+    if submission_url is None:
+        submission = await subreddit.submit(
+            title=SUBMISSION_TITLE, selftext=submission_content
+        )
+        await submission.load()
+        database.insert_submission_url("main", submission.url)
+        submission_url = submission.url
+    else:
+        # Obtain submission via URL
+        submission = await reddit.submission(url=submission_url)
+
+    # Community submission
+    community_submission_content = processed_community_notes_thread_submission_content(
+        community_submission_content_path, patch_notes_file, submission_url
+    )
+    community_submission_url = database.get_submission_url(tag="community")
+
+    # Get community submission if it does not exist
+    if community_submission_url is None:
+        community_submission = await subreddit.submit(
+            title=COMMUNITY_SUBMISSION_TITLE, selftext=community_submission_content,
+        )
+        await community_submission.load()
+        database.insert_submission_url("community", community_submission.url)
+
+        # Update main Reddit Thread's in-line URL to connect to the community submission URL
+        updated_text = submission.selftext.replace(
+            "#community-patch-notes-thread-url", community_submission.url
+        )
+        await submission.edit(body=updated_text)
+    else:
+        # Obtain submission via URL
+        community_submission = await reddit.submission(url=community_submission_url)
+
+    return submission, community_submission
+
+
+async def send_message_to_staff_async(
+    reddit: Any,
+    winners_list_path: str,
+    staff_recipients: List[str],
+    version_string: str,
+    gold_coin_reward: int,
+    rate_limiter: Optional[RateLimiter] = None,
+    database: Optional[Database] = None,
+):
+    """
+    Same as communications.send_message_to_staff(), with the messages sent concurrently on asyncio.
+
+    The messages go through the same persisted queue & idempotency keys as the sync engine,
+        so a staff member that was already messaged for this version is not messaged again after a restart.
+    """
+    message_queue = OutboundMessageQueue(reddit, database, rate_limiter)
+    queue_staff_messages(
+        message_queue,
+        winners_list_path,
+        staff_recipients,
+        version_string,
+        gold_coin_reward,
+    )
+
+    result = await message_queue.dispatch_async()
+    tprint(f"Staff messages dispatched: {result}")
+
+
+async def send_message_to_winners_async(
+    reddit: Any,
+    winners_list: List[str],
+    reward_code_allocator: RewardCodeAllocator,
+    version_string: str,
+    gold_coin_reward: int,
+    rate_limiter: Optional[RateLimiter] = None,
+    database: Optional[Database] = None,
+):
+    """
+    Same as communications.send_message_to_winners(), with the messages sent concurrently on asyncio.
+
+    The messages go through the same persisted queue & idempotency keys as the sync engine,
+        so winners that were already messaged are skipped after a restart.
+    """
+    message_queue = OutboundMessageQueue(reddit, database, rate_limiter)
+    queue_winner_messages(
+        message_queue,
+        winners_list,
+        reward_code_allocator,
+        version_string,
+        gold_coin_reward,
+    )
+
+    result = await message_queue.dispatch_async()
+    tprint(f"Winner messages dispatched: {result}")
@@ -0,0 +1,428 @@
+#!/usr/bin/python
+"""
+This module contains the asyncio engine of the bot, built on Async PRAW (an optional dependency).
+
+AsyncCore runs the exact same game rules as Core (it inherits them), while the network calls run as asyncio tasks:
+- Comments of a pass are fetched from the inbox in one go
+- The eligibility lookups (Redditor profiles) of a pass are fetched concurrently
+- Replies & community submission edits are sent as concurrent tasks
+- Private Messages are sent concurrently after the game ends
+
+Game state mutations stay serialized: the comments are processed one at a time, in order, by the loop task.
+The engine is selected with ENGINE = "async" in the config file.
+"""
+import asyncio
+from typing import Any, Awaitable, Dict, Hashable, List, Optional, Set, Type
+
+from hon_patch_notes_game_bot.async_communications import (
+    send_message_to_staff_async,
+    send_message_to_winners_async,
+)
+from hon_patch_notes_game_bot.community_document import CommunityDocument
+from hon_patch_notes_game_bot.core import Core
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.edit_coalescer import SubmissionEditCoalescer
+from hon_patch_notes_game_bot.guess_parser import find_first_line_number
+from hon_patch_notes_game_bot.line_classifier import LineClassificationTable
+from hon_patch_notes_game_bot.patch_notes_file_handler import PatchNotesFile
+from hon_patch_notes_game_bot.rate_limiter import (
+    RateLimiter,
+    RequestPriority,
+    parse_rate_limit_seconds,
+)
+from hon_patch_notes_game_bot.reply_dispatcher import ReplyDispatcher
+from hon_patch_notes_game_bot.reward_codes import RewardCodeAllocator
+from hon_patch_notes_game_bot.utils import (
+    tprint,
+    WINNERS_SUBMISSION_HEADER,
+)
+from hon_patch_notes_game_bot.config.config import (
+    DISALLOWED_USERS_SET,
+    GOLD_COIN_REWARD,
+    MARK_READ_BATCH_SIZE,
+    STAFF_RECIPIENTS_LIST,
+    WINNERS_LIST_FILE_PATH,
+)
+
+
+class TaskGroup:
+    """
+    Keeps track of the running tasks, so that they can be awaited before the state is persisted.
+    Tasks scheduled with the same key run one after another, in the order they were scheduled.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Set[asyncio.Task] = set()
+        self._last_task_by_key: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def schedule(self, key: Hashable, coroutine: Awaitable):
+        """
+        Runs a coroutine as a task (after the previous task with the same key).
+        Exceptions are logged.
+        """
+        previous_task = self._last_task_by_key.get(key)
+        task = asyncio.ensure_future(self._run(previous_task, coroutine))
+        self._last_task_by_key[key] = task
+        self._tasks.add(task)
+
+    async def _run(self, previous_task: Optional[asyncio.Task], coroutine: Awaitable):
+        if previous_task is not None:
+            await asyncio.wait([previous_task])
+
+        try:
+            await coroutine
+        except Exception as error:
+            tprint(f"Task failed: {error}")
+
+    async def wait(self) -> int:
+        """
+        Waits until every scheduled task has finished (including the tasks scheduled while waiting)
+
+        Returns:
+            The number of tasks that were waited on
+        """
+        waited_count = 0
+        while len(self._tasks) > 0:
+            tasks, self._tasks = self._tasks, set()
+            await asyncio.wait(tasks)
+            waited_count += len(tasks)
+
+        self._last_task_by_key.clear()
+        return waited_count
+
+
+class AsyncInboxIngestion:
+    def __init__(
+        self,
+        reddit: Any,
+        submission: Any,
+        comment_class: Type[Any],
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Parametrized constructor
+
+        Same as ingestion.InboxIngestion, with an Async PRAW Reddit instance.
+
+        Attributes:
+            reddit: the Async PRAW Reddit instance
+            submission: the main submission
+            comment_class: the Comment model class (e.g. asyncpraw.models.Comment)
+            rate_limiter: the rate limiter shared by all outbound Reddit API calls
+        """
+        self.reddit = reddit
+        self.submission = submission
+        self.comment_class = comment_class
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self._unacknowledged_items: List = []
+
+    @property
+    def pending_acknowledgements(self) -> int:
+        return len(self._unacknowledged_items)
+
+    async def fetch_comments(self) -> List:
+        """
+        Returns the unread inbox items that are comments on the main submission
+            (only marked as read once handled, see ingestion.InboxIngestion.fetch_comments())
+        """
+        comments = []
+        async for unread_item in self.reddit.inbox.unread(limit=None):
+            # Only keep the unread item if it belongs to the current thread
+            if (
+                isinstance(unread_item, self.comment_class)
+                and unread_item.submission.id == self.submission.id
+            ):
+                comments.append(unread_item)
+            else:
+                self._unacknowledged_items.append(unread_item)
+
+        return comments
+
+    def mark_handled(self, comment: Any):
+        """
+        Queues a fetched comment to be marked as read by the next acknowledge() call
+        """
+        self._unacknowledged_items.append(comment)
+
+    async def acknowledge(self):
+        """
+        Marks the fetched inbox items as read in batches of MARK_READ_BATCH_SIZE (one API call per batch)
+        """
+        items, self._unacknowledged_items = self._unacknowledged_items, []
+        if len(items) == 0:
+            return
+
+        try:
+            for index in range(0, len(items), MARK_READ_BATCH_SIZE):
+                await self.rate_limiter.acquire_async(RequestPriority.MARK_READ)
+                await self.reddit.inbox.mark_read(
+                    items[index : index + MARK_READ_BATCH_SIZE]
+                )
+        except Exception as error:
+            tprint(f"Unable to mark {len(items)} inbox item(s) as read: {error}")
+
+
+class AsyncSubmissionEditCoalescer(SubmissionEditCoalescer):
+    def __init__(self, *args, tasks: TaskGroup, **kwargs):
+        """
+        Parametrized constructor
+
+        Same as SubmissionEditCoalescer, but publishing an edit schedules it as a task.
+        Edits run one after another, so the latest body always wins.
+
+        Attributes:
+            tasks: the task group to schedule the edits in
+        """
+        super().__init__(*args, **kwargs)
+        self.tasks = tasks
+
+    def publish(self) -> bool:
+        if not self._has_pending_edit:
+            return False
+
+        self.tasks.schedule("community_submission_edit", self._edit(self.render_body()))
+        self._has_pending_edit = False
+        self._last_publish_time = self.clock()
+        self.edits_published += 1
+        return True
+
+    async def _edit(self, body: str):
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(RequestPriority.EDIT)
+            await self.submission.edit(body=body)
+        except Exception as error:
+            # Keep the edit pending, so that it is retried on the next publish
+            self._has_pending_edit = True
+            tprint(
+                f"Unable to edit submission (will retry on the next publish): {error}"
+            )
+
+
+class AsyncCore(Core):
+    def __init__(
+        self,
+        db: Database,
+        reddit: Any,
+        submission: Any,
+        community_submission: Any,
+        patch_notes_file: PatchNotesFile,
+        comment_class: Type[Any],
+        community_document: Optional[CommunityDocument] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        ingestion: Optional[AsyncInboxIngestion] = None,
+        line_classifications: Optional[LineClassificationTable] = None,
+    ):
+        """
+        Parametrized constructor
+
+        The arguments are the same as Core's, with Async PRAW models.
+
+        Attributes:
+            comment_class: the Comment model class (e.g. asyncpraw.models.Comment)
+            ingestion: the backend that fetches the comments to process (defaults to polling the inbox)
+        """
+        super().__init__(
+            db=db,
+            reddit=reddit,
+            submission=submission,
+            community_submission=community_submission,
+            patch_notes_file=patch_notes_file,
+            community_document=community_document,
+            reply_dispatcher=ReplyDispatcher(num_workers=0),
+            rate_limiter=rate_limiter,
+            line_classifications=line_classifications,
+        )
+        self.tasks = TaskGroup()
+        self.community_submission_edits = AsyncSubmissionEditCoalescer(
+            community_submission,
+            self.community_document.render,
+            rate_limiter=self.rate_limiter,
+            tasks=self.tasks,
+        )
+        self.async_ingestion = (
+            ingestion
+            if ingestion is not None
+            else AsyncInboxIngestion(
+                reddit, submission, comment_class, self.rate_limiter
+            )
+        )
+
+    def safe_comment_reply(self, comment: Any, text_body: str):
+        """
+        Schedules a reply to a comment as a task.
+        Replies to the same comment are sent in the order they were scheduled.
+        """
+        self.tasks.schedule(
+            key=getattr(comment, "id", None) or id(comment),
+            coroutine=self.send_comment_reply_async(comment, text_body),
+        )
+
+    async def send_comment_reply_async(self, comment: Any, text_body: str):
+        """
+        Same as Core.send_comment_reply(), for Async PRAW comments
+        """
+        try:
+            await self.rate_limiter.acquire_async(RequestPriority.REPLY)
+            await comment.reply(body=text_body)
+        except Exception as error:
+            tprint(f"Unable to reply: {error}")
+
+            # Hold back all outbound requests for the rate limit duration
+            for subException in getattr(error, "items", []):
+                if subException.error_type == "RATELIMIT":
+                    sleep_time = parse_rate_limit_seconds(subException.message)
+                    self.rate_limiter.penalize(
+                        sleep_time if sleep_time is not None else 60
+                    )
+
+    async def load_redditors(self, comments: List):
+        """
+        Concurrently fetches the authors of the comments whose account stats are not in the eligibility cache,
+            so that the (synchronous) eligibility checks can read them
+        """
+        authors_to_load = {}
+        for comment in comments:
+            author = comment.author
+            if (
+                author is None
+                or author.name in DISALLOWED_USERS_SET
+                or author.name in authors_to_load
+                or self.eligibility_cache.has_valid_profile(author.name)
+            ):
+                continue
+            authors_to_load[author.name] = author
+
+        await asyncio.gather(*(author.load() for author in authors_to_load.values()))
+
+    async def flush_pending_updates_async(self):
+        """
+        Same as Core.flush_pending_updates(): waits for the scheduled replies & edits, then persists the database
+        """
+        self.community_submission_edits.safe_publish()
+        await self.tasks.wait()
+        self.db.flush()
+
+    async def acknowledge_ingested_items_async(self):
+        """
+        Same as Core.acknowledge_ingested_items()
+        """
+        if self.async_ingestion.pending_acknowledgements == 0:
+            return
+
+        await self.tasks.wait()
+        self.db.flush()
+        await self.async_ingestion.acknowledge()
+
+    async def shutdown_async(self):
+        await self.flush_pending_updates_async()
+
+    async def loop_async(self) -> bool:
+        """
+        Same as Core.loop(), on asyncio
+
+        Returns:
+        - True, if the loop should continue running
+        - False, if the loop should stop running
+        """
+        self.last_pass_item_count = 0
+
+        try:
+            # Stop indefinite loop if current time is greater than the closing time.
+            if self.has_game_ended():
+                return False
+
+            comments = await self.async_ingestion.fetch_comments()
+            self.last_pass_item_count = len(comments)
+
+            # Skip comments that were processed before they could be acknowledged
+            unprocessed_comments = []
+            for comment in comments:
+                if self.db.is_comment_processed(comment.fullname):
+                    self.async_ingestion.mark_handled(comment)
+                else:
+                    unprocessed_comments.append(comment)
+            comments = unprocessed_comments
+
+            # Only the authors of guesses (including out-of-range ones) are checked for eligibility
+            # (see Core.process_comment())
+            await self.load_redditors(
+                [
+                    comment
+                    for comment in comments
+                    if find_first_line_number(comment.body) is not None
+                ]
+            )
+
+            # Game state mutations are serialized: one comment at a time, in order
+            for comment in comments:
+                # The writes of a guess are committed together (see Database.transaction())
+                with self.db.transaction():
+                    game_continues = self.process_comment(comment)
+                    self.db.add_processed_comment(comment.fullname)
+
+                # A comment whose processing raised is not acknowledged (see Core.loop())
+                self.async_ingestion.mark_handled(comment)
+                if not game_continues:
+                    return False
+
+                # Stop indefinite loop if current time is greater than the closing time.
+                if self.has_game_ended():
+                    return False
+
+            return True
+
+        # Handle unforeseen exceptions and log the error
+        except Exception as error:
+            tprint(f"General exception encountered in core loop: {error}")
+            sleep_time = 60
+            tprint(f"Sleeping for {sleep_time} seconds...")
+            await asyncio.sleep(sleep_time)
+            return True  # main.py loop should continue after the sleep period
+
+        finally:
+            await self.flush_pending_updates_async()
+            await self.acknowledge_ingested_items_async()
+
+    async def perform_post_game_actions_async(self):
+        """
+        Same as Core.perform_post_game_actions(), with the Private Messages sent concurrently
+            (through the same persisted queue, so a restart does not send them again)
+        """
+        await self.flush_pending_updates_async()
+        winners_list, winners_submission_content = self.select_winners()
+
+        # Update main submission with winner submission content at the top (unless done before a restart)
+        if not self.submission.selftext.startswith(WINNERS_SUBMISSION_HEADER):
+            await self.submission.edit(
+                body=winners_submission_content + self.submission.selftext
+            )
+            tprint("Reddit submission successfully updated with the winners list info!")
+
+        # Private messages
+        version_string = self.patch_notes_file.get_version_string()
+        await asyncio.gather(
+            send_message_to_staff_async(
+                reddit=self.reddit,
+                winners_list_path=WINNERS_LIST_FILE_PATH,
+                staff_recipients=STAFF_RECIPIENTS_LIST,
+                version_string=version_string,
+                gold_coin_reward=GOLD_COIN_REWARD,
+                rate_limiter=self.rate_limiter,
+                database=self.db,
+            ),
+            send_message_to_winners_async(
+                reddit=self.reddit,
+                winners_list=winners_list,
+                reward_code_allocator=RewardCodeAllocator(
+                    self.db, self.reward_codes_filepath
+                ),
+                version_string=version_string,
+                gold_coin_reward=GOLD_COIN_REWARD,
+                rate_limiter=self.rate_limiter,
+                database=self.db,
+            ),
+        )
@@ -0,0 +1,177 @@
+#!/usr/bin/python
+"""
+This module contains the factory of the PRAW Reddit client & its underlying HTTP session.
+
+The HTTP session is tuned for the bot's workload:
+- Its connection pool is sized for the reply worker threads (connections are kept alive & reused)
+- Idempotent requests that fail with a 5xx server error are retried with an exponential backoff
+- Every response feeds the shared rate limiter & the per-endpoint request timing stats
+"""
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+import praw
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from hon_patch_notes_game_bot.rate_limiter import RateLimiter
+from hon_patch_notes_game_bot.config.config import (
+    BOT_USERNAME,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF_FACTOR,
+    REPLY_WORKER_COUNT,
+    USER_AGENT,
+)
+
+# Server errors that are worth retrying (Reddit returns these while under heavy load)
+RETRY_STATUS_CODES = (500, 502, 503, 504, 520, 522)
+
+# Path segments that identify a specific object are collapsed, so that the stats are grouped by endpoint
+ENDPOINT_PATTERNS: List[Tuple[Pattern, str]] = [
+    (re.compile(r"/comments/\w+(/[^/]*)?(/\w+)?"), "/comments/{id}"),
+    (re.compile(r"/(user|u)/[\w-]+"), "/user/{name}"),
+    (re.compile(r"/r/\w+"), "/r/{subreddit}"),
+]
+
+
+def get_endpoint(method: str, url: str) -> str:
+    """
+    Gets the endpoint of a request (e.g. "GET /message/unread"), without the query string & object ids
+    """
+    path = urlparse(url).path.rstrip("/") or "/"
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+
+    return f"{method} {path}"
+
+
+class EndpointStats(NamedTuple):
+    request_count: int
+    error_count: int
+    total_seconds: float
+    max_seconds: float
+
+    @property
+    def average_seconds(self) -> float:
+        return self.total_seconds / self.request_count if self.request_count else 0.0
+
+
+class RequestTimingStats:
+    def __init__(self):
+        """
+        Parametrized constructor
+
+        Keeps track of the request count, error count & response times of every endpoint.
+        Responses can be recorded from multiple threads (e.g. the reply worker threads).
+        """
+        self._lock = threading.Lock()
+        self._stats: Dict[str, EndpointStats] = {}
+
+    def record(self, endpoint: str, seconds: float, is_error: bool = False):
+        with self._lock:
+            stats = self._stats.get(endpoint, EndpointStats(0, 0, 0.0, 0.0))
+            self._stats[endpoint] = EndpointStats(
+                request_count=stats.request_count + 1,
+                error_count=stats.error_count + int(is_error),
+                total_seconds=stats.total_seconds + seconds,
+                max_seconds=max(stats.max_seconds, seconds),
+            )
+
+    def get(self, endpoint: str) -> Optional[EndpointStats]:
+        with self._lock:
+            return self._stats.get(endpoint)
+
+    def snapshot(self) -> Dict[str, EndpointStats]:
+        with self._lock:
+            return dict(self._stats)
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary of the stats, one endpoint per line (slowest total time first)
+        """
+        lines = [
+            f"{endpoint}: {stats.request_count} request(s), {stats.error_count} error(s), "
+            f"avg {stats.average_seconds:.3f}s, max {stats.max_seconds:.3f}s"
+            for endpoint, stats in sorted(
+                self.snapshot().items(), key=lambda item: -item[1].total_seconds
+            )
+        ]
+        return "\n".join(lines)
+
+    def response_hook(self, response: requests.Response, *args, **kwargs):
+        """
+        A requests response hook that records the response time of the request
+        """
+        self.record(
+            get_endpoint(response.request.method or "", response.request.url or ""),
+            response.elapsed.total_seconds(),
+            is_error=response.status_code >= 400,
+        )
+
+
+def create_http_session(
+    rate_limiter: Optional[RateLimiter] = None,
+    timing_stats: Optional[RequestTimingStats] = None,
+    pool_size: int = REPLY_WORKER_COUNT + 1,
+    max_retries: int = HTTP_MAX_RETRIES,
+    backoff_factor: float = HTTP_RETRY_BACKOFF_FACTOR,
+) -> requests.Session:
+    """
+    Creates the HTTP session that the Reddit client sends its requests with
+
+    Attributes:
+        rate_limiter: the rate limiter to feed with the rate-limit response headers
+        timing_stats: the stats to record the response times in
+        pool_size: the number of connections kept alive (the reply worker threads + the core loop thread)
+        max_retries: the number of retries of an idempotent request that failed with a server error
+        backoff_factor: the exponential backoff factor between retries (in seconds)
+
+    Returns:
+        The HTTP session
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        # Only idempotent requests are retried: a retried POST could e.g. post a reply twice
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        # Hand the last response back to PRAW, which raises the appropriate exception
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    # One connection pool per host (the OAuth API host & the token host)
+    adapter = HTTPAdapter(
+        pool_connections=2, pool_maxsize=max(pool_size, 1), max_retries=retry
+    )
+
+    http_session = requests.Session()
+    http_session.mount("https://", adapter)
+    http_session.mount("http://", adapter)
+    if rate_limiter is not None:
+        http_session.hooks["response"].append(rate_limiter.response_hook)
+    if timing_stats is not None:
+        http_session.hooks["response"].append(timing_stats.response_hook)
+
+    return http_session
+
+
+def create_reddit(
+    rate_limiter: Optional[RateLimiter] = None,
+    timing_stats: Optional[RequestTimingStats] = None,
+) -> praw.Reddit:
+    """
+    Creates the PRAW Reddit instance of the bot, using a tuned HTTP session (see create_http_session())
+    """
+    reddit = praw.Reddit(
+        BOT_USERNAME,
+        user_agent=USER_AGENT,
+        requestor_kwargs={"session": create_http_session(rate_limiter, timing_stats)},
+    )
+    reddit.validate_on_submit = True
+    return reddit
@@ -0,0 +1,165 @@
+#!/usr/bin/python
+"""
+This module contains a local, authoritative model of the community-compiled patch notes submission.
+
+Each patch notes line number owns a slot that is either empty or filled with the revealed line content.
+The submission body is always rendered from the model, instead of string-splicing the remote submission body.
+Each slot keeps its rendered line, so rendering the body is a single join. The rendered lines of an empty document
+    are built once per patch notes line count & shared (e.g. when the repair path clears the document).
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from hon_patch_notes_game_bot.patch_notes_file_handler import PatchNotesFile
+
+COMPILED_PATCH_NOTES_HEADING = (
+    "\n\n# Community-compiled Patch Notes\n\n"
+    "The patch notes compiled by the community will automatically be updated below "
+    "(guessed lines that are blank will be marked with `...`):\n\n"
+)
+
+
+def render_template_line(line_number: int, line_content: Optional[str] = None) -> str:
+    """
+    Renders the line of the community-compiled patch notes for a given line number
+
+    Attributes:
+        line_number: the patch notes line number
+        line_content: the revealed content of the line (None if the line has not been revealed yet)
+    """
+    if line_content is None:
+        return f">{str(line_number)} |\n\n"
+
+    return f">{str(line_number)} | {line_content.rstrip()}\n\n"
+
+
+@lru_cache(maxsize=4)
+def get_template_lines(total_line_count: int) -> Tuple[str, ...]:
+    """
+    Returns the rendered lines of an empty community-compiled patch notes template (cached per line count)
+
+    Index 0 is an empty string, so that lines can be indexed by line number directly.
+    """
+    return ("",) + tuple(
+        render_template_line(line_number)
+        for line_number in range(1, total_line_count + 1)
+    )
+
+
+class CommunityDocument:
+    def __init__(self, total_line_count: int, header: str = "", footer: str = ""):
+        """
+        Parametrized constructor
+
+        Attributes:
+            total_line_count: the total number of lines in the patch notes file
+            header: the text rendered before the compiled patch notes lines
+            footer: the text rendered after the compiled patch notes lines
+        """
+        self.header = header
+        self.footer = footer
+
+        # Index 0 is unused so that slots can be indexed by line number directly
+        self._slots: List[Optional[str]] = [None] * (total_line_count + 1)
+        self._rendered_lines: List[str] = list(get_template_lines(total_line_count))
+
+    @classmethod
+    def from_text(cls, text: str, total_line_count: int) -> "CommunityDocument":
+        """
+        Creates a CommunityDocument by parsing an existing community submission body.
+
+        Text before the first compiled patch notes line becomes the header, text after the last one becomes the footer,
+            and lines that already contain content fill their slots.
+        If the compiled patch notes lines cannot be found, the whole text becomes the header.
+        """
+        document = cls(total_line_count)
+        position = text.find(">1 |")
+        if position == -1 or total_line_count < 1:
+            document.header = text
+            return document
+
+        document.header = text[:position]
+        for line_number in range(1, total_line_count + 1):
+            prefix = f">{str(line_number)} |"
+            end = text.find("\n\n", position)
+            if not text.startswith(prefix, position) or end == -1:
+                break
+
+            line_content = text[position + len(prefix) : end].strip()
+            if line_content != "":
+                document.fill(line_number, line_content)
+            position = end + 2
+
+        document.footer = text[position:]
+        return document
+
+    @property
+    def total_line_count(self) -> int:
+        return len(self._slots) - 1
+
+    def fill(self, line_number: int, line_content: str) -> bool:
+        """
+        Fills the slot of a line number with its revealed content
+
+        Returns:
+            True if the slot exists and its content changed
+            False otherwise
+        """
+        if line_number < 1 or line_number >= len(self._slots):
+            return False
+
+        line_content = line_content.rstrip()
+        if self._slots[line_number] == line_content:
+            return False
+
+        self._slots[line_number] = line_content
+        self._rendered_lines[line_number] = render_template_line(
+            line_number, line_content
+        )
+        return True
+
+    def clear(self):
+        """
+        Empties all slots
+        """
+        self._slots = [None] * len(self._slots)
+        self._rendered_lines = list(get_template_lines(self.total_line_count))
+
+    def get(self, line_number: int) -> Optional[str]:
+        """
+        Returns the revealed content of a line number (None if it has not been revealed)
+        """
+        if line_number < 1 or line_number >= len(self._slots):
+            return None
+
+        return self._slots[line_number]
+
+    def render(self) -> str:
+        """
+        Renders the full submission body from the model
+        """
+        return self.header + "".join(self._rendered_lines) + self.footer
+
+
+def build_community_document(
+    submission_content_path: str,
+    patch_notes_file: PatchNotesFile,
+    main_submission_url: str,
+) -> CommunityDocument:
+    """
+    Reads the community_patch_notes_compilation.md file and builds an empty CommunityDocument from it
+
+    Returns:
+        A CommunityDocument with no revealed lines
+    """
+    with open(submission_content_path, "r") as file:
+        submission_content = file.read()
+        submission_content = submission_content.replace(
+            "#main-reddit-thread", main_submission_url
+        )
+
+    return CommunityDocument(
+        total_line_count=patch_notes_file.get_total_line_count(),
+        header=submission_content + COMPILED_PATCH_NOTES_HEADING,
+        footer=f"\n\n**Guesses in this thread will not be responded to by the bot. [Visit the main thread instead!]({main_submission_url})**\n\nFeel free to discuss patch changes here liberally (based on the currently revealed notes)! :)",  # noqa: E501
+    )
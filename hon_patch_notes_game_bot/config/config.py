@@ -1,7 +1,7 @@
 """
 This file will contain the bot script configuration that are most likely to change
 """
-from typing import List, Set
+from typing import List, Optional, Set
 
 # ==========
 # Variables
@@ -18,6 +18,10 @@ GAME_END_TIME: str = "November 27, 2021, 4:00 am UTC"
 
 GOLD_COIN_REWARD: int = 300
 NUM_WINNERS: int = 15
+WINNER_SELECTION_SEED: Optional[
+    str
+] = None  # Seed of the winners draw (a random seed is generated & saved if None)
+WINNER_SELECTION_WEIGHTED: bool = False  # Whether a potential winner's odds are proportional to their correct guesses
 
 # ================
 # Other constants
@@ -40,6 +44,71 @@ WINNERS_LIST_FILE_PATH: str = "cache/winners_list.txt"
 REWARD_CODES_FILE_PATH: str = "config/reward_codes.txt"
 BLANK_LINE_REPLACEMENT: str = "..."
 
+# Reddit's maximum length of a submission's selftext (the winners list posted to the main submission
+#   is truncated to fit, while the winners list file always contains the full lists)
+SUBMISSION_SELFTEXT_MAX_LENGTH: int = 40000
+
+# Database storage backend: "tinydb" (a JSON file) or "sqlite" (an SQLite file, see storage.py)
+#   An existing TinyDB JSON file can be copied to the SQLite file with migrate.py
+DB_BACKEND: str = "tinydb"
+DB_TINYDB_PATH: str = "cache/db.json"
+DB_SQLITE_PATH: str = "cache/db.sqlite3"
+
+# Database write-behind settings: writes are buffered in memory & flushed to disk
+#   when either bound is reached, at the end of each core loop pass, and on shutdown
+DB_WRITE_BEHIND_MAX_DELAY_SECONDS: float = 5.0
+DB_WRITE_BEHIND_MAX_PENDING_OPS: int = 100
+
+# Minimum time between two edits of the community submission within a core loop pass
+#   (pending edits are always published at the end of each pass & when the game ends)
+COMMUNITY_EDIT_MIN_INTERVAL_SECONDS: float = 30.0
+
+# Number of worker threads that send comment replies (0 sends replies inline in the core loop)
+REPLY_WORKER_COUNT: int = 4
+
+# Client-side rate limiting shared by all outbound Reddit API calls
+#   (synced with Reddit's rate-limit response headers at runtime)
+RATE_LIMIT_REQUESTS_PER_MINUTE: float = 100
+RATE_LIMIT_BURST_SIZE: int = 30
+
+# Private Messages (PMs) sent after the game ends: the number of worker threads sending them,
+#   and the number of attempts of a rate-limited PM before it is given up on
+PM_WORKER_COUNT: int = 4
+PM_MAX_ATTEMPTS: int = 5
+
+# Retries (with an exponential backoff) of idempotent Reddit API requests that fail with a 5xx server error
+HTTP_MAX_RETRIES: int = 3
+HTTP_RETRY_BACKOFF_FACTOR: float = 0.5
+
+# Number of inbox items marked as read per API call (25 is Reddit's limit)
+MARK_READ_BATCH_SIZE: int = 25
+
+# Which engine runs the bot:
+#   - "sync": PRAW, with replies sent from worker threads
+#   - "async": Async PRAW (optional dependency: pip install asyncpraw), with network calls run as asyncio tasks.
+#       It always fetches new comments from the inbox
+ENGINE: str = "sync"
+
+# How new comments are fetched:
+#   - "inbox": poll the bot's unread inbox items & mark them as read
+#   - "stream": poll the main submission's top-level comments (newest first) & the replies to the bot's comments
+INGESTION_MODE: str = "inbox"
+
+# Number of comments requested per poll of the main submission's comments in the "stream" ingestion mode
+#   (500 is Reddit's limit).
+#   Older new comments (e.g. after a burst) are loaded from the "load more comments" links of the thread.
+STREAM_COMMENT_LIMIT: int = 500
+
+# How long the fetched account stats of a Redditor are reused for the eligibility checks (0 disables the cache)
+ELIGIBILITY_CACHE_TTL_SECONDS: float = 86400
+
+# Adaptive wait between core loop passes: SLEEP_INTERVAL_SECONDS is only the initial interval.
+#   The interval drops to the minimum after a pass that handled comments,
+#   and is multiplied by the backoff factor (up to the maximum) after every idle pass
+MIN_SLEEP_INTERVAL_SECONDS: float = 2
+MAX_SLEEP_INTERVAL_SECONDS: float = 120
+SLEEP_INTERVAL_BACKOFF_FACTOR: float = 2
+
 # ================
 # Data structures
 # ================
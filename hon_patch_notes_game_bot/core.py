@@ -5,46 +5,68 @@ This module contains the bot's core loop and most of the logic in its "engine".
 PRAW Comment API: https://praw.readthedocs.io/en/latest/code_overview/models/comment.html
 """
 import time
+from functools import partial
 
 from prawcore.exceptions import ServerError
 from praw import Reddit
 from praw.exceptions import RedditAPIException
 from praw.models import Comment, Redditor, Submission
 import typing
+from typing import Iterator, List, Optional, Tuple, Union
 
+from hon_patch_notes_game_bot.community_document import CommunityDocument
 from hon_patch_notes_game_bot.communications import (
     send_message_to_staff,
     send_message_to_winners,
 )
 from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.edit_coalescer import SubmissionEditCoalescer
+from hon_patch_notes_game_bot.eligibility import EligibilityCache, EligibilityVerdict
+from hon_patch_notes_game_bot.game_clock import GameClock
+from hon_patch_notes_game_bot.guess_parser import GuessParser
+from hon_patch_notes_game_bot.ingestion import (
+    InboxIngestion,
+    SubmissionStreamIngestion,
+)
+from hon_patch_notes_game_bot.line_classifier import (
+    LineClassificationTable,
+    LineOutcome,
+)
 from hon_patch_notes_game_bot.patch_notes_file_handler import PatchNotesFile
+from hon_patch_notes_game_bot.rate_limiter import (
+    RateLimiter,
+    RequestPriority,
+    parse_rate_limit_seconds,
+)
+from hon_patch_notes_game_bot.reply_dispatcher import ReplyDispatcher
+from hon_patch_notes_game_bot.reward_codes import RewardCodeAllocator
 from hon_patch_notes_game_bot.user import RedditUser
 from hon_patch_notes_game_bot.utils import (
-    get_patch_notes_line_number,
-    generate_submission_compiled_patch_notes_template_line,
-    get_reward_codes_list,
-    is_game_expired,
     output_winners_list_to_file,
     tprint,
+    WINNERS_SUBMISSION_HEADER,
 )
+from hon_patch_notes_game_bot.winner_selection import draw_winners
 from hon_patch_notes_game_bot.config.config import (
-    BLANK_LINE_REPLACEMENT,
     DISALLOWED_USERS_SET,
-    GAME_END_TIME,
     GOLD_COIN_REWARD,
-    INVALID_LINE_STRINGS,
     MAX_NUM_GUESSES,
+    MARK_READ_BATCH_SIZE,
     MAX_PERCENT_OF_LINES_REVEALED,
-    MIN_COMMENT_KARMA,
-    MIN_LINK_KARMA,
-    MIN_ACCOUNT_AGE_DAYS,
     NUM_WINNERS,
     STAFF_RECIPIENTS_LIST,
+    SUBMISSION_SELFTEXT_MAX_LENGTH,
     WINNERS_LIST_FILE_PATH,
+    WINNER_SELECTION_SEED,
+    WINNER_SELECTION_WEIGHTED,
     REWARD_CODES_FILE_PATH,
 )
 
 
+WINNERS_LIST_METADATA_KEY = "winners_list"
+WINNER_DRAW_METADATA_KEY = "winner_draw"
+
+
 class Core:
     def __init__(
         self,
@@ -53,9 +75,25 @@ class Core:
         submission: Submission,
         community_submission: Submission,
         patch_notes_file: PatchNotesFile,
+        community_document: Optional[CommunityDocument] = None,
+        reply_dispatcher: Optional[ReplyDispatcher] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        ingestion: Optional[Union[InboxIngestion, SubmissionStreamIngestion]] = None,
+        game_clock: Optional[GameClock] = None,
+        line_classifications: Optional[LineClassificationTable] = None,
     ):
         """
         Parametrized constructor
+
+        Attributes:
+            community_document: the local model of the community submission's body.
+                If not provided, it is parsed from the community submission's current body.
+                Either way, its slots are (re)filled from the guessed lines in the database.
+            reply_dispatcher: the dispatcher that sends comment replies from worker threads
+            rate_limiter: the rate limiter shared by all outbound Reddit API calls
+            ingestion: the backend that fetches the comments to process (defaults to polling the inbox)
+            game_clock: the clock that tells whether the game has ended (defaults to the GAME_END_TIME config)
+            line_classifications: the classified lines of the patch notes (built from the patch notes file if not provided)
         """
 
         self.reddit = reddit
@@ -63,8 +101,60 @@ class Core:
         self.submission = submission
         self.community_submission = community_submission
         self.patch_notes_file = patch_notes_file
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.line_classifications = (
+            line_classifications
+            if line_classifications is not None
+            else LineClassificationTable(patch_notes_file)
+        )
+        self.guess_parser = GuessParser(patch_notes_file.get_total_line_count())
+
+        if community_document is None:
+            community_document = CommunityDocument.from_text(
+                community_submission.selftext, patch_notes_file.get_total_line_count()
+            )
+        self.community_document = community_document
+        self.load_community_document_from_db()
+        self.community_submission_edits = SubmissionEditCoalescer(
+            community_submission,
+            self.community_document.render,
+            rate_limiter=self.rate_limiter,
+        )
+        self.reply_dispatcher = (
+            reply_dispatcher if reply_dispatcher is not None else ReplyDispatcher()
+        )
+        self.ingestion = (
+            ingestion
+            if ingestion is not None
+            else InboxIngestion(reddit, submission, self.rate_limiter)
+        )
+        self.eligibility_cache = EligibilityCache(db)
+
+        # Number of comments fetched by the last loop() pass (drives the adaptive poll interval)
+        self.last_pass_item_count = 0
         self.reward_codes_filepath = REWARD_CODES_FILE_PATH
-        self.game_end_time = GAME_END_TIME
+        self.game_clock = game_clock if game_clock is not None else GameClock()
+
+    @property
+    def game_end_time(self) -> str:
+        return self.game_clock.game_end_time
+
+    @game_end_time.setter
+    def game_end_time(self, game_end_time: str):
+        self.game_clock.set_game_end_time(game_end_time)
+
+    def has_game_ended(self) -> bool:
+        """
+        Checks if the game has ended (the present time is later than the game end time)
+
+        Returns True if the game has ended
+        Returns False otherwise
+        """
+        if self.game_clock.is_expired():
+            tprint("Reddit Bot script ended via time deadline")
+            return True
+
+        return False
 
     def has_exceeded_revealed_line_count(self) -> bool:
         """
@@ -135,22 +225,30 @@ class Core:
         Returns:
             A RedditUser instance
         """
-        if self.db.user_exists(author.name):
-            db_user = self.db.get_user(author.name)
-            user = RedditUser(
-                name=db_user["name"],
-                can_submit_guess=db_user["can_submit_guess"],
-                is_potential_winner=db_user["is_potential_winner"],
-                num_guesses=db_user["num_guesses"],
-            )
-            return user
-        else:
+        user = self.db.get_reddit_user(author.name)
+        if user is None:
             # Make a user with default attributes and add it to the database
             user = RedditUser(name=author.name)
             self.db.add_user(user)
-            return user
+        return user
 
     def safe_comment_reply(self, comment: Comment, text_body: str):
+        """
+        Queues a reply to a comment, which is sent by the reply dispatcher's worker threads.
+        Replies to the same comment are sent in the order they were queued.
+
+        See send_comment_reply() for the error handling.
+
+        Attributes:
+            comment: a praw Comment model instance
+            text_body: the markdown text to include in the reply made
+        """
+        self.reply_dispatcher.submit(
+            key=getattr(comment, "id", None) or id(comment),
+            work_item=partial(self.send_comment_reply, comment, text_body),
+        )
+
+    def send_comment_reply(self, comment: Comment, text_body: str):
         """
         Attempts to reply to a comment & safely handles a RedditAPIException
         (e.g. if that comment has been deleted & cannot be responded to)
@@ -160,58 +258,48 @@ class Core:
             text_body: the markdown text to include in the reply made
         """
         try:
+            self.rate_limiter.acquire(RequestPriority.REPLY)
             comment.reply(body=text_body)
         except RedditAPIException as redditErr:
             tprint(f"Unable to reply (RedditAPIException): {redditErr}")
+
+            # Hold back all outbound requests for the rate limit duration
+            for subException in redditErr.items:
+                if subException.error_type == "RATELIMIT":
+                    sleep_time = parse_rate_limit_seconds(subException.message)
+                    self.rate_limiter.penalize(
+                        sleep_time if sleep_time is not None else 60
+                    )
             return None
         except Exception as err:
             tprint(f"Unable to reply (general Exception): {err}")
             return None
 
-    def is_account_too_new(self, redditor: Redditor, days: int) -> bool:
+    def load_community_document_from_db(self):
         """
-        Checks if the Reddit account is too new to post
-
-        Attributes:
-            Redditor: a PRAW Redditor instance to check
-            days: the number of days in the past to act as the threshold
-
-        Returns:
-            True if the account is too new to post
-            False if the account is old enough to post
+        Fills the community document's slots from the guessed lines in the database & the patch notes file
         """
-        DAYS_TO_SECONDS = 86400
-        return redditor.created_utc > (time.time() - (days * DAYS_TO_SECONDS))
+        for line_number in self.db.get_guessed_line_numbers():
+            classification = self.line_classifications.classify(line_number)
+            if classification.outcome is not LineOutcome.OUT_OF_RANGE:
+                self.community_document.fill(line_number, classification.reveal_text)
 
     def update_community_compiled_patch_notes_in_submission(
         self, patch_notes_line_number: int, line_content: str
     ):
         """
-        Edits the submission body & replaces the appropriate line number
-        with the line content via string.rfind() & string slicing
+        Fills the appropriate line number's slot in the community document with the line content,
+        then requests an edit of the submission body with the re-rendered community document.
+
+        Edits are coalesced: at most one edit is published per COMMUNITY_EDIT_MIN_INTERVAL_SECONDS,
+            and pending edits are published at the end of each core loop pass.
 
         Attributes:
             patch_notes_line_number: the correct patch notes line number that has been guessed
             line_content: the content of the specified patch notes line number
         """
-        submission_text = self.community_submission.selftext
-        target_text = generate_submission_compiled_patch_notes_template_line(
-            patch_notes_line_number
-        )
-        line_index = submission_text.rfind(target_text)
-
-        # line_index is still the start index of target_text
-        # To move to the end of line_index, increase index by len(target_text)
-        line_index += len(target_text.rstrip())
-
-        edited_submission_text = (
-            submission_text[:line_index]
-            + " "
-            + line_content.rstrip()
-            + submission_text[line_index:]
-        )
-
-        self.community_submission.edit(body=edited_submission_text)
+        if self.community_document.fill(patch_notes_line_number, line_content):
+            self.community_submission_edits.request_edit()
 
     def is_disallowed_to_post(self, redditor: Redditor, comment: Comment) -> bool:
         """
@@ -230,8 +318,11 @@ class Core:
         if redditor.name in DISALLOWED_USERS_SET:
             return True
 
+        # The account stats are cached, so repeat guessers are checked without fetching their profile again
+        verdict = self.eligibility_cache.get_verdict(redditor)
+
         # Deter Reddit throwaway accounts from participating
-        if not redditor.has_verified_email:
+        if verdict == EligibilityVerdict.UNVERIFIED_EMAIL:
             self.safe_comment_reply(
                 comment,
                 f"Sorry {redditor.name}, your email is not verified on your account.\n\n"
@@ -239,10 +330,7 @@ class Core:
             )
             return True
 
-        if (
-            redditor.comment_karma < MIN_COMMENT_KARMA
-            and redditor.link_karma < MIN_LINK_KARMA
-        ):
+        if verdict == EligibilityVerdict.LOW_KARMA:
             self.safe_comment_reply(
                 comment,
                 f"Sorry {redditor.name}, your link karma and your comment karma are too low.\n\n"
@@ -250,7 +338,7 @@ class Core:
             )
             return True
 
-        if self.is_account_too_new(redditor=redditor, days=MIN_ACCOUNT_AGE_DAYS):
+        if verdict == EligibilityVerdict.ACCOUNT_TOO_NEW:
             self.safe_comment_reply(
                 comment,
                 f"Sorry {redditor.name}, your account is too new.\n\n"
@@ -264,22 +352,91 @@ class Core:
         """
         An emergency function in case editing the community submission ends up removing the corrupted data.
 
-        This function searches for each template string line number in the submission,
-        and then fills it with the line content according to the local database & current patch_notes.txt file
+        This function refills every line in the community document according to the local database
+        & current patch_notes.txt file, and then overwrites the submission body with a single edit
+        """
+        self.community_document.clear()
+        self.load_community_document_from_db()
+        self.community_submission_edits.request_edit()
+        self.community_submission_edits.publish()
+
+    def flush_pending_updates(self):
         """
-        patch_notes_entries = self.db.get_all_entries_in_patch_notes_tracker()
-        for entry in patch_notes_entries:
-            line_number = entry["id"]
-            line_content = self.patch_notes_file.get_content_from_line_number(
-                line_number
+        Waits for queued replies, publishes the pending community submission edit & persists buffered database writes
+        """
+        self.reply_dispatcher.wait()
+        if self.community_submission_edits.safe_publish():
+            tprint(
+                "Community submission updated "
+                f"({self.community_submission_edits.edits_saved} edit(s) saved by coalescing so far)"
             )
-            if line_content is None:
-                line_content = "..."
+        self.db.flush()
 
-            self.update_community_compiled_patch_notes_in_submission(
-                patch_notes_line_number=line_number, line_content=line_content
+    def shutdown(self):
+        """
+        Flushes all pending updates & stops the reply worker threads
+        """
+        self.flush_pending_updates()
+        self.reply_dispatcher.shutdown()
+
+    def get_winner_candidates(self) -> Iterator[Tuple[str, float]]:
+        """
+        Returns an iterator over the (username, weight) pairs of the potential winners, for the winners draw
+
+        The weights are the number of correct guesses if WINNER_SELECTION_WEIGHTED is enabled, and 1 otherwise.
+        """
+        for user in self.db.iter_potential_winners():
+            weight = 1
+            if WINNER_SELECTION_WEIGHTED:
+                weight = max(user.num_correct_guesses, 1)
+            yield user.name, weight
+
+    def select_winners(self) -> Tuple[List[str], str]:
+        """
+        Draws the winners from the potential winners & saves the winners list to a file
+
+        Returns:
+            A tuple containing the winners list & the winners submission content
+        """
+        # The winners are persisted once drawn (along with the draw's seed, so the draw can be audited),
+        #   so that a restart does not pick (& message) other winners
+        winners_list = self.db.get_metadata(WINNERS_LIST_METADATA_KEY)
+        if winners_list is None:
+            draw = draw_winners(
+                self.get_winner_candidates(),
+                num_winners=NUM_WINNERS,
+                seed=WINNER_SELECTION_SEED,
+            )
+            winners_list = draw.winners
+            self.db.set_metadata(
+                WINNER_DRAW_METADATA_KEY,
+                {
+                    "seed": draw.seed,
+                    "weighted": WINNER_SELECTION_WEIGHTED,
+                    "candidate_count": draw.candidate_count,
+                },
+            )
+            self.db.set_metadata(WINNERS_LIST_METADATA_KEY, winners_list)
+            self.db.flush()
+            tprint(
+                f"{len(winners_list)} winner(s) drawn from {draw.candidate_count} potential winner(s) "
+                f"(seed: {draw.seed})"
             )
 
+        # Save winners submission content to file
+        winners_submission_content = output_winners_list_to_file(
+            potential_winners_list=(
+                user.name for user in self.db.iter_potential_winners()
+            ),
+            winners_list=winners_list,
+            output_file_path=WINNERS_LIST_FILE_PATH,
+            max_submission_length=SUBMISSION_SELFTEXT_MAX_LENGTH
+            - len(self.submission.selftext),
+        )
+        tprint(f"Winners list successfully output to: {WINNERS_LIST_FILE_PATH}")
+
+        return winners_list, winners_submission_content
+
     def perform_post_game_actions(self):
         """
         After the game ends, performs a series of operations.
@@ -290,23 +447,13 @@ class Core:
         - Updating the main submission with the winners list content
         - Sending Private Messages to staff members & winners
         """
-        # Save winners list in memory
-        potential_winners_list = self.db.get_potential_winners_list()
-        winners_list = self.db.get_random_winners_from_list(
-            num_winners=NUM_WINNERS, potential_winners_list=potential_winners_list
-        )
+        self.flush_pending_updates()
+        winners_list, winners_submission_content = self.select_winners()
 
-        # Save winners submission content to file
-        winners_submission_content = output_winners_list_to_file(
-            potential_winners_list=potential_winners_list,
-            winners_list=winners_list,
-            output_file_path=WINNERS_LIST_FILE_PATH,
-        )
-        tprint(f"Winners list successfully output to: {WINNERS_LIST_FILE_PATH}")
-
-        # Update main submission with winner submission content at the top
-        self.submission.edit(winners_submission_content + self.submission.selftext)
-        tprint("Reddit submission successfully updated with the winners list info!")
+        # Update main submission with winner submission content at the top (unless done before a restart)
+        if not self.submission.selftext.startswith(WINNERS_SUBMISSION_HEADER):
+            self.submission.edit(winners_submission_content + self.submission.selftext)
+            tprint("Reddit submission successfully updated with the winners list info!")
 
         # Private messages
         version_string = self.patch_notes_file.get_version_string()
@@ -316,32 +463,22 @@ class Core:
             staff_recipients=STAFF_RECIPIENTS_LIST,
             version_string=version_string,
             gold_coin_reward=GOLD_COIN_REWARD,
+            rate_limiter=self.rate_limiter,
+            database=self.db,
         )
 
         send_message_to_winners(
             reddit=self.reddit,
             winners_list=winners_list,
-            reward_codes_list=get_reward_codes_list(self.reward_codes_filepath),
+            reward_code_allocator=RewardCodeAllocator(
+                self.db, self.reward_codes_filepath
+            ),
             version_string=version_string,
             gold_coin_reward=GOLD_COIN_REWARD,
+            rate_limiter=self.rate_limiter,
+            database=self.db,
         )
 
-    def update_patch_notes_table_in_db(self, patch_notes_line_number: int) -> bool:
-        """
-        Attempts to update the patch notes table in the database
-
-        Returns:
-        - True, if the patch notes table was successfully updated
-        - False, if the line number was already guessed & the patch notes table was not updated
-        """
-        # Invalid guess if the line number was already guessed
-        if self.db.check_patch_notes_line_number(patch_notes_line_number):
-            return False
-
-        # Valid entry: add the guessed entry to the patch_notes_line_number table
-        self.db.add_patch_notes_line_number(patch_notes_line_number)
-        return True
-
     def process_guess_for_user(
         self,
         user: RedditUser,
@@ -350,23 +487,24 @@ class Core:
         patch_notes_line_number: int,
     ) -> bool:
         """
-        Processes the user's guess and performs the appropriate updates to various data sources
-            (database, user and patch notes community thread) based on the validity of the guess.
+        Processes the user's guess (already applied to the database, see Database.apply_guess())
+            by replying to it & updating the community-compiled patch notes based on the validity of the guess.
 
         Returns:
         - True, if the game should continue
         - False, if the game's end condition is met.
         """
-        line_content = self.patch_notes_file.get_content_from_line_number(
-            patch_notes_line_number
-        )
+        classification = self.line_classifications.classify(patch_notes_line_number)
 
         # Invalid guess by getting a blank line in the patch notes
-        if line_content is None:
-            self.update_community_compiled_patch_notes_in_submission(
-                patch_notes_line_number=patch_notes_line_number,
-                line_content=BLANK_LINE_REPLACEMENT,
-            )
+        # (line numbers that do not exist in the patch notes are treated the same way)
+        if classification.outcome in (LineOutcome.BLANK, LineOutcome.OUT_OF_RANGE):
+            # Out of range line numbers do not have a line in the community-compiled patch notes
+            if classification.outcome is LineOutcome.BLANK:
+                self.update_community_compiled_patch_notes_in_submission(
+                    patch_notes_line_number=patch_notes_line_number,
+                    line_content=classification.reveal_text,
+                )
             self.reply_with_bad_guess_feedback(
                 user,
                 author,
@@ -379,32 +517,32 @@ class Core:
                 return False
             return True
 
-        # Only check for invalid strings if line_content is not empty
-        # If the line content is correct, check other invalid strings for guessing
-        for invalid_string in INVALID_LINE_STRINGS:
-            if invalid_string in line_content:
-                self.update_community_compiled_patch_notes_in_submission(
-                    patch_notes_line_number=patch_notes_line_number,
-                    line_content=line_content,
-                )
-                self.reply_with_bad_guess_feedback(
-                    user,
-                    author,
-                    unread_item,
-                    f"Whiffed! Line #{patch_notes_line_number} contains an invalid string entry."
-                    "\n\nIt contains the following invalid string:\n\n"
-                    f">{invalid_string}\n\n",
-                )
+        # If the line content contains an invalid string, the guess is not valid either
+        if classification.outcome is LineOutcome.INVALID:
+            self.update_community_compiled_patch_notes_in_submission(
+                patch_notes_line_number=patch_notes_line_number,
+                line_content=classification.reveal_text,
+            )
+            self.reply_with_bad_guess_feedback(
+                user,
+                author,
+                unread_item,
+                f"Whiffed! Line #{patch_notes_line_number} contains an invalid string entry."
+                "\n\nIt contains the following invalid string:\n\n"
+                f">{classification.invalid_string}\n\n",
+            )
 
-                # Early exit checks/conditions
-                if self.has_exceeded_revealed_line_count():
-                    return False
-                return True
+            # Early exit checks/conditions
+            if self.has_exceeded_revealed_line_count():
+                return False
+            return True
 
         # If this code is reached, then the guess is valid!
-        user.is_potential_winner = True
+        # (the user's winner status has already been updated in the database, see Database.apply_guess())
+        line_content = classification.line_content
         self.update_community_compiled_patch_notes_in_submission(
-            patch_notes_line_number=patch_notes_line_number, line_content=line_content,
+            patch_notes_line_number=patch_notes_line_number,
+            line_content=classification.reveal_text,
         )
 
         # Reply to comment
@@ -433,9 +571,6 @@ class Core:
                 f"[Click here to see the current status of the community-compiled patch notes!]({self.community_submission.url})",  # noqa: E501
             )
 
-        # Update user in DB
-        self.db.update_user(user)
-
         # Early exit checks/conditions
         if self.has_exceeded_revealed_line_count():
             return False
@@ -462,15 +597,20 @@ class Core:
         if not user.can_submit_guess:
             return True
 
-        # Update user in DB after guess
-        user.num_guesses += 1
-        if user.num_guesses >= MAX_NUM_GUESSES:
-            user.can_submit_guess = False
-        self.db.update_user(user)
+        # Count the guess, claim the line & update the user's winner status in a single database write
+        classification = self.line_classifications.classify(patch_notes_line_number)
+        applied_guess = self.db.apply_guess(
+            user,
+            patch_notes_line_number,
+            is_correct=classification.outcome is LineOutcome.VALID,
+            max_num_guesses=MAX_NUM_GUESSES,
+        )
+        if not applied_guess.accepted:
+            return True
+        user = applied_guess.user
 
-        # Update patch notes in DB
-        if not self.update_patch_notes_table_in_db(patch_notes_line_number):
-            # If update is unsuccessful, then respond and exit early (prevents 2x replies to the user)
+        if not applied_guess.line_claimed:
+            # If the line was already guessed, then respond and exit early (prevents 2x replies to the user)
             self.reply_with_bad_guess_feedback(
                 user,
                 author,
@@ -486,7 +626,83 @@ class Core:
 
         return True
 
-    def loop(self):  # noqa: C901
+    def process_comment(self, comment: Comment) -> bool:
+        """
+        Processes a comment from the main submission as a guess
+
+        Returns:
+        - True, if the game should continue
+        - False, if the game's end condition is met.
+        """
+        author = comment.author
+
+        # Get patch notes line number from the user's post
+        # (comments without a number are ignored before any other check)
+        patch_notes_line_number = self.guess_parser.parse(comment.body)
+        if patch_notes_line_number is None:
+            if self.guess_parser.is_out_of_range(
+                comment.body
+            ) and not self.is_disallowed_to_post(author, comment):
+                self.reply_to_out_of_range_guess(author, comment)
+            return True
+
+        # Exit early if the user does not meet the posting conditions
+        if self.is_disallowed_to_post(author, comment):
+            return True
+
+        # Get author user id & search for it in the Database (add it if it doesn't exist)
+        user = self.get_user_from_database(author)
+
+        # Run the game rules, and exit early if game-ending conditions are met
+        return self.process_game_rules_for_user(
+            user, author, comment, patch_notes_line_number
+        )
+
+    def reply_to_out_of_range_guess(self, author: Redditor, comment: Comment):
+        """
+        Replies to a guess of a line number that does not exist in the patch notes.
+        The guess is not counted, and the user is not added to the database.
+
+        Attributes:
+            author: the praw Redditor model instance that wrote the comment
+            comment: the praw Comment model instance to respond to
+        """
+        user = self.db.get_reddit_user(author.name)
+        if user is None:
+            user = RedditUser(name=author.name)
+
+        # Prevent users who cannot make a guess from participating (see process_game_rules_for_user())
+        if not user.can_submit_guess:
+            return
+
+        self.reply_with_bad_guess_feedback(
+            user,
+            author,
+            comment,
+            "This line number does not exist in the patch notes. "
+            f"Valid line numbers are from 1 to {self.guess_parser.total_line_count}.\n\n",
+        )
+
+    def acknowledge_ingested_items(self):
+        """
+        Acknowledges the comments fetched by the ingestion backend (e.g. marks inbox items as read).
+
+        Queued replies & buffered database writes (including the processed comment ids) are persisted first,
+            so if the bot crashes before the items are acknowledged, they are fetched again but not re-processed.
+        """
+        if self.ingestion.pending_acknowledgements == 0:
+            return
+
+        try:
+            self.reply_dispatcher.wait()
+            self.db.flush()
+        except Exception as error:
+            tprint(f"Unable to persist pending updates before acknowledging: {error}")
+            return
+
+        self.ingestion.acknowledge()
+
+    def loop(self):
         """
         Core loop of the bot
 
@@ -494,58 +710,46 @@ class Core:
         - True, if the loop should continue running
         - False, if the loop should stop running
         """
+        self.last_pass_item_count = 0
 
-        # Check unread replies
+        # Check new comments on the main submission
         try:
             # Stop indefinite loop if current time is greater than the closing time.
-            if is_game_expired(self.game_end_time):
+            if self.has_game_ended():
                 return False
 
-            for unread_item in self.reddit.inbox.unread(limit=None):
-                unread_item.mark_read()
-
-                # Only proceed with processing the unread item if it belongs to the current thread
-                if (
-                    isinstance(unread_item, Comment)
-                    and unread_item.submission.id == self.submission.id
-                ):
-                    author = unread_item.author
-
-                    # Exit loop early if the user does not meet the posting conditions
-                    if self.is_disallowed_to_post(author, unread_item):
-                        continue
-
-                    # Get patch notes line number from the user's post
-                    patch_notes_line_number = get_patch_notes_line_number(
-                        unread_item.body
-                    )
-                    if patch_notes_line_number is None:
-                        continue
-
-                    # Get author user id & search for it in the Database (add it if it doesn't exist)
-                    user = self.get_user_from_database(author)
-
-                    # Run the game rules, and exit early if game-ending conditions are met
-                    if not self.process_game_rules_for_user(
-                        user, author, unread_item, patch_notes_line_number
-                    ):
+            for comment in self.ingestion.fetch_comments():
+                self.last_pass_item_count += 1
+
+                # Skip comments that were processed before they could be acknowledged
+                if not self.db.is_comment_processed(comment.fullname):
+                    # The writes of a guess are committed together (see Database.transaction())
+                    with self.db.transaction():
+                        game_continues = self.process_comment(comment)
+                        self.db.add_processed_comment(comment.fullname)
+                    if not game_continues:
+                        self.ingestion.mark_handled(comment)
                         return False
 
-                    # Stop indefinite loop if current time is greater than the closing time.
-                    if is_game_expired(self.game_end_time):
-                        return False
+                # A comment is only acknowledged once processed (the processed id is persisted before acknowledging),
+                #   so a comment whose processing raised is fetched again
+                self.ingestion.mark_handled(comment)
+                if self.ingestion.pending_acknowledgements >= MARK_READ_BATCH_SIZE:
+                    self.acknowledge_ingested_items()
 
-            # After going through the bot's inbox, return True if inner loop stop functions are not met
+                # Stop indefinite loop if current time is greater than the closing time.
+                if self.has_game_ended():
+                    return False
+
+            # After going through the new comments, return True if inner loop stop functions are not met
             return True
 
         # Occasionally, Reddit may throw a 503 server error while under heavy load.
-        # In that case, log the error & just wait and try again in the next loop cycle
+        # The HTTP session already retried the request with a backoff (see client.py),
+        #   so log the error & try again in the next loop cycle (the poll interval backs off while idle)
         except ServerError as serverError:
             tprint(f"Server error encountered in core loop: {serverError}")
-            sleep_time = 60
-            tprint(f"Sleeping for {sleep_time} seconds...")
-            time.sleep(sleep_time)
-            return True  # main.py loop should continue after the sleep period
+            return True
 
         # Handle remaining unforeseen exceptions and log the error
         except Exception as error:
@@ -554,3 +758,9 @@ class Core:
             tprint(f"Sleeping for {sleep_time} seconds...")
             time.sleep(sleep_time)
             return True  # main.py loop should continue after the sleep period
+
+        finally:
+            # Publish coalesced edits & persist buffered database writes at the end of every pass,
+            #   then acknowledge the remaining items
+            self.flush_pending_updates()
+            self.acknowledge_ingested_items()
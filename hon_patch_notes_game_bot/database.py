@@ -5,21 +5,58 @@ This module will keep track of all users that have posted in the allocated patch
 Data will be saved in some form of database (to prevent loss of data, e.g. if Reddit or the bot crashes)
 """
 import os
+import threading
+from contextlib import contextmanager
 from random import sample
-from tinydb import TinyDB, Query
-from tinydb.table import Document
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
 
-from hon_patch_notes_game_bot.user import RedditUser
+from hon_patch_notes_game_bot.line_tracker import GuessedLineTracker
+from hon_patch_notes_game_bot.storage import StorageBackend, TinyDBBackend
+from hon_patch_notes_game_bot.user import RedditUser, load_users
+from hon_patch_notes_game_bot.config.config import (
+    DB_TINYDB_PATH,
+    DB_WRITE_BEHIND_MAX_DELAY_SECONDS,
+    DB_WRITE_BEHIND_MAX_PENDING_OPS,
+    MAX_NUM_GUESSES,
+)
 
-User = Query()
-LineNumber = Query()
+
+class AppliedGuess(NamedTuple):
+    """
+    Attributes:
+        user: the user after the guess (as stored in the database)
+        accepted: whether the user could make a guess (their guess count was not incremented otherwise)
+        line_claimed: whether the guessed line number had not been guessed before (& is now claimed by this guess)
+    """
+
+    user: RedditUser
+    accepted: bool
+    line_claimed: bool
 
 
 class Database:
-    def __init__(self, db_path: str = "cache/db.json"):
+    def __init__(
+        self,
+        db_path: str = DB_TINYDB_PATH,
+        index_users: bool = True,
+        max_write_delay_seconds: float = DB_WRITE_BEHIND_MAX_DELAY_SECONDS,
+        max_pending_writes: int = DB_WRITE_BEHIND_MAX_PENDING_OPS,
+        total_line_count: int = 0,
+        backend: Optional[StorageBackend] = None,
+    ):
         """
         Parametrized constructor
+
+        Attributes:
+            db_path: path to the TinyDB JSON file (if no backend is given)
+            index_users: whether to keep an in-memory index of the user table (keyed by username).
+                When enabled, user lookups are O(1) dictionary accesses instead of storage lookups.
+            max_write_delay_seconds: the longest time a write may stay in memory before it is persisted
+                (if no backend is given)
+            max_pending_writes: the number of buffered writes that forces a flush to disk
+                (1 makes every write go straight to disk, if no backend is given)
+            total_line_count: the total line count of the patch notes file, used to size the guessed line tracker
+            backend: the storage backend (defaults to a TinyDB JSON file at db_path, see storage.py)
         """
 
         # Make cache folder if it does not exist
@@ -28,8 +65,83 @@ class Database:
         except OSError:
             print("Skipping creation of cache folder (already exists)...")
 
+        if backend is None:
+            backend = TinyDBBackend(
+                db_path,
+                max_write_delay_seconds=max_write_delay_seconds,
+                max_pending_writes=max_pending_writes,
+            )
         self.db_path = db_path
-        self.db = TinyDB(db_path)
+        self.backend = backend
+        self.index_users = index_users
+        self.total_line_count = total_line_count
+
+        # Serializes apply_guess() (the check-then-act of a guess on the user & the line tracker)
+        self._guess_lock = threading.RLock()
+        self.load_indexes()
+
+    def load_indexes(self):
+        """
+        (Re)builds the in-memory indexes from the storage backend
+        """
+        self._user_index: Dict[str, RedditUser] = {}
+        if self.index_users:
+            self.load_user_index()
+
+        # The patch_notes_line_tracker table stays the persisted copy of the guessed line numbers,
+        #   while this in-memory bitmap answers membership & count queries in O(1)
+        self.line_tracker = GuessedLineTracker(
+            size=self.total_line_count,
+            line_numbers=(
+                entry["id"] for entry in self.backend.all("patch_notes_line_tracker")
+            ),
+        )
+
+        # Fullnames of the comments that have already been processed as guesses
+        self._processed_comment_ids: Set[str] = {
+            entry["id"] for entry in self.backend.all("processed_comment")
+        }
+
+        # Cached Redditor account stats, keyed by username
+        self._redditor_profiles: Dict[str, Dict[str, Any]] = {
+            entry["name"]: entry for entry in self.backend.all("redditor_profile")
+        }
+
+    def load_user_index(self):
+        """
+        (Re)builds the in-memory user index from the user table.
+
+        The index maps each username to a (slotted) RedditUser,
+        and is kept coherent by add_user() and update_user() afterwards.
+        """
+        self._user_index = load_users(self.backend.all("user"))
+
+    def flush(self):
+        """
+        Persists all buffered writes to disk
+        """
+        self.backend.flush()
+
+    def close(self):
+        """
+        Persists all buffered writes to disk and closes the database file
+        """
+        self.backend.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Groups the writes made within the context (e.g. the writes of a single guess) in a storage transaction.
+
+        If an exception is raised & the backend rolls the writes back, the in-memory indexes are rebuilt,
+            so that they match what is stored.
+        """
+        try:
+            with self.backend.transaction():
+                yield
+        except BaseException:
+            self.load_indexes()
+            raise
 
     def insert_submission_url(self, tag: str, submission_url: str):
         """
@@ -40,7 +152,7 @@ class Database:
 
         This should be the only entry based on how the code has been designed in main.py
         """
-        self.db.table("submission").insert({"tag": tag, "url": submission_url})
+        self.backend.upsert("submission", {"tag": tag, "url": submission_url})
 
     def get_submission_url(self, tag) -> Optional[str]:
         """
@@ -53,12 +165,39 @@ class Database:
             The submission's URL, if it exists
             None if no data is found
         """
-        submission_data = self.db.table("submission").get(Query().tag == tag)
+        submission_data = self.backend.get("submission", tag)
         if submission_data is None:
             return None
 
         return submission_data["url"]
 
+    def get_metadata(self, key: str) -> Optional[Any]:
+        """
+        Gets a value from the metadata table (bot state that must survive restarts)
+
+        Attributes:
+            key: the key of the metadata entry
+
+        Returns:
+            The value of the metadata entry, if it exists
+            None if no data is found
+        """
+        entry = self.backend.get("metadata", key)
+        if entry is None:
+            return None
+
+        return entry["value"]
+
+    def set_metadata(self, key: str, value: Any):
+        """
+        Inserts or updates a value in the metadata table
+
+        Attributes:
+            key: the key of the metadata entry
+            value: the (JSON serializable) value of the metadata entry
+        """
+        self.backend.upsert("metadata", {"key": key, "value": value})
+
     def user_exists(self, name: str) -> bool:
         """
         Determines whether the user exists based on search by username
@@ -67,13 +206,32 @@ class Database:
             True if the user exists
             False otherwise
         """
-        return len(self.db.table("user").search(User.name == name)) > 0
+        if self.index_users:
+            return name in self._user_index
 
-    def get_user(self, name: str) -> Optional[Document]:
+        return self.backend.get("user", name) is not None
+
+    def get_user(self, name: str) -> Optional[Dict[str, Any]]:
         """
         Retrieves a user object from the database by username
         """
-        return self.db.table("user").get(User.name == name)
+        if self.index_users:
+            user = self._user_index.get(name)
+            return None if user is None else user.to_dict()
+
+        return self.backend.get("user", name)
+
+    def get_reddit_user(self, name: str) -> Optional[RedditUser]:
+        """
+        Retrieves a user from the database by username, as a new RedditUser instance
+            (without going through the stored fields if the users are indexed)
+        """
+        if self.index_users:
+            user = self._user_index.get(name)
+            return None if user is None else user.copy()
+
+        db_user = self.backend.get("user", name)
+        return None if db_user is None else RedditUser.from_dict(db_user)
 
     def add_user(self, RedditUser: RedditUser):
         """
@@ -82,7 +240,7 @@ class Database:
         Takes in a RedditUser object to do so (since the user model & RedditUser class share the same fields)
         """
         if not self.user_exists(RedditUser.name):
-            self.db.table("user").insert(vars(RedditUser))
+            self._write_user(RedditUser)
 
     def convert_db_user_to_RedditUser(self, db_user) -> RedditUser:
         """
@@ -91,13 +249,7 @@ class Database:
         Returns:
             A new RedditUser instance with the same properties as the db_user
         """
-        user = RedditUser(
-            name=db_user["name"],
-            can_submit_guess=db_user["can_submit_guess"],
-            is_potential_winner=db_user["is_potential_winner"],
-            num_guesses=db_user["num_guesses"],
-        )
-        return user
+        return RedditUser.from_dict(db_user)
 
     def update_user(self, RedditUser):
         """
@@ -105,7 +257,57 @@ class Database:
 
         Takes in a RedditUser object to do so (since the user model & RedditUser class share the same fields)
         """
-        self.db.table("user").update(vars(RedditUser), User.name == RedditUser.name)
+        if not self.user_exists(RedditUser.name):
+            return
+
+        self._write_user(RedditUser)
+
+    def _write_user(self, user: RedditUser):
+        self.backend.upsert("user", user.to_dict())
+        if self.index_users:
+            # Copied, so that later changes to the caller's instance do not bypass the database
+            self._user_index[user.name] = user.copy()
+
+    def apply_guess(
+        self,
+        user: RedditUser,
+        line_number: int,
+        is_correct: bool,
+        max_num_guesses: int = MAX_NUM_GUESSES,
+    ) -> AppliedGuess:
+        """
+        Applies a user's guess to the database as a single atomic operation:
+        - increments the user's guess count (& prevents further guesses once max_num_guesses is reached)
+        - claims the guessed line number, unless it was already guessed
+        - makes the user a potential winner if the line was claimed & the guess is correct
+
+        The user's current state is read from the database (the given user is only used if it is not stored yet),
+            so concurrent guesses of the same user or on the same line cannot overwrite each other.
+        The user & the line are written once, in the same transaction.
+
+        Returns:
+            The applied guess (see AppliedGuess)
+        """
+        with self._guess_lock, self.transaction():
+            stored_user = self.get_reddit_user(user.name)
+            user = user.copy() if stored_user is None else stored_user
+
+            if not user.can_submit_guess:
+                return AppliedGuess(user=user, accepted=False, line_claimed=False)
+
+            user.num_guesses += 1
+            if user.num_guesses >= max_num_guesses:
+                user.can_submit_guess = False
+
+            line_claimed = not self.check_patch_notes_line_number(line_number)
+            if line_claimed:
+                self.add_patch_notes_line_number(line_number)
+                if is_correct:
+                    user.is_potential_winner = True
+                    user.num_correct_guesses += 1
+
+            self._write_user(user)
+            return AppliedGuess(user=user, accepted=True, line_claimed=line_claimed)
 
     def check_patch_notes_line_number(self, line_number: int) -> bool:
         """
@@ -115,10 +317,7 @@ class Database:
             True if the patch notes line number exists in the database
             False otherwise
         """
-        return (
-            self.db.table("patch_notes_line_tracker").get(LineNumber.id == line_number)
-            is not None
-        )
+        return line_number in self.line_tracker
 
     def delete_patch_notes_line_number(self, line_number: int) -> bool:
         """
@@ -129,17 +328,22 @@ class Database:
             False otherwise
         """
         if self.check_patch_notes_line_number(line_number):
-            self.db.table("patch_notes_line_tracker").remove(
-                LineNumber.id == line_number
-            )
+            self.backend.remove("patch_notes_line_tracker", line_number)
+            self.line_tracker.remove(line_number)
             return True
         return False
 
-    def get_all_entries_in_patch_notes_tracker(self) -> List[Document]:
+    def get_all_entries_in_patch_notes_tracker(self) -> List[Dict[str, Any]]:
+        """
+        Returns all entries in the patch_notes_tracker table
+        """
+        return self.backend.all("patch_notes_line_tracker")
+
+    def get_guessed_line_numbers(self) -> Iterator[int]:
         """
-        Returns all entries in the patch_notes_tracker table (as a list of Document objects)
+        Returns an iterator over the guessed patch notes line numbers (in ascending order)
         """
-        return self.db.table("patch_notes_line_tracker").all()
+        return iter(self.line_tracker)
 
     def add_patch_notes_line_number(self, line_number: int):
         """
@@ -147,24 +351,107 @@ class Database:
 
         This is used to keep track of which line numbers have been guessed already.
         """
-        self.db.table("patch_notes_line_tracker").insert({"id": line_number})
+        self.backend.upsert("patch_notes_line_tracker", {"id": line_number})
+        self.line_tracker.add(line_number)
 
     def get_entry_count_in_patch_notes_line_tracker(self) -> int:
         """
         Returns the entry count (number of entries) in the patch_notes_line_tracker table
         """
-        return len(self.get_all_entries_in_patch_notes_tracker())
+        return len(self.line_tracker)
+
+    def is_comment_processed(self, comment_id: str) -> bool:
+        """
+        Checks if a comment has already been processed
+
+        Returns:
+            True if the comment id exists in the processed_comment table
+            False otherwise
+        """
+        return comment_id in self._processed_comment_ids
+
+    def add_processed_comment(self, comment_id: str):
+        """
+        Adds a comment id into the processed_comment table.
+
+        This is used to avoid processing a comment twice (e.g. if the bot crashes before its inbox item is marked as read).
+        """
+        if comment_id not in self._processed_comment_ids:
+            self.backend.upsert("processed_comment", {"id": comment_id})
+            self._processed_comment_ids.add(comment_id)
+
+    def get_redditor_profile(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Gets the cached account stats of a Redditor
+
+        Attributes:
+            name: the Redditor's username
+
+        Returns:
+            The cached account stats (including the "fetched_at" timestamp), if they exist
+            None if no data is found
+        """
+        return self._redditor_profiles.get(name)
+
+    def set_redditor_profile(self, profile: Dict[str, Any]):
+        """
+        Inserts or updates the cached account stats of a Redditor in the redditor_profile table
+
+        Attributes:
+            profile: the account stats, keyed by field name (must include "name")
+        """
+        self.backend.upsert("redditor_profile", profile)
+        self._redditor_profiles[profile["name"]] = dict(profile)
+
+    def get_outbound_messages(self) -> List[Dict[str, Any]]:
+        """
+        Returns all entries in the outbound_message table (the queued Private Messages)
+        """
+        return self.backend.all("outbound_message")
+
+    def set_outbound_message(self, message: Dict[str, Any]):
+        """
+        Inserts or updates a queued Private Message in the outbound_message table
+
+        Attributes:
+            message: the message fields (must include the idempotency "key")
+        """
+        self.backend.upsert("outbound_message", message)
+
+    def get_reward_code_assignments(self) -> Dict[str, str]:
+        """
+        Returns the reward codes assigned to the winners (keyed by username)
+        """
+        return {
+            entry["name"]: entry["code"]
+            for entry in self.backend.all("reward_code_assignment")
+        }
+
+    def add_reward_code_assignment(self, name: str, code: str):
+        """
+        Records the reward code assigned to a winner in the reward_code_assignment table
+        """
+        self.backend.upsert("reward_code_assignment", {"name": name, "code": code})
 
     def get_potential_winners_list(self) -> List[str]:
         """
         Returns:
             A list of usernames that are marked as potential winners
         """
-        # fmt: off
-        raw_user_list = self.db.table("user").search(User.is_potential_winner == True)  # noqa: E712
-        # fmt: on
-        potential_winners_list = [user["name"] for user in raw_user_list]
-        return potential_winners_list
+        return [user.name for user in self.iter_potential_winners()]
+
+    def iter_potential_winners(self) -> Iterator[RedditUser]:
+        """
+        Returns an iterator over the users that are marked as potential winners (without building a list of them)
+
+        The users are not copied if they are indexed, so they should not be modified.
+        """
+        users: Iterable[RedditUser] = (
+            self._user_index.values()
+            if self.index_users
+            else (RedditUser.from_dict(row) for row in self.backend.all("user"))
+        )
+        return (user for user in users if user.is_potential_winner)
 
     def get_random_winners_from_list(
         self, num_winners: int, potential_winners_list: list
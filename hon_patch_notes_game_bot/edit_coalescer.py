@@ -0,0 +1,114 @@
+#!/usr/bin/python
+"""
+This module contains a coalescer for submission edits.
+
+Every edit rewrites the full submission body & costs an API call, so multiple edit requests
+    made within a short interval are coalesced into a single edit of the latest body.
+"""
+import time
+from typing import Callable, Optional
+
+from praw.models import Submission
+
+from hon_patch_notes_game_bot.rate_limiter import RateLimiter, RequestPriority
+from hon_patch_notes_game_bot.utils import tprint
+from hon_patch_notes_game_bot.config.config import COMMUNITY_EDIT_MIN_INTERVAL_SECONDS
+
+
+class SubmissionEditCoalescer:
+    def __init__(
+        self,
+        submission: Submission,
+        render_body: Callable[[], str],
+        min_interval_seconds: float = COMMUNITY_EDIT_MIN_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            submission: the PRAW submission to edit
+            render_body: a function that renders the latest submission body
+            min_interval_seconds: the minimum time between two edits published by request_edit()
+            clock: a monotonic clock function (can be replaced in tests)
+            rate_limiter: the shared rate limiter to pace the edit API calls with
+        """
+        self.submission = submission
+        self.render_body = render_body
+        self.min_interval_seconds = min_interval_seconds
+        self.clock = clock
+        self.rate_limiter = rate_limiter
+
+        # Metrics
+        self.edits_requested = 0
+        self.edits_published = 0
+
+        self._has_pending_edit = False
+        self._last_publish_time: Optional[float] = None
+
+    @property
+    def edits_saved(self) -> int:
+        """
+        The number of edit API calls avoided by coalescing edit requests
+        """
+        return self.edits_requested - self.edits_published
+
+    @property
+    def has_pending_edit(self) -> bool:
+        return self._has_pending_edit
+
+    def request_edit(self) -> bool:
+        """
+        Marks the submission body as changed.
+        The edit is published immediately only if the last edit is older than the minimum interval.
+
+        This is called while a guess is processed, so a failed edit is logged & stays pending
+            instead of failing the guess (see safe_publish()).
+
+        Returns:
+            True if the edit was published
+            False if it is pending (see publish())
+        """
+        self.edits_requested += 1
+        self._has_pending_edit = True
+
+        if (
+            self._last_publish_time is not None
+            and self.clock() - self._last_publish_time < self.min_interval_seconds
+        ):
+            return False
+
+        return self.safe_publish()
+
+    def publish(self) -> bool:
+        """
+        Publishes the pending edit (if there is one), regardless of the minimum interval.
+        This should be called at the end of every core loop pass & when the game ends.
+
+        Returns:
+            True if an edit was published
+            False otherwise
+        """
+        if not self._has_pending_edit:
+            return False
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(RequestPriority.EDIT)
+        self.submission.edit(body=self.render_body())
+        self._has_pending_edit = False
+        self._last_publish_time = self.clock()
+        self.edits_published += 1
+        return True
+
+    def safe_publish(self) -> bool:
+        """
+        Same as publish(), but logs errors instead of raising them (the edit stays pending)
+        """
+        try:
+            return self.publish()
+        except Exception as error:
+            tprint(
+                f"Unable to edit submission (will retry on the next publish): {error}"
+            )
+            return False
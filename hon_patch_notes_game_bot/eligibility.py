@@ -0,0 +1,174 @@
+#!/usr/bin/python
+"""
+This module contains the eligibility checks of the Redditors that post guesses.
+
+Loading a Redditor's account stats costs an API request, so the fetched stats are cached per username
+    in the database for a configurable amount of time (TTL). Repeat guessers are then checked without a network call.
+The verdict is recomputed from the cached stats on every check, since the account age keeps changing.
+"""
+import time
+from enum import Enum
+from typing import Callable, NamedTuple
+
+from praw.models import Redditor
+
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.config.config import (
+    ELIGIBILITY_CACHE_TTL_SECONDS,
+    MIN_ACCOUNT_AGE_DAYS,
+    MIN_COMMENT_KARMA,
+    MIN_LINK_KARMA,
+)
+
+DAYS_TO_SECONDS = 86400
+
+
+class EligibilityVerdict(Enum):
+    ELIGIBLE = "eligible"
+    UNVERIFIED_EMAIL = "unverified_email"
+    LOW_KARMA = "low_karma"
+    ACCOUNT_TOO_NEW = "account_too_new"
+
+
+class RedditorProfile(NamedTuple):
+    """
+    The account stats of a Redditor that the eligibility checks are based on
+    """
+
+    name: str
+    has_verified_email: bool
+    comment_karma: int
+    link_karma: int
+    created_utc: float
+    fetched_at: float
+
+    @classmethod
+    def from_redditor(cls, redditor: Redditor, fetched_at: float):
+        """
+        Loads the account stats of a PRAW Redditor (the first attribute access fetches the Redditor)
+        """
+        return cls(
+            name=redditor.name,
+            has_verified_email=bool(redditor.has_verified_email),
+            comment_karma=redditor.comment_karma,
+            link_karma=redditor.link_karma,
+            created_utc=redditor.created_utc,
+            fetched_at=fetched_at,
+        )
+
+
+def is_account_too_new(created_utc: float, days: int, now: float) -> bool:
+    """
+    Checks if a Reddit account is too new to post
+
+    Attributes:
+        created_utc: the creation time of the account (UNIX timestamp, in seconds)
+        days: the number of days in the past to act as the threshold
+        now: the current UNIX timestamp (in seconds)
+
+    Returns:
+        True if the account is too new to post
+        False if the account is old enough to post
+    """
+    return created_utc > now - (days * DAYS_TO_SECONDS)
+
+
+def get_eligibility_verdict(profile: RedditorProfile, now: float) -> EligibilityVerdict:
+    """
+    Checks if a Redditor is allowed to post based on their account stats
+
+    Attributes:
+        profile: the account stats of the Redditor
+        now: the current UNIX timestamp (in seconds)
+
+    Returns:
+        The eligibility verdict (the first failed check, if any)
+    """
+    # Deter Reddit throwaway accounts from participating
+    if not profile.has_verified_email:
+        return EligibilityVerdict.UNVERIFIED_EMAIL
+
+    if (
+        profile.comment_karma < MIN_COMMENT_KARMA
+        and profile.link_karma < MIN_LINK_KARMA
+    ):
+        return EligibilityVerdict.LOW_KARMA
+
+    if is_account_too_new(profile.created_utc, MIN_ACCOUNT_AGE_DAYS, now):
+        return EligibilityVerdict.ACCOUNT_TOO_NEW
+
+    return EligibilityVerdict.ELIGIBLE
+
+
+class EligibilityCache:
+    def __init__(
+        self,
+        database: Database,
+        ttl_seconds: float = ELIGIBILITY_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            database: the database that persists the cached account stats
+            ttl_seconds: the time that cached account stats stay valid for (0 or lower disables the cache)
+            clock: the function returning the current UNIX timestamp (in seconds)
+        """
+        self.database = database
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def has_valid_profile(self, name: str) -> bool:
+        """
+        Checks if the cached account stats of a Redditor can be used (i.e. get_profile() will not fetch the Redditor)
+        """
+        cached_profile = self.database.get_redditor_profile(name)
+        return (
+            cached_profile is not None
+            and self.clock() - cached_profile["fetched_at"] < self.ttl_seconds
+        )
+
+    def get_profile(self, redditor: Redditor) -> RedditorProfile:
+        """
+        Gets the account stats of a Redditor, from the cache if they are still valid
+
+        Attributes:
+            redditor: a PRAW Redditor instance (only fetched if the cache has no valid entry)
+
+        Returns:
+            The account stats of the Redditor
+        """
+        now = self.clock()
+        cached_profile = self.database.get_redditor_profile(redditor.name)
+        if (
+            cached_profile is not None
+            and now - cached_profile["fetched_at"] < self.ttl_seconds
+        ):
+            self.hits += 1
+            return RedditorProfile(
+                **{field: cached_profile[field] for field in RedditorProfile._fields}
+            )
+
+        self.misses += 1
+        profile = RedditorProfile.from_redditor(redditor, fetched_at=now)
+        self.database.set_redditor_profile(
+            dict(profile._asdict(), verdict=get_eligibility_verdict(profile, now).value)
+        )
+        return profile
+
+    def get_verdict(self, redditor: Redditor) -> EligibilityVerdict:
+        """
+        Checks if a Redditor is allowed to post, using the cached account stats if they are still valid
+
+        Attributes:
+            redditor: a PRAW Redditor instance
+
+        Returns:
+            The eligibility verdict
+        """
+        return get_eligibility_verdict(self.get_profile(redditor), self.clock())
@@ -0,0 +1,74 @@
+#!/usr/bin/python
+"""
+This module contains the game clock, which tells whether the game has ended.
+
+The game end time is parsed once (fuzzy parsing is slow), then converted to a deadline on a monotonic clock,
+    so that the checks made during the core loop are a single float comparison
+    (and are not affected by adjustments of the system's wall clock).
+Both clocks can be injected, e.g. with fake clocks for the unit tests or to replay a game.
+"""
+import time
+from dateutil import tz
+from dateutil.parser import parse
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable
+
+from hon_patch_notes_game_bot.config.config import GAME_END_TIME
+
+
+@lru_cache(maxsize=8)
+def parse_game_end_time(time_string: str) -> datetime:
+    """
+    Parses a game end time string (e.g. "November 27, 2021, 4:00 am UTC")
+
+    Returns:
+        The game end time, as a timezone-aware datetime (times without a timezone are considered to be in UTC)
+    """
+    game_end_datetime = parse(time_string, fuzzy=True)
+    if game_end_datetime.tzinfo is None:
+        game_end_datetime = game_end_datetime.replace(tzinfo=tz.UTC)
+
+    return game_end_datetime
+
+
+class GameClock:
+    def __init__(
+        self,
+        game_end_time: str = GAME_END_TIME,
+        now: Callable[[], datetime] = lambda: datetime.now(tz.UTC),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            game_end_time: the game end time string
+            now: a function returning the current (timezone-aware) wall clock time, used to anchor the deadline
+            clock: a monotonic clock (in seconds), used to check the deadline
+        """
+        self.now = now
+        self.clock = clock
+        self.set_game_end_time(game_end_time)
+
+    def set_game_end_time(self, game_end_time: str):
+        """
+        Sets the game end time & anchors its deadline on the monotonic clock
+        """
+        self.game_end_time = game_end_time
+        self.game_end_datetime = parse_game_end_time(game_end_time)
+        self._deadline = (
+            self.clock() + (self.game_end_datetime - self.now()).total_seconds()
+        )
+
+    @property
+    def seconds_remaining(self) -> float:
+        return max(self._deadline - self.clock(), 0.0)
+
+    def is_expired(self) -> bool:
+        """
+        Returns:
+            True if the present time is later than the game end time
+            False otherwise
+        """
+        return self.clock() > self._deadline
@@ -0,0 +1,70 @@
+#!/usr/bin/python
+"""
+This module contains the guess parser, which reads the guessed patch notes line number from a comment body.
+
+A guess is the first number on the first line of a comment. Guesses outside of the patch notes' line range
+    are rejected by the parser (numbers with too many digits are rejected before being converted),
+    so they never reach the game rules, the database or the patch notes file (see is_out_of_range()).
+"""
+import re
+from typing import Optional
+
+# The first run of digits on the first line (matched from the start of the body, without splitting it into lines)
+FIRST_LINE_NUMBER_PATTERN = re.compile(r"[^\d\n]*(\d+)")
+
+
+def find_first_line_number(comment_body: str) -> Optional[str]:
+    """
+    Returns the digits of the first number on the first line of a comment body (None if there is no number)
+    """
+    number_match = FIRST_LINE_NUMBER_PATTERN.match(comment_body)
+    if number_match is None:
+        return None
+
+    return number_match.group(1)
+
+
+class GuessParser:
+    def __init__(self, total_line_count: int):
+        """
+        Parametrized constructor
+
+        Attributes:
+            total_line_count: the total number of lines in the patch notes file (the highest valid guess)
+        """
+        self.total_line_count = total_line_count
+        self.max_digit_count = len(str(total_line_count))
+
+    def parse(self, comment_body: str) -> Optional[int]:
+        """
+        Parses the guessed patch notes line number from a comment body
+
+        Returns:
+            The guessed line number
+            None if the comment does not contain a guess, or if the line number does not exist in the patch notes
+        """
+        digits = find_first_line_number(comment_body)
+        if digits is None:
+            return None
+
+        digits = digits.lstrip("0")
+        if digits == "" or len(digits) > self.max_digit_count:
+            return None
+
+        line_number = int(digits)
+        if line_number > self.total_line_count:
+            return None
+
+        return line_number
+
+    def is_out_of_range(self, comment_body: str) -> bool:
+        """
+        Checks whether a comment body contains a line number that does not exist in the patch notes
+
+        Returns:
+            True if the comment contains a number that parse() rejects, False otherwise
+        """
+        return (
+            self.parse(comment_body) is None
+            and find_first_line_number(comment_body) is not None
+        )
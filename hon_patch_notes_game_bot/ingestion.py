@@ -0,0 +1,243 @@
+#!/usr/bin/python
+"""
+This module contains the ingestion backends that fetch the comments to be processed as guesses by the core loop.
+
+- InboxIngestion: polls the bot's unread inbox items (replies to the bot & comments on its submissions)
+- SubmissionStreamIngestion: polls the main submission's top-level comments & the replies to the bot's comments
+
+Both backends expose the same interface:
+- fetch_comments(): yields the main submission's comments that have not been fetched yet
+- mark_handled(comment): records that a yielded comment was processed (once its processed id is written)
+- pending_acknowledgements: the number of handled items that have not been acknowledged yet
+- acknowledge(): marks the handled items as read (the core loop persists its state first)
+
+A yielded comment is only acknowledged once marked as handled, so a comment whose processing raised
+    is fetched again in the next pass.
+"""
+from typing import Iterator, List, Optional, Set
+
+from praw import Reddit
+from praw.models import Comment, MoreComments, Submission
+from praw.models.comment_forest import CommentForest
+
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.rate_limiter import RateLimiter, RequestPriority
+from hon_patch_notes_game_bot.utils import tprint
+from hon_patch_notes_game_bot.config.config import (
+    MARK_READ_BATCH_SIZE,
+    STREAM_COMMENT_LIMIT,
+)
+
+STREAM_HIGH_WATER_MARK_KEY = "stream_high_water_mark"
+
+
+class InboxIngestion:
+    def __init__(
+        self,
+        reddit: Reddit,
+        submission: Submission,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            reddit: the PRAW Reddit instance
+            submission: the main submission
+            rate_limiter: the rate limiter shared by all outbound Reddit API calls
+        """
+        self.reddit = reddit
+        self.submission = submission
+        self.rate_limiter = rate_limiter
+        self._unacknowledged_items: List = []
+
+    @property
+    def pending_acknowledgements(self) -> int:
+        return len(self._unacknowledged_items)
+
+    def fetch_comments(self) -> Iterator[Comment]:
+        """
+        Yields the unread inbox items that are comments on the main submission.
+
+        Irrelevant inbox items are marked as read by the next acknowledge() call,
+            while the yielded comments are only marked as read once handled (see mark_handled()).
+        """
+        for unread_item in self.reddit.inbox.unread(limit=None):
+            # Only yield the unread item if it belongs to the current thread
+            if (
+                isinstance(unread_item, Comment)
+                and unread_item.submission.id == self.submission.id
+            ):
+                yield unread_item
+            else:
+                self._unacknowledged_items.append(unread_item)
+
+    def mark_handled(self, comment: Comment):
+        """
+        Queues a yielded comment to be marked as read by the next acknowledge() call
+        """
+        self._unacknowledged_items.append(comment)
+
+    def acknowledge(self):
+        """
+        Marks the fetched inbox items as read in batches of MARK_READ_BATCH_SIZE (one API call per batch).
+
+        Errors are logged, since processed comments that are not marked as read are skipped in the next pass anyway.
+        """
+        items, self._unacknowledged_items = self._unacknowledged_items, []
+        if len(items) == 0:
+            return
+
+        try:
+            for index in range(0, len(items), MARK_READ_BATCH_SIZE):
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(RequestPriority.MARK_READ)
+                self.reddit.inbox.mark_read(items[index : index + MARK_READ_BATCH_SIZE])
+        except Exception as error:
+            tprint(f"Unable to mark {len(items)} inbox item(s) as read: {error}")
+
+
+class SubmissionStreamIngestion:
+    def __init__(
+        self,
+        reddit: Reddit,
+        submission: Submission,
+        database: Database,
+        bot_username: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        comment_limit: int = STREAM_COMMENT_LIMIT,
+    ):
+        """
+        Parametrized constructor
+
+        The comments addressed to the bot are polled from two listings (newest first) in each fetch_comments() call:
+        - the main submission's top-level comments
+        - the replies to the bot's comments on the main submission, from the bot's inbox.
+            Replies can be nested anywhere in the submission's comment tree (e.g. under older comments,
+            or behind "continue this thread" links), so they are not reliably loaded with the submission.
+        The rest of the subreddit's comments are not fetched, & inbox items are not marked as read.
+
+        The creation time of the newest handled comment is persisted in the database as a high-water mark,
+            so comments from before a restart are skipped without being processed again.
+
+        Attributes:
+            reddit: the PRAW Reddit instance
+            submission: the main submission
+            database: the database to persist the high-water mark in
+            bot_username: the username of the bot
+            rate_limiter: the rate limiter shared by all outbound Reddit API calls
+            comment_limit: the number of top-level comments requested per poll of the main submission
+        """
+        self.reddit = reddit
+        self.submission = submission
+        self.database = database
+        self.bot_username = bot_username
+        self.rate_limiter = rate_limiter
+        self.comment_limit = comment_limit
+
+        # The comments created at the high-water mark that have been handled (comments created in the same second
+        #   are fetched again by the next polls, since they may have been posted after the previous poll)
+        self._handled_at_high_water_mark: Set[str] = set()
+        self._pending_acknowledgements = 0
+
+        high_water_mark = self.database.get_metadata(STREAM_HIGH_WATER_MARK_KEY)
+        self.high_water_mark: float = (
+            float(high_water_mark) if high_water_mark is not None else 0.0
+        )
+
+    @property
+    def pending_acknowledgements(self) -> int:
+        return self._pending_acknowledgements
+
+    def _acquire(self):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(RequestPriority.FETCH)
+
+    def _is_bot_comment(self, comment: Comment) -> bool:
+        return comment.author is not None and comment.author.name == self.bot_username
+
+    def _has_hidden_new_comments(self, comment_forest: CommentForest) -> bool:
+        """
+        Checks if the top-level comments newer than the high-water mark may not all be loaded yet,
+            i.e. if there is a "load more comments" link & all the loaded top-level comments are newer than the mark
+        """
+        has_more_comments = False
+        for top_level_comment in comment_forest:
+            if isinstance(top_level_comment, MoreComments):
+                has_more_comments = True
+            elif top_level_comment.created_utc < self.high_water_mark:
+                return False
+
+        return has_more_comments
+
+    def _poll_top_level_comments(self) -> List[Comment]:
+        """
+        Fetches the main submission's top-level comments, newest first
+        """
+        self._acquire()
+        submission = self.reddit.submission(id=self.submission.id)
+        submission.comment_sort = "new"
+        submission.comment_limit = self.comment_limit
+        comment_forest = submission.comments
+
+        # After a burst of comments, load the hidden ones instead of skipping guesses (one request per link)
+        while self._has_hidden_new_comments(comment_forest):
+            self._acquire()
+            comment_forest.replace_more(limit=1)
+
+        return [
+            comment
+            for comment in comment_forest
+            if not isinstance(comment, MoreComments)
+        ]
+
+    def _poll_replies_to_bot(self) -> List[Comment]:
+        """
+        Fetches the replies to the bot's comments on the main submission from the bot's inbox,
+            newest first & down to the high-water mark
+        """
+        self._acquire()
+        replies = []
+        for reply in self.reddit.inbox.comment_replies(limit=None):
+            if reply.created_utc < self.high_water_mark:
+                break
+
+            if reply.link_id == self.submission.fullname:
+                replies.append(reply)
+
+        return replies
+
+    def fetch_comments(self) -> Iterator[Comment]:
+        """
+        Yields the main submission's comments addressed to the bot that have not been handled yet, oldest first
+        """
+        new_comments = [
+            comment
+            for comment in self._poll_top_level_comments() + self._poll_replies_to_bot()
+            if not self._is_bot_comment(comment)
+            and comment.created_utc >= self.high_water_mark
+            and comment.fullname not in self._handled_at_high_water_mark
+        ]
+        new_comments.sort(key=lambda comment: comment.created_utc)
+        yield from new_comments
+
+    def mark_handled(self, comment: Comment):
+        """
+        Advances the high-water mark up to a yielded comment (persisted by the next acknowledge() call)
+        """
+        if comment.created_utc > self.high_water_mark:
+            self.high_water_mark = comment.created_utc
+            self._handled_at_high_water_mark.clear()
+        if comment.created_utc == self.high_water_mark:
+            self._handled_at_high_water_mark.add(comment.fullname)
+        self._pending_acknowledgements += 1
+
+    def acknowledge(self):
+        """
+        Persists the high-water mark of the handled comments
+        """
+        if self._pending_acknowledgements == 0:
+            return
+
+        self.database.set_metadata(STREAM_HIGH_WATER_MARK_KEY, self.high_water_mark)
+        self._pending_acknowledgements = 0
@@ -0,0 +1,116 @@
+#!/usr/bin/python
+"""
+This module contains a precomputed table that classifies every patch notes line number by its guess outcome.
+
+Since the patch notes do not change during a game, the table is built once at startup,
+    so classifying a guess is a single lookup instead of a line read & substring searches.
+"""
+from enum import Enum
+from typing import NamedTuple, Optional, Tuple
+
+from hon_patch_notes_game_bot.patch_notes_file_handler import PatchNotesFile
+from hon_patch_notes_game_bot.config.config import (
+    BLANK_LINE_REPLACEMENT,
+    INVALID_LINE_STRINGS,
+)
+
+
+class LineOutcome(Enum):
+    VALID = "valid"
+    BLANK = "blank"
+    INVALID = "invalid"
+    OUT_OF_RANGE = "out_of_range"
+
+
+class LineClassification(NamedTuple):
+    """
+    Attributes:
+        outcome: the outcome of a guess for the line
+        line_content: the raw line content (None for blank & out of range lines)
+        invalid_string: the first entry of INVALID_LINE_STRINGS found in the line (INVALID lines only)
+        reveal_text: the text revealed in the community-compiled patch notes for the line
+    """
+
+    outcome: LineOutcome
+    line_content: Optional[str] = None
+    invalid_string: Optional[str] = None
+    reveal_text: str = BLANK_LINE_REPLACEMENT
+
+
+OUT_OF_RANGE_CLASSIFICATION = LineClassification(outcome=LineOutcome.OUT_OF_RANGE)
+
+
+def classify_line_content(line_content: Optional[str]) -> LineClassification:
+    """
+    Classifies the content of a single patch notes line
+
+    Attributes:
+        line_content: the content of the line, as returned by PatchNotesFile.get_content_from_line_number()
+
+    Returns:
+        The LineClassification of the line
+    """
+    if line_content is None:
+        return LineClassification(outcome=LineOutcome.BLANK)
+
+    for invalid_string in INVALID_LINE_STRINGS:
+        if invalid_string in line_content:
+            return LineClassification(
+                outcome=LineOutcome.INVALID,
+                line_content=line_content,
+                invalid_string=invalid_string,
+                reveal_text=line_content.rstrip(),
+            )
+
+    return LineClassification(
+        outcome=LineOutcome.VALID,
+        line_content=line_content,
+        reveal_text=line_content.rstrip(),
+    )
+
+
+class LineClassificationTable:
+    def __init__(self, patch_notes_file: PatchNotesFile):
+        """
+        Parametrized constructor
+
+        Attributes:
+            patch_notes_file: the PatchNotesFile instance to classify the lines of
+        """
+        # Index 0 is unused so that the table can be indexed by line number directly
+        self._table: Tuple[LineClassification, ...] = (
+            OUT_OF_RANGE_CLASSIFICATION,
+        ) + tuple(
+            classify_line_content(
+                patch_notes_file.get_content_from_line_number(line_number)
+            )
+            for line_number in range(1, patch_notes_file.get_total_line_count() + 1)
+        )
+
+        self.valid_line_count = sum(
+            1 for entry in self._table if entry.outcome is LineOutcome.VALID
+        )
+        self.invalid_line_count = sum(
+            1 for entry in self._table if entry.outcome is LineOutcome.INVALID
+        )
+        self.blank_line_count = sum(
+            1 for entry in self._table if entry.outcome is LineOutcome.BLANK
+        )
+
+    def __len__(self) -> int:
+        """
+        Returns the number of classified lines (i.e. the total line count of the patch notes file)
+        """
+        return len(self._table) - 1
+
+    def classify(self, line_number: int) -> LineClassification:
+        """
+        Gets the precomputed classification of a line number
+
+        Returns:
+            The LineClassification of the line number (OUT_OF_RANGE if it does not exist in the patch notes)
+        """
+        if line_number < 1 or line_number >= len(self._table):
+            return OUT_OF_RANGE_CLASSIFICATION
+
+        return self._table[line_number]
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+"""
+This module contains a compact, in-memory tracker of the patch notes line numbers that have been guessed
+"""
+from typing import Iterable, Iterator
+
+
+class GuessedLineTracker:
+    def __init__(self, size: int = 0, line_numbers: Iterable[int] = ()):
+        """
+        Parametrized constructor
+
+        Guessed line numbers are stored in a bitmap (1 bit per line number) with a running count,
+        so membership checks and the revealed line count are O(1) operations.
+
+        Attributes:
+            size: the expected highest line number (e.g. the total line count of the patch notes file).
+                The bitmap grows automatically if a higher line number is added.
+            line_numbers: the line numbers that have already been guessed
+        """
+        self._bitmap = bytearray((max(size, 0) >> 3) + 1)
+        self._count = 0
+
+        for line_number in line_numbers:
+            self.add(line_number)
+
+    def __contains__(self, line_number: object) -> bool:
+        if not isinstance(line_number, int) or line_number < 0:
+            return False
+
+        byte_index = line_number >> 3
+        if byte_index >= len(self._bitmap):
+            return False
+
+        return bool(self._bitmap[byte_index] & (1 << (line_number & 7)))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Iterates over the guessed line numbers in ascending order
+        """
+        for byte_index, byte in enumerate(self._bitmap):
+            if byte == 0:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield (byte_index << 3) + bit
+
+    def add(self, line_number: int) -> bool:
+        """
+        Marks a line number as guessed
+
+        Returns:
+            True if the line number was newly added
+            False if it was already marked as guessed
+        """
+        if line_number < 0:
+            raise ValueError(f"Invalid patch notes line number: {line_number}")
+
+        if line_number in self:
+            return False
+
+        byte_index = line_number >> 3
+        if byte_index >= len(self._bitmap):
+            # Grow geometrically to keep repeated out-of-range additions cheap
+            new_size = max(byte_index + 1, 2 * len(self._bitmap))
+            self._bitmap.extend(bytes(new_size - len(self._bitmap)))
+
+        self._bitmap[byte_index] |= 1 << (line_number & 7)
+        self._count += 1
+        return True
+
+    def remove(self, line_number: int) -> bool:
+        """
+        Unmarks a guessed line number
+
+        Returns:
+            True if the line number was removed
+            False if it was not marked as guessed
+        """
+        if line_number not in self:
+            return False
+
+        self._bitmap[line_number >> 3] &= ~(1 << (line_number & 7)) & 0xFF
+        self._count -= 1
+        return True
@@ -1,16 +1,28 @@
 #!/usr/bin/python
-import praw
+import asyncio
 import time
 
+from hon_patch_notes_game_bot.client import RequestTimingStats, create_reddit
+from hon_patch_notes_game_bot.community_document import build_community_document
 from hon_patch_notes_game_bot.core import Core
 from hon_patch_notes_game_bot.communications import init_submissions
 from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.ingestion import (
+    InboxIngestion,
+    SubmissionStreamIngestion,
+)
+from hon_patch_notes_game_bot.line_classifier import LineClassificationTable
 from hon_patch_notes_game_bot.patch_notes_file_handler import PatchNotesFile
+from hon_patch_notes_game_bot.poll_interval import AdaptivePollInterval
+from hon_patch_notes_game_bot.rate_limiter import RateLimiter
+from hon_patch_notes_game_bot.storage import create_storage_backend
 from hon_patch_notes_game_bot.config.config import (
     BOT_USERNAME,
     COMMUNITY_SUBMISSION_CONTENT_PATH,
+    ENGINE,
+    INGESTION_MODE,
     PATCH_NOTES_PATH,
-    SLEEP_INTERVAL_SECONDS,
+    REPLY_WORKER_COUNT,
     SUBREDDIT_NAME,
     SUBMISSION_CONTENT_PATH,
     USER_AGENT,
@@ -24,13 +36,20 @@ def main():
     """
 
     # Initialize bot by creating reddit & subreddit instances
-    reddit = praw.Reddit(BOT_USERNAME, user_agent=USER_AGENT)
-    reddit.validate_on_submit = True
+    # All outbound Reddit API calls share one rate limiter, which is fed by the rate-limit response headers,
+    #   & go through a tuned HTTP session (see client.py)
+    rate_limiter = RateLimiter()
+    timing_stats = RequestTimingStats()
+    reddit = create_reddit(rate_limiter, timing_stats)
     subreddit = reddit.subreddit(SUBREDDIT_NAME)
 
     # Initialize other variables
-    database = Database()
     patch_notes_file = PatchNotesFile(PATCH_NOTES_PATH)
+    database = Database(
+        total_line_count=patch_notes_file.get_total_line_count(),
+        backend=create_storage_backend(),
+    )
+    line_classifications = LineClassificationTable(patch_notes_file)
 
     # Initialize submissions (i.e. Reddit threads)
     submission, community_submission = init_submissions(
@@ -40,8 +59,17 @@ def main():
         patch_notes_file,
         SUBMISSION_CONTENT_PATH,
         COMMUNITY_SUBMISSION_CONTENT_PATH,
+        line_classifications,
     )
 
+    # Select how new comments are fetched
+    if INGESTION_MODE == "stream":
+        ingestion = SubmissionStreamIngestion(
+            reddit, submission, database, BOT_USERNAME, rate_limiter
+        )
+    else:
+        ingestion = InboxIngestion(reddit, submission, rate_limiter)
+
     # Create core object
     core = Core(
         reddit=reddit,
@@ -49,27 +77,140 @@ def main():
         submission=submission,
         community_submission=community_submission,
         patch_notes_file=patch_notes_file,
+        community_document=build_community_document(
+            COMMUNITY_SUBMISSION_CONTENT_PATH, patch_notes_file, submission.url
+        ),
+        rate_limiter=rate_limiter,
+        ingestion=ingestion,
+        line_classifications=line_classifications,
     )
 
-    # ===============================================================
-    # Core loop to listen to unread comment messages on Reddit
-    # ===============================================================
-    tprint("Reddit Bot's core loop started")
-    while 1:
-        if not core.loop():
-            tprint("Reddit Bot script ended via core loop end conditions")
-            break
+    try:
+        # ===============================================================
+        # Core loop to listen to new comments on Reddit
+        # ===============================================================
+        tprint("Reddit Bot's core loop started")
+        poll_interval = AdaptivePollInterval()
+        while 1:
+            if not core.loop():
+                tprint("Reddit Bot script ended via core loop end conditions")
+                break
+
+            # Time to wait before calling the Reddit API again (in seconds),
+            #   shorter while comments are coming in & longer while the bot is idle
+            time.sleep(poll_interval.record_pass(core.last_pass_item_count))
+
+        # ========================
+        # Bot end script actions
+        # ========================
+        tprint("Performing actions after the game has ended...")
+        core.perform_post_game_actions()
+        tprint("Reddit bot script ended gracefully")
+
+    finally:
+        # Send queued replies & persist any buffered database writes before exiting
+        core.shutdown()
+        database.close()
+        tprint(f"Reddit API request timing stats:\n{timing_stats.summary()}")
+
+
+async def async_main():
+    """
+    Main method for the Reddit bot/script, running on the asyncio engine (requires Async PRAW)
+    """
+    # Async PRAW is an optional dependency, only needed by the asyncio engine
+    try:
+        import aiohttp
+        import asyncpraw
+    except ImportError as error:
+        raise ImportError(
+            'ENGINE = "async" requires Async PRAW: pip install asyncpraw'
+        ) from error
+
+    from hon_patch_notes_game_bot.async_communications import init_submissions_async
+    from hon_patch_notes_game_bot.async_core import AsyncCore
+
+    # All requests go through one connection pool & share one rate limiter,
+    #   which is fed by the rate-limit response headers
+    rate_limiter = RateLimiter()
+
+    async def on_request_end(session, trace_config_ctx, params):
+        rate_limiter.update_from_headers(params.response.headers)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_end.append(on_request_end)
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=max(REPLY_WORKER_COUNT, 1)),
+        trace_configs=[trace_config],
+    )
+    reddit = asyncpraw.Reddit(
+        BOT_USERNAME, user_agent=USER_AGENT, requestor_kwargs={"session": http_session},
+    )
+    reddit.validate_on_submit = True
+    subreddit = await reddit.subreddit(SUBREDDIT_NAME)
+
+    # Initialize other variables
+    patch_notes_file = PatchNotesFile(PATCH_NOTES_PATH)
+    database = Database(
+        total_line_count=patch_notes_file.get_total_line_count(),
+        backend=create_storage_backend(),
+    )
+    line_classifications = LineClassificationTable(patch_notes_file)
+
+    try:
+        # Initialize submissions (i.e. Reddit threads)
+        submission, community_submission = await init_submissions_async(
+            reddit,
+            subreddit,
+            database,
+            patch_notes_file,
+            SUBMISSION_CONTENT_PATH,
+            COMMUNITY_SUBMISSION_CONTENT_PATH,
+            line_classifications,
+        )
+
+        # Create core object
+        core = AsyncCore(
+            reddit=reddit,
+            db=database,
+            submission=submission,
+            community_submission=community_submission,
+            patch_notes_file=patch_notes_file,
+            comment_class=asyncpraw.models.Comment,
+            community_document=build_community_document(
+                COMMUNITY_SUBMISSION_CONTENT_PATH, patch_notes_file, submission.url
+            ),
+            rate_limiter=rate_limiter,
+            line_classifications=line_classifications,
+        )
+
+        try:
+            tprint("Reddit Bot's core loop started (asyncio engine)")
+            poll_interval = AdaptivePollInterval()
+            while 1:
+                if not await core.loop_async():
+                    tprint("Reddit Bot script ended via core loop end conditions")
+                    break
+
+                await asyncio.sleep(
+                    poll_interval.record_pass(core.last_pass_item_count)
+                )
+
+            tprint("Performing actions after the game has ended...")
+            await core.perform_post_game_actions_async()
+            tprint("Reddit bot script ended gracefully")
 
-        # Time to wait before calling the Reddit API again (in seconds)
-        time.sleep(SLEEP_INTERVAL_SECONDS)
+        finally:
+            # Send scheduled replies & edits before exiting
+            await core.shutdown_async()
 
-    # ========================
-    # Bot end script actions
-    # ========================
-    tprint("Performing actions after the game has ended...")
-    core.perform_post_game_actions()
-    tprint("Reddit bot script ended gracefully")
+    finally:
+        database.close()
+        await reddit.close()
 
 
 if __name__ == "__main__":
-    main()
+    if ENGINE == "async":
+        asyncio.run(async_main())
+    else:
+        main()
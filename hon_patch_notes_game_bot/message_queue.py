@@ -0,0 +1,294 @@
+#!/usr/bin/python
+"""
+This module contains the outbound Private Message (PM) queue used to message the staff members & winners.
+
+- Messages are persisted in the database before they are sent, keyed by an idempotency key
+    (e.g. "winner:<version>:<username>"). A message that was sent is never sent again, even after a restart,
+    and the reward code assigned to a winner's message is kept with it.
+    The queued messages & the outcome of every sent (or failed) message are flushed to disk right away,
+    bypassing the database's write-behind buffer (there are only a few hundred messages).
+- Messages are sent concurrently by a pool of worker threads (or by asyncio tasks, see dispatch_async()),
+    paced by the shared rate limiter.
+- Rate-limited messages are retried in rounds, after waiting for the rate limit duration parsed from the error,
+    up to a maximum number of attempts. Other errors are not retried.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from praw import Reddit
+from praw.exceptions import RedditAPIException
+
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.rate_limiter import (
+    RateLimiter,
+    RequestPriority,
+    parse_rate_limit_seconds,
+)
+from hon_patch_notes_game_bot.utils import tprint
+from hon_patch_notes_game_bot.config.config import PM_MAX_ATTEMPTS, PM_WORKER_COUNT
+
+
+class MessageStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class DispatchResult(NamedTuple):
+    sent: int
+    failed: int
+    pending: int
+
+
+class OutboundMessageQueue:
+    def __init__(
+        self,
+        reddit: Reddit,
+        database: Optional[Database] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        num_workers: int = PM_WORKER_COUNT,
+        max_attempts: int = PM_MAX_ATTEMPTS,
+        sleep: Optional[Callable[[float], None]] = None,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            reddit: the PRAW Reddit instance (an Async PRAW Reddit instance if the messages are sent with dispatch_async())
+            database: the database to persist the messages in (if None, the messages are only kept in memory)
+            rate_limiter: the rate limiter shared by all outbound Reddit API calls
+            num_workers: the number of worker threads (or asyncio tasks) sending messages
+            max_attempts: the number of attempts of a rate-limited message before it is marked as failed
+            sleep: a sleep function (defaults to time.sleep), used to wait between retry rounds without a rate limiter
+        """
+        self.reddit = reddit
+        self.database = database
+        self.rate_limiter = rate_limiter
+        self.num_workers = max(num_workers, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.sleep = sleep
+
+        self._messages: Dict[str, Dict] = {}
+        if self.database is not None:
+            for message in self.database.get_outbound_messages():
+                self._messages[message["key"]] = dict(message)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._messages.get(key)
+
+    def _save(self, message: Dict):
+        self._messages[message["key"]] = message
+        if self.database is not None:
+            self.database.set_outbound_message(message)
+
+            # A crash must not lose the outcome of a message, which would send it again after a restart
+            if message["status"] != MessageStatus.PENDING.value:
+                self.database.flush()
+
+    def enqueue(
+        self,
+        key: str,
+        recipient: str,
+        subject: str,
+        body: str,
+        reward_code: Optional[str] = None,
+    ) -> bool:
+        """
+        Adds a message to the queue, unless a message with the same idempotency key was already queued
+
+        Returns:
+            True if the message was added
+            False if it was already queued (or sent)
+        """
+        if key in self._messages:
+            return False
+
+        self._save(
+            {
+                "key": key,
+                "recipient": recipient,
+                "subject": subject,
+                "body": body,
+                "reward_code": reward_code,
+                "status": MessageStatus.PENDING.value,
+                "attempts": 0,
+            }
+        )
+        return True
+
+    def _send(self, message: Dict) -> Tuple[MessageStatus, float]:
+        """
+        Sends a message (from a worker thread)
+
+        Returns:
+            A tuple containing the outcome of the attempt & the seconds to wait before retrying it (if rate limited)
+        """
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(RequestPriority.PRIVATE_MESSAGE)
+            self.reddit.redditor(message["recipient"]).message(
+                subject=message["subject"], message=message["body"]
+            )
+            return MessageStatus.SENT, 0
+
+        except Exception as error:
+            return self._get_error_outcome(error)
+
+    async def _send_async(self, message: Dict) -> Tuple[MessageStatus, float]:
+        """
+        Same as _send(), with an Async PRAW Reddit instance (from an asyncio task)
+        """
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(RequestPriority.PRIVATE_MESSAGE)
+            redditor = await self.reddit.redditor(message["recipient"])
+            await redditor.message(subject=message["subject"], message=message["body"])
+            return MessageStatus.SENT, 0
+
+        except Exception as error:
+            return self._get_error_outcome(error)
+
+    def _get_error_outcome(self, error: Exception) -> Tuple[MessageStatus, float]:
+        """
+        Gets the outcome of a message whose attempt raised an error (only rate-limited messages are retried)
+        """
+        # Reddit API exceptions (of PRAW & Async PRAW) contain the error items returned by Reddit
+        for subException in getattr(error, "items", []):
+            if subException.error_type == "RATELIMIT":
+                retry_seconds = parse_rate_limit_seconds(subException.message)
+                return (
+                    MessageStatus.PENDING,
+                    retry_seconds if retry_seconds is not None else 60,
+                )
+
+        if isinstance(error, RedditAPIException):
+            tprint(f"RedditAPIException encountered: {error}")
+        else:
+            tprint(f"General Exception encountered: {error}")
+        return MessageStatus.FAILED, 0
+
+    def _get_pending_messages(self) -> List[Dict]:
+        return [
+            message
+            for message in self._messages.values()
+            if message["status"] == MessageStatus.PENDING.value
+            and message["attempts"] < self.max_attempts
+        ]
+
+    def _record_outcomes(
+        self,
+        pending_messages: List[Dict],
+        outcomes: Iterable[Tuple[MessageStatus, float]],
+    ) -> float:
+        """
+        Persists the outcomes of a round, as soon as each of them is known
+
+        Returns:
+            The number of seconds to wait before the next round (0 if no message was rate limited)
+        """
+        retry_seconds = 0.0
+        for message, (status, seconds) in zip(pending_messages, outcomes):
+            message = dict(message, attempts=message["attempts"] + 1)
+            if status == MessageStatus.SENT:
+                message["status"] = MessageStatus.SENT.value
+                tprint(
+                    f"Message sent to {message['recipient']} ({message['key']})"
+                    + (
+                        f", with code: {message['reward_code']}"
+                        if message["reward_code"] is not None
+                        else ""
+                    )
+                )
+            elif status == MessageStatus.FAILED or (
+                message["attempts"] >= self.max_attempts
+            ):
+                message["status"] = MessageStatus.FAILED.value
+                tprint(
+                    f"{message['recipient']} was not sent a message ({message['key']}), will not retry"
+                )
+            else:
+                retry_seconds = max(retry_seconds, seconds)
+            self._save(message)
+
+        if self.database is not None:
+            self.database.flush()
+
+        if retry_seconds > 0:
+            tprint(
+                f"Rate limited: retrying the pending messages in {retry_seconds} seconds"
+            )
+            if self.rate_limiter is not None:
+                self.rate_limiter.penalize(retry_seconds)
+                return 0
+
+        return retry_seconds
+
+    def _get_result(self) -> DispatchResult:
+        statuses = [message["status"] for message in self._messages.values()]
+        return DispatchResult(
+            sent=statuses.count(MessageStatus.SENT.value),
+            failed=statuses.count(MessageStatus.FAILED.value),
+            pending=statuses.count(MessageStatus.PENDING.value),
+        )
+
+    def dispatch(self) -> DispatchResult:
+        """
+        Sends the pending messages concurrently, retrying the rate-limited ones in rounds
+
+        Returns:
+            The number of sent, failed & still pending messages in the queue
+        """
+        # Persist the queued messages before sending any of them
+        if self.database is not None:
+            self.database.flush()
+
+        with ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix="pm-worker"
+        ) as executor:
+            while 1:
+                pending_messages = self._get_pending_messages()
+                if len(pending_messages) == 0:
+                    break
+
+                # Messages are persisted from this thread only, as soon as their outcome is known
+                outcomes = executor.map(self._send, pending_messages)
+
+                # Wait for the rate limit duration before the next round (the rate limiter holds requests back otherwise)
+                retry_seconds = self._record_outcomes(pending_messages, outcomes)
+                if retry_seconds > 0:
+                    (self.sleep or time.sleep)(retry_seconds)
+
+        return self._get_result()
+
+    async def dispatch_async(self) -> DispatchResult:
+        """
+        Same as dispatch(), with the messages sent by asyncio tasks (asyncio engine)
+        """
+        if self.database is not None:
+            self.database.flush()
+
+        worker_slots = asyncio.Semaphore(self.num_workers)
+
+        async def send(message: Dict) -> Tuple[MessageStatus, float]:
+            async with worker_slots:
+                return await self._send_async(message)
+
+        while 1:
+            pending_messages = self._get_pending_messages()
+            if len(pending_messages) == 0:
+                break
+
+            outcomes = await asyncio.gather(
+                *(send(message) for message in pending_messages)
+            )
+            retry_seconds = self._record_outcomes(pending_messages, outcomes)
+            if retry_seconds > 0:
+                await asyncio.sleep(retry_seconds)
+
+        return self._get_result()
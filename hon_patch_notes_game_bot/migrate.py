@@ -0,0 +1,77 @@
+#!/usr/bin/python
+"""
+This module copies the bot's database from the TinyDB JSON file to the SQLite file (see storage.py).
+
+Usage (from the hon_patch_notes_game_bot folder, while the bot is stopped):
+    python migrate.py [tinydb_json_path] [sqlite_path]
+
+Then set DB_BACKEND = "sqlite" in the config.
+"""
+import os
+import sys
+from typing import Dict, List
+
+from hon_patch_notes_game_bot.storage import (
+    StorageBackend,
+    TABLE_KEY_FIELDS,
+    create_storage_backend,
+)
+from hon_patch_notes_game_bot.utils import tprint
+from hon_patch_notes_game_bot.config.config import DB_SQLITE_PATH, DB_TINYDB_PATH
+
+
+def migrate(source: StorageBackend, target: StorageBackend) -> Dict[str, int]:
+    """
+    Copies the documents of every table from a storage backend to another, in a single transaction
+
+    Documents that already exist in the target (with the same key) are replaced.
+    Documents without a key (which the bot never writes) are skipped.
+
+    Returns:
+        The number of documents copied, by table name
+    """
+    copied_counts = {}
+    with target.transaction():
+        for table_name, key_field in TABLE_KEY_FIELDS.items():
+            copied_counts[table_name] = 0
+            for document in source.all(table_name):
+                if key_field not in document:
+                    tprint(f"Skipping a {table_name} document without a {key_field}")
+                    continue
+
+                target.upsert(table_name, document)
+                copied_counts[table_name] += 1
+
+    target.flush()
+    return copied_counts
+
+
+def main(argv: List[str]) -> int:
+    """
+    Main method of the migration script
+
+    Returns:
+        The exit code of the script
+    """
+    source_path = argv[1] if len(argv) > 1 else DB_TINYDB_PATH
+    target_path = argv[2] if len(argv) > 2 else DB_SQLITE_PATH
+    if not os.path.exists(source_path):
+        tprint(f"No database to migrate at: {source_path}")
+        return 1
+
+    source = create_storage_backend("tinydb", source_path)
+    target = create_storage_backend("sqlite", target_path)
+    try:
+        copied_counts = migrate(source, target)
+    finally:
+        source.close()
+        target.close()
+
+    for table_name, copied_count in copied_counts.items():
+        tprint(f"{table_name}: {copied_count} document(s) copied")
+    tprint(f"Database successfully migrated from {source_path} to {target_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,7 +1,6 @@
 #!/usr/bin/python
-import linecache
 from hon_patch_notes_game_bot.config.config import INVALID_LINE_STRINGS
-from typing import List, Optional
+from typing import FrozenSet, List, Optional, Tuple
 
 """
 This module will load in a "patch_notes.txt" and contain methods that performs read-only operations on the file
@@ -13,11 +12,57 @@ class PatchNotesFile:
         """
         Parametrized constructor
 
+        The file is read once into an immutable, indexed structure (see reload()),
+            so none of the query methods below perform any file I/O.
+
         Attributes:
             patch_notes_file_path: path to the patch notes file to be read from
         """
 
         self.patch_notes_file = patch_notes_file_path
+        self.reload()
+
+    def reload(self):
+        """
+        (Re)reads self.patch_notes_file and precomputes the data needed by the query methods:
+        - a tuple of the file's lines (index 0 is line number 1)
+        - the total line count
+        - the set of blank line numbers
+        - the version string
+        """
+        with open(self.patch_notes_file, "r") as file:
+            raw_lines = file.readlines()
+
+        self._blank_line_numbers: FrozenSet[int] = frozenset(
+            line_number
+            for line_number, line in enumerate(raw_lines, start=1)
+            if line == "\n"
+            or any(invalid_entry in line for invalid_entry in INVALID_LINE_STRINGS)
+        )
+
+        # Like linecache, always terminate the last line with a new line character
+        if len(raw_lines) > 0 and not raw_lines[-1].endswith("\n"):
+            raw_lines[-1] += "\n"
+
+        self._lines: Tuple[str, ...] = tuple(raw_lines)
+        self._total_line_count = len(self._lines)
+
+        first_line = self._lines[0] if self._total_line_count > 0 else ""
+        self._version_string = first_line.replace("Version ", "").rstrip()
+
+    @property
+    def lines(self) -> Tuple[str, ...]:
+        """
+        The lines of the patch notes file (index 0 is line number 1)
+        """
+        return self._lines
+
+    @property
+    def blank_line_numbers(self) -> FrozenSet[int]:
+        """
+        The set of blank line numbers (see get_list_of_blank_line_numbers())
+        """
+        return self._blank_line_numbers
 
     def get_content_from_line_number(self, lineNumber: int) -> Optional[str]:
         """
@@ -31,9 +76,12 @@ class PatchNotesFile:
             None: if only whitespace content is found, or if line cannot be found
         """
 
-        lineContent = linecache.getline(self.patch_notes_file, lineNumber)
+        if lineNumber < 1 or lineNumber > self._total_line_count:
+            return None
+
+        lineContent = self._lines[lineNumber - 1]
         # Treat whitespace content as invalid results
-        if lineContent == "\n" or lineContent == "":
+        if lineContent == "\n":
             return None
 
         return lineContent
@@ -46,14 +94,7 @@ class PatchNotesFile:
             Total number of lines from the patch notes file
         """
 
-        tempFile = open(self.patch_notes_file, "r")
-        numLines = 0
-
-        for line in tempFile:
-            numLines += 1
-
-        tempFile.close()
-        return numLines
+        return self._total_line_count
 
     def get_list_of_blank_line_numbers(self) -> List[int]:
         """
@@ -65,16 +106,7 @@ class PatchNotesFile:
             a list of blank line numbers
         """
 
-        tempFile = open(self.patch_notes_file, "r")
-        list_of_blank_line_numbers = []
-
-        for line_number, line in enumerate(tempFile):
-            if line == "\n" or any(
-                invalid_entry in line for invalid_entry in INVALID_LINE_STRINGS
-            ):
-                list_of_blank_line_numbers.append(line_number + 1)
-
-        return list_of_blank_line_numbers
+        return sorted(self._blank_line_numbers)
 
     def get_version_string(self) -> str:
         """
@@ -83,6 +115,4 @@ class PatchNotesFile:
         Returns:
             The version string of the patch notes file
         """
-        line_content = linecache.getline(self.patch_notes_file, 1)
-        version_string = line_content.replace("Version ", "").rstrip()
-        return version_string
+        return self._version_string
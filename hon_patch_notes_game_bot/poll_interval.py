@@ -0,0 +1,72 @@
+#!/usr/bin/python
+"""
+This module contains the adaptive interval that the main loop waits for between core loop passes.
+
+While comments are coming in, passes run at the minimum interval to keep the reply latency low.
+While the bot is idle, the interval backs off exponentially up to a cap to save API calls.
+"""
+from hon_patch_notes_game_bot.utils import tprint
+from hon_patch_notes_game_bot.config.config import (
+    MAX_SLEEP_INTERVAL_SECONDS,
+    MIN_SLEEP_INTERVAL_SECONDS,
+    SLEEP_INTERVAL_BACKOFF_FACTOR,
+    SLEEP_INTERVAL_SECONDS,
+)
+
+
+class AdaptivePollInterval:
+    def __init__(
+        self,
+        initial_seconds: float = SLEEP_INTERVAL_SECONDS,
+        min_seconds: float = MIN_SLEEP_INTERVAL_SECONDS,
+        max_seconds: float = MAX_SLEEP_INTERVAL_SECONDS,
+        backoff_factor: float = SLEEP_INTERVAL_BACKOFF_FACTOR,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            initial_seconds: the interval before the first pass has been recorded
+            min_seconds: the interval after a pass that processed items
+            max_seconds: the cap of the interval after consecutive idle passes
+            backoff_factor: the factor that the interval is multiplied by after an idle pass
+        """
+        self.min_seconds = min_seconds
+        self.max_seconds = max(max_seconds, min_seconds)
+        self.backoff_factor = max(backoff_factor, 1.0)
+        self.current_seconds = min(
+            max(initial_seconds, self.min_seconds), self.max_seconds
+        )
+
+        # Metrics
+        self.idle_passes = 0
+        self.busy_passes = 0
+
+    def record_pass(self, item_count: int) -> float:
+        """
+        Updates the interval based on the number of items handled by the last pass
+
+        Attributes:
+            item_count: the number of items that the last pass handled
+
+        Returns:
+            The interval to wait for before the next pass (in seconds)
+        """
+        previous_seconds = self.current_seconds
+
+        if item_count > 0:
+            self.busy_passes += 1
+            self.current_seconds = self.min_seconds
+        else:
+            self.idle_passes += 1
+            self.current_seconds = min(
+                self.current_seconds * self.backoff_factor, self.max_seconds
+            )
+
+        if self.current_seconds != previous_seconds:
+            tprint(
+                f"Poll interval changed from {previous_seconds:g}s to {self.current_seconds:g}s "
+                f"(last pass handled {item_count} item(s))"
+            )
+
+        return self.current_seconds
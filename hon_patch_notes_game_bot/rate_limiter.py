@@ -0,0 +1,230 @@
+#!/usr/bin/python
+"""
+This module contains a client-side token-bucket rate limiter shared by all outbound Reddit API calls.
+
+Requests are paced proactively (instead of reacting to RATELIMIT errors), and lower-priority requests
+    (e.g. bulk private messages) leave a reserve of tokens for game-critical requests (e.g. comment replies).
+The bucket is kept in sync with Reddit's rate-limit response headers.
+"""
+import asyncio
+import re
+import threading
+import time
+from enum import IntEnum
+from typing import Callable, Dict, Mapping, Optional
+
+from hon_patch_notes_game_bot.config.config import (
+    RATE_LIMIT_BURST_SIZE,
+    RATE_LIMIT_REQUESTS_PER_MINUTE,
+)
+
+
+class RequestPriority(IntEnum):
+    """
+    Request priorities (lower values are more important)
+    """
+
+    REPLY = 0
+    EDIT = 1
+    FETCH = 2
+    MARK_READ = 3
+    PRIVATE_MESSAGE = 4
+
+
+# Fraction of the bucket's capacity that requests of a given priority cannot use
+DEFAULT_RESERVED_FRACTIONS: Dict[RequestPriority, float] = {
+    RequestPriority.REPLY: 0.0,
+    RequestPriority.EDIT: 0.1,
+    RequestPriority.FETCH: 0.1,
+    RequestPriority.MARK_READ: 0.2,
+    RequestPriority.PRIVATE_MESSAGE: 0.5,
+}
+
+
+def parse_rate_limit_seconds(message: str) -> Optional[int]:
+    """
+    Parses the duration from a RATELIMIT error message.
+
+    Test strings for regex capture:
+    RATELIMIT: "Looks like you've been doing that a lot. Take a break for 4 minutes before trying again." on field 'ratelimit'
+    RATELIMIT: "Looks like you've been doing that a lot. Take a break for 47 seconds before trying again." on field 'ratelimit'
+    RATELIMIT: "Looks like you've been doing that a lot. Take a break for 4 minutes 47 seconds before trying again."
+        on field 'ratelimit'
+    RATELIMIT: "Looks like you've been doing that a lot. Take a break for 1 minute before trying again." on field 'ratelimit'
+
+    Returns:
+        The number of seconds to wait (with 1 extra second to account for millisecond-precision checking)
+        None if the message cannot be parsed
+    """
+    # Parse the minute and seconds count from the message into named groups
+    regex_capture = re.search(
+        r"\s+((?P<minutes>\d+) minutes?)?\s?((?P<seconds>\d+) seconds)?\s+", message,
+    )
+    if regex_capture is None:
+        return None
+
+    sleep_time_regex_groups = regex_capture.groupdict(default=0)
+    return (
+        60 * int(sleep_time_regex_groups["minutes"])
+        + int(sleep_time_regex_groups["seconds"])
+        + 1
+    )
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_minute: float = RATE_LIMIT_REQUESTS_PER_MINUTE,
+        burst_size: int = RATE_LIMIT_BURST_SIZE,
+        reserved_fractions: Optional[Dict[RequestPriority, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            requests_per_minute: the sustained request rate
+            burst_size: the capacity of the bucket (i.e. the number of requests that can be sent back-to-back)
+            reserved_fractions: per-priority fraction of the capacity that must be left in the bucket
+            clock: a monotonic clock function (can be replaced in tests)
+            sleep: a sleep function (defaults to time.sleep)
+        """
+        self.max_rate_per_second = requests_per_minute / 60
+        self.rate_per_second = self.max_rate_per_second
+        self.capacity = float(burst_size)
+        self.reserved_fractions = (
+            reserved_fractions
+            if reserved_fractions is not None
+            else DEFAULT_RESERVED_FRACTIONS
+        )
+        self.clock = clock
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._last_refill_time = self.clock()
+        self._blocked_until = self._last_refill_time
+        self._waiters: Dict[RequestPriority, int] = {
+            priority: 0 for priority in RequestPriority
+        }
+
+    def _refill(self, now: float):
+        elapsed = max(now - self._last_refill_time, 0)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._last_refill_time = now
+
+    def _required_tokens(self, priority: RequestPriority) -> float:
+        """
+        The number of tokens that must be in the bucket for a request of the given priority to be sent
+        """
+        reserved_tokens = self.capacity * self.reserved_fractions.get(priority, 0.0)
+        higher_priority_waiters = sum(
+            count
+            for waiting_priority, count in self._waiters.items()
+            if waiting_priority < priority
+        )
+        return 1 + reserved_tokens + higher_priority_waiters
+
+    def try_acquire(self, priority: RequestPriority = RequestPriority.REPLY) -> float:
+        """
+        Attempts to take a token from the bucket without blocking
+
+        Returns:
+            0 if a token was taken (the request can be sent)
+            Otherwise, the estimated number of seconds to wait before trying again
+        """
+        with self._lock:
+            now = self.clock()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            self._refill(now)
+            required_tokens = self._required_tokens(priority)
+            if self._tokens >= required_tokens:
+                self._tokens -= 1
+                return 0
+
+            return (required_tokens - self._tokens) / max(self.rate_per_second, 1e-6)
+
+    def acquire(self, priority: RequestPriority = RequestPriority.REPLY):
+        """
+        Blocks until a request of the given priority can be sent, then takes a token from the bucket
+        """
+        delay = self.try_acquire(priority)
+        if delay <= 0:
+            return
+
+        # Register as a waiter, so that lower-priority requests leave a token for this request
+        with self._lock:
+            self._waiters[priority] += 1
+        try:
+            while delay > 0:
+                (self.sleep or time.sleep)(delay)
+                delay = self.try_acquire(priority)
+        finally:
+            with self._lock:
+                self._waiters[priority] -= 1
+
+    async def acquire_async(self, priority: RequestPriority = RequestPriority.REPLY):
+        """
+        Same as acquire(), but waits with asyncio.sleep() so that other tasks keep running (asyncio engine)
+        """
+        delay = self.try_acquire(priority)
+        if delay <= 0:
+            return
+
+        with self._lock:
+            self._waiters[priority] += 1
+        try:
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self.try_acquire(priority)
+        finally:
+            with self._lock:
+                self._waiters[priority] -= 1
+
+    def penalize(self, seconds: float):
+        """
+        Blocks all requests for the given number of seconds (e.g. after a RATELIMIT error)
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+            self._tokens = 0
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Syncs the bucket with Reddit's rate-limit response headers:
+        - x-ratelimit-remaining: the number of requests remaining in the current window
+        - x-ratelimit-reset: the number of seconds until the window resets
+
+        The remaining requests are spread evenly over the rest of the window (up to the configured rate).
+        """
+        if "x-ratelimit-remaining" not in headers or "x-ratelimit-reset" not in headers:
+            return
+
+        try:
+            remaining = float(headers["x-ratelimit-remaining"])
+            seconds_to_reset = max(float(headers["x-ratelimit-reset"]), 1.0)
+        except ValueError:
+            return
+
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if remaining < 1:
+                self._blocked_until = max(self._blocked_until, now + seconds_to_reset)
+                self._tokens = 0
+                return
+
+            self.rate_per_second = min(
+                self.max_rate_per_second, remaining / seconds_to_reset
+            )
+            self._tokens = min(self._tokens, remaining)
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        A `requests` response hook that feeds every response's headers into update_from_headers()
+        """
+        self.update_from_headers(response.headers)
+        return response
@@ -0,0 +1,78 @@
+#!/usr/bin/python
+"""
+This module contains a dispatcher that sends outbound replies from a bounded pool of worker threads.
+
+Game state mutations stay sequential in the core loop, while the (slow) network calls for replies
+    are performed concurrently. Work items submitted with the same key always run on the same worker thread,
+    so replies to the same comment are sent in the order they were submitted.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable, List
+
+from hon_patch_notes_game_bot.utils import tprint
+from hon_patch_notes_game_bot.config.config import REPLY_WORKER_COUNT
+
+
+class ReplyDispatcher:
+    def __init__(self, num_workers: int = REPLY_WORKER_COUNT):
+        """
+        Parametrized constructor
+
+        Attributes:
+            num_workers: the number of worker threads. If it is 0 or lower, work items are run inline.
+        """
+        self.num_workers = max(num_workers, 0)
+
+        # One single-threaded executor per worker ("lane"), so each lane preserves submission order
+        self._lanes = [
+            ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"reply-worker-{index}"
+            )
+            for index in range(self.num_workers)
+        ]
+        self._pending_futures: List[Future] = []
+
+    def submit(self, key: Hashable, work_item: Callable[[], None]):
+        """
+        Queues a work item to be run by a worker thread
+
+        Attributes:
+            key: the ordering key (e.g. the comment being replied to). Items with equal keys run in submission order.
+            work_item: the function to run
+        """
+        if self.num_workers == 0:
+            self._run_safely(work_item)
+            return
+
+        lane = self._lanes[hash(key) % self.num_workers]
+        self._pending_futures.append(lane.submit(self._run_safely, work_item))
+
+    def wait(self) -> int:
+        """
+        Blocks until every queued work item has been run
+
+        Returns:
+            The number of work items that were waited on
+        """
+        pending_futures, self._pending_futures = self._pending_futures, []
+        for future in pending_futures:
+            future.result()
+
+        return len(pending_futures)
+
+    def shutdown(self):
+        """
+        Waits for every queued work item, then stops the worker threads
+        """
+        self.wait()
+        for lane in self._lanes:
+            lane.shutdown(wait=True)
+
+    def _run_safely(self, work_item: Callable[[], None]):
+        """
+        Runs a work item and logs any exception raised by it (a failed reply must not stop the other replies)
+        """
+        try:
+            work_item()
+        except Exception as error:
+            tprint(f"Reply worker encountered an exception: {error}")
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+"""
+This module contains the reward code allocator, which hands out the reward codes of the codes file to the winners.
+
+The codes file is never loaded in memory: a cursor (the byte offset of the next unassigned code) is kept
+    in the database & the file is read one line at a time from that offset.
+Every assignment (winner -> code) is recorded in the database along with the advanced cursor,
+    so a winner always gets the same code back & a code is never handed out twice, even after a restart.
+    If the two writes are not persisted together (e.g. on a crash), a code may be skipped, but never reused.
+"""
+import threading
+from typing import Dict, Optional
+
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.config.config import REWARD_CODES_FILE_PATH
+
+REWARD_CODES_CURSOR_KEY = "reward_codes_cursor"
+
+
+class RewardCodeAllocator:
+    def __init__(
+        self, database: Database, reward_codes_path: str = REWARD_CODES_FILE_PATH,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            database: the database that persists the cursor & the assignments
+            reward_codes_path: the path of the codes file (one code per line, blank lines are skipped).
+                If the path changes, the cursor restarts at the beginning of the new file.
+        """
+        self.database = database
+        self.reward_codes_path = reward_codes_path
+        self._lock = threading.Lock()
+
+        cursor = self.database.get_metadata(REWARD_CODES_CURSOR_KEY)
+        self._offset = (
+            cursor["offset"]
+            if cursor is not None and cursor["path"] == reward_codes_path
+            else 0
+        )
+        self._assigned_codes: Dict[
+            str, str
+        ] = self.database.get_reward_code_assignments()
+
+    @property
+    def assigned_count(self) -> int:
+        return len(self._assigned_codes)
+
+    def get_assigned_code(self, recipient: str) -> Optional[str]:
+        """
+        Returns the code assigned to a recipient, if any
+        """
+        return self._assigned_codes.get(recipient)
+
+    def _read_next_code(self) -> Optional[str]:
+        """
+        Reads the next non-blank code from the codes file & advances the cursor past it
+
+        Returns:
+            The next code
+            None if the codes file has no codes left (or does not exist)
+        """
+        try:
+            with open(self.reward_codes_path, "rb") as reward_codes_file:
+                reward_codes_file.seek(self._offset)
+                for line in iter(reward_codes_file.readline, b""):
+                    self._offset += len(line)
+                    code = line.decode("utf-8").strip()
+                    if code:
+                        return code
+        except OSError:
+            return None
+
+        return None
+
+    def assign(self, recipient: str) -> Optional[str]:
+        """
+        Assigns the next code to a recipient (in O(1) memory & time per code)
+
+        Assigning a code to a recipient that already has one returns that same code.
+
+        Returns:
+            The code assigned to the recipient
+            None if there are no codes left
+        """
+        with self._lock:
+            assigned_code = self._assigned_codes.get(recipient)
+            if assigned_code is not None:
+                return assigned_code
+
+            code = self._read_next_code()
+            if code is None:
+                return None
+
+            # Both writes are made in one transaction. The advanced cursor is written first,
+            #   so that a crash between the two writes wastes the code instead of handing it out again.
+            with self.database.transaction():
+                self.database.set_metadata(
+                    REWARD_CODES_CURSOR_KEY,
+                    {"path": self.reward_codes_path, "offset": self._offset},
+                )
+                self.database.add_reward_code_assignment(recipient, code)
+            self._assigned_codes[recipient] = code
+            return code
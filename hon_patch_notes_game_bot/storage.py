@@ -0,0 +1,536 @@
+#!/usr/bin/python
+"""
+This module contains the storage backends of the database (see database.py).
+
+Every table stores documents (JSON-serializable dictionaries) that are uniquely identified by one of their fields
+    (e.g. a user by their name), so the backends only need to support keyed operations & full table reads.
+
+- TinyDBBackend: a TinyDB JSON file, with buffered (write-behind) writes.
+    Writes made in a transaction are held in memory until it ends, & undone if it fails.
+- SQLiteBackend: an SQLite file in WAL mode, with one primary-keyed table per document table.
+    Writes are committed in transactions (e.g. one per processed guess), so a crash never corrupts the file.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from tinydb import TinyDB
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import JSONStorage
+from tinydb.table import Document
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Tuple
+
+from hon_patch_notes_game_bot.config.config import (
+    DB_BACKEND,
+    DB_SQLITE_PATH,
+    DB_TINYDB_PATH,
+    DB_WRITE_BEHIND_MAX_DELAY_SECONDS,
+    DB_WRITE_BEHIND_MAX_PENDING_OPS,
+)
+
+# The field that uniquely identifies a document, for each table
+TABLE_KEY_FIELDS: Dict[str, str] = {
+    "submission": "tag",
+    "metadata": "key",
+    "user": "name",
+    "patch_notes_line_tracker": "id",
+    "processed_comment": "id",
+    "redditor_profile": "name",
+    "outbound_message": "key",
+    "reward_code_assignment": "name",
+}
+
+# The "INSERT ... ON CONFLICT DO UPDATE" syntax requires SQLite 3.24+ (older versions update, then insert)
+SQLITE_SUPPORTS_UPSERT = sqlite3.sqlite_version_info >= (3, 24, 0)
+
+
+class WriteBehindMiddleware(CachingMiddleware):
+    """
+    TinyDB middleware that serves reads from memory and batches writes to the underlying storage.
+
+    Pending writes are flushed to disk once either bound is reached (checked on every write):
+    - max_pending_ops: the number of write operations that have not been persisted yet
+    - max_delay_seconds: the age of the oldest write operation that has not been persisted yet
+
+    flush() should also be called at well-defined points (e.g. at the end of each core loop pass),
+    which bounds the window of data that can be lost if the bot crashes.
+
+    Flushes can be held back (see hold_flushes()), so that a group of writes is persisted together.
+    """
+
+    def __init__(
+        self,
+        storage_cls=JSONStorage,
+        max_delay_seconds: float = DB_WRITE_BEHIND_MAX_DELAY_SECONDS,
+        max_pending_ops: int = DB_WRITE_BEHIND_MAX_PENDING_OPS,
+    ):
+        super().__init__(storage_cls)
+        self.max_delay_seconds = max_delay_seconds
+        self.max_pending_ops = max_pending_ops
+        self.flush_count = 0
+        self._oldest_pending_write_time: Optional[float] = None
+        self._flush_hold_depth = 0
+        self._is_flush_requested = False
+
+    def write(self, data):
+        self.cache = data
+        self._cache_modified_count += 1
+        if self._oldest_pending_write_time is None:
+            self._oldest_pending_write_time = time.monotonic()
+
+        self._flush_if_due()
+
+    def _flush_if_due(self):
+        """
+        Flushes the pending writes if either bound is reached
+        """
+        if self._oldest_pending_write_time is None:
+            return
+
+        if (
+            self._cache_modified_count >= self.max_pending_ops
+            or time.monotonic() - self._oldest_pending_write_time
+            >= self.max_delay_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        """
+        Flush all unwritten data to disk (once the flushes are not held back anymore, see hold_flushes()).
+        """
+        if self._flush_hold_depth > 0:
+            self._is_flush_requested = True
+            return
+
+        if self._cache_modified_count > 0:
+            self.flush_count += 1
+        super().flush()
+        self._oldest_pending_write_time = None
+
+    @contextmanager
+    def hold_flushes(self) -> Iterator[None]:
+        """
+        Holds back the flushes within the context, so that the writes made within it are persisted together.
+        The flushes that were due or requested are made when the context exits.
+        """
+        self._flush_hold_depth += 1
+        try:
+            yield
+        finally:
+            self._flush_hold_depth -= 1
+
+        if self._flush_hold_depth == 0:
+            if self._is_flush_requested:
+                self._is_flush_requested = False
+                self.flush()
+            else:
+                self._flush_if_due()
+
+    @property
+    def pending_ops(self) -> int:
+        """
+        Returns the number of write operations that have not been persisted yet
+        """
+        return self._cache_modified_count
+
+
+class StorageBackend(ABC):
+    """
+    The interface of a storage backend. Documents are identified by the key field of their table (see TABLE_KEY_FIELDS).
+
+    A backend that does not implement every abstract method cannot be instantiated.
+    """
+
+    @abstractmethod
+    def all(self, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Returns all documents of a table
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, table_name: str, key: Any) -> Optional[Dict[str, Any]]:
+        """
+        Returns the document of a table with the given key (None if it does not exist)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert(self, table_name: str, document: Dict[str, Any]):
+        """
+        Inserts a document in a table, or replaces the document with the same key.
+        The stored document is replaced as a whole: fields that are not in the new document are not kept.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, table_name: str, key: Any) -> bool:
+        """
+        Removes the document of a table with the given key
+
+        Returns:
+            True if a document was removed
+            False otherwise
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self, table_name: str) -> int:
+        """
+        Returns the number of documents in a table
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def truncate(self, table_name: str):
+        """
+        Removes all documents of a table
+        """
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Groups the writes made within the context: they are persisted together,
+            or discarded if an exception is raised (if the backend supports it)
+        """
+        yield
+
+    @abstractmethod
+    def flush(self):
+        """
+        Persists all buffered writes
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        """
+        Persists all buffered writes and closes the storage
+        """
+        raise NotImplementedError
+
+
+class TinyDBBackend(StorageBackend):
+    def __init__(
+        self,
+        db_path: str = DB_TINYDB_PATH,
+        max_write_delay_seconds: float = DB_WRITE_BEHIND_MAX_DELAY_SECONDS,
+        max_pending_writes: int = DB_WRITE_BEHIND_MAX_PENDING_OPS,
+    ):
+        """
+        Parametrized constructor
+
+        Attributes:
+            db_path: path to the TinyDB JSON file
+            max_write_delay_seconds: the longest time a write may stay in memory before it is persisted
+            max_pending_writes: the number of buffered writes that forces a flush to disk
+                (1 makes every write go straight to disk)
+
+        The writes made within a transaction are not flushed before it ends (see transaction()).
+        """
+        self.db_path = db_path
+        self.storage = WriteBehindMiddleware(
+            JSONStorage,
+            max_delay_seconds=max_write_delay_seconds,
+            max_pending_ops=max_pending_writes,
+        )
+        self.db = TinyDB(db_path, storage=self.storage)
+
+        # The doc_id of every document, keyed by table & then by key (built when a table is first accessed),
+        #   so that keyed operations do not scan the table
+        self._doc_ids: Dict[str, Dict[Any, int]] = {}
+
+        # The previous version of every document written in the current transaction (None if it did not exist)
+        self._transaction_depth = 0
+        self._undo_log: List[Tuple[str, Any, Optional[Document]]] = []
+
+    def _get_doc_ids(self, table_name: str, rebuild: bool = False) -> Dict[Any, int]:
+        doc_ids = self._doc_ids.get(table_name)
+        if doc_ids is None or rebuild:
+            key_field = TABLE_KEY_FIELDS[table_name]
+            doc_ids = {
+                document[key_field]: document.doc_id
+                for document in self.db.table(table_name)
+            }
+            self._doc_ids[table_name] = doc_ids
+
+        return doc_ids
+
+    def _get_doc_id(self, table_name: str, key: Any) -> Optional[int]:
+        """
+        Gets the doc_id of the document with the given key
+
+        A doc_id that does not match the document's key anymore (e.g. if the table was modified through self.db)
+            rebuilds the table's doc_ids first.
+        """
+        doc_id = self._get_doc_ids(table_name).get(key)
+        if doc_id is None:
+            return None
+
+        document = self.db.table(table_name).get(doc_id=doc_id)
+        if document is not None and document[TABLE_KEY_FIELDS[table_name]] == key:
+            return doc_id
+
+        return self._get_doc_ids(table_name, rebuild=True).get(key)
+
+    def all(self, table_name: str) -> List[Dict[str, Any]]:
+        return [dict(document) for document in self.db.table(table_name)]
+
+    def get(self, table_name: str, key: Any) -> Optional[Dict[str, Any]]:
+        doc_id = self._get_doc_id(table_name, key)
+        if doc_id is None:
+            return None
+
+        return self.db.table(table_name).get(doc_id=doc_id)
+
+    def _log_undo(self, table_name: str, key: Any, doc_id: Optional[int]):
+        """
+        Keeps the current version of a document that is about to be written in a transaction (see transaction())
+        """
+        if self._transaction_depth == 0:
+            return
+
+        document = (
+            None if doc_id is None else self.db.table(table_name).get(doc_id=doc_id)
+        )
+        previous_document = (
+            None if document is None else Document(dict(document), document.doc_id)
+        )
+        self._undo_log.append((table_name, key, previous_document))
+
+    def upsert(self, table_name: str, document: Dict[str, Any]):
+        key = document[TABLE_KEY_FIELDS[table_name]]
+        table = self.db.table(table_name)
+        doc_id = self._get_doc_id(table_name, key)
+        self._log_undo(table_name, key, doc_id)
+        if doc_id is None:
+            self._get_doc_ids(table_name)[key] = table.insert(dict(document))
+        else:
+            # Replace the stored document's fields (TinyDB's update would merge them instead)
+            def replace_fields(stored_document: MutableMapping[str, Any]):
+                stored_document.clear()
+                stored_document.update(document)
+
+            table.update(replace_fields, doc_ids=[doc_id])
+
+    def remove(self, table_name: str, key: Any) -> bool:
+        doc_id = self._get_doc_id(table_name, key)
+        if doc_id is None:
+            return False
+
+        self._log_undo(table_name, key, doc_id)
+        self.db.table(table_name).remove(doc_ids=[doc_id])
+        del self._get_doc_ids(table_name)[key]
+        return True
+
+    def count(self, table_name: str) -> int:
+        return len(self.db.table(table_name))
+
+    def truncate(self, table_name: str):
+        for key, doc_id in list(self._get_doc_ids(table_name, rebuild=True).items()):
+            self._log_undo(table_name, key, doc_id)
+        self.db.table(table_name).truncate()
+        self._doc_ids[table_name] = {}
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Holds the writes made within the context in memory until it ends, so that they are flushed together.
+        If an exception is raised, the writes are undone (in memory, before they can be flushed).
+
+        Nested transactions are part of the outermost one.
+        """
+        if self._transaction_depth > 0:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        with self.storage.hold_flushes():
+            self._transaction_depth = 1
+            try:
+                yield
+            except BaseException:
+                self._transaction_depth = 0
+                self._undo(self._undo_log)
+                raise
+            finally:
+                self._transaction_depth = 0
+                self._undo_log = []
+
+    def _undo(self, undo_log: List[Tuple[str, Any, Optional[Document]]]):
+        """
+        Restores the previous version of the documents written in a transaction, from the last write to the first
+        """
+        for table_name, key, previous_document in reversed(undo_log):
+            if previous_document is None:
+                self.remove(table_name, key)
+            elif self._get_doc_id(table_name, key) is not None:
+                self.upsert(table_name, previous_document)
+            else:
+                # Re-inserted with its previous doc_id
+                self._get_doc_ids(table_name)[key] = self.db.table(table_name).insert(
+                    previous_document
+                )
+
+    def flush(self):
+        self.storage.flush()
+
+    def close(self):
+        self.db.close()
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, db_path: str = DB_SQLITE_PATH):
+        """
+        Parametrized constructor
+
+        Each table of documents is an SQLite table with a primary key (i.e. a unique index) on the document's key
+            & the JSON-encoded document. The database runs in WAL mode, so commits are cheap & crash-safe.
+
+        Writes made outside of a transaction are committed as they are made.
+
+        Attributes:
+            db_path: path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+
+        # Transactions are managed explicitly (see transaction())
+        self.connection = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for table_name in TABLE_KEY_FIELDS:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table_name}" '
+                "(key PRIMARY KEY NOT NULL, document TEXT NOT NULL)"
+            )
+
+    def all(self, table_name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self.connection.execute(
+                f'SELECT document FROM "{table_name}" ORDER BY rowid'
+            ).fetchall()
+
+        return [json.loads(document) for (document,) in rows]
+
+    def get(self, table_name: str, key: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.connection.execute(
+                f'SELECT document FROM "{table_name}" WHERE key = ?', (key,)
+            ).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def upsert(self, table_name: str, document: Dict[str, Any]):
+        key = document[TABLE_KEY_FIELDS[table_name]]
+        encoded_document = json.dumps(document)
+        with self._lock:
+            if SQLITE_SUPPORTS_UPSERT:
+                self.connection.execute(
+                    f'INSERT INTO "{table_name}" (key, document) VALUES (?, ?) '
+                    "ON CONFLICT (key) DO UPDATE SET document = excluded.document",
+                    (key, encoded_document),
+                )
+                return
+
+            # Not "INSERT OR REPLACE", which would move the document to the end of the table (see all())
+            cursor = self.connection.execute(
+                f'UPDATE "{table_name}" SET document = ? WHERE key = ?',
+                (encoded_document, key),
+            )
+            if cursor.rowcount == 0:
+                self.connection.execute(
+                    f'INSERT INTO "{table_name}" (key, document) VALUES (?, ?)',
+                    (key, encoded_document),
+                )
+
+    def remove(self, table_name: str, key: Any) -> bool:
+        with self._lock:
+            cursor = self.connection.execute(
+                f'DELETE FROM "{table_name}" WHERE key = ?', (key,)
+            )
+
+        return cursor.rowcount > 0
+
+    def count(self, table_name: str) -> int:
+        with self._lock:
+            (count,) = self.connection.execute(
+                f'SELECT COUNT(*) FROM "{table_name}"'
+            ).fetchone()
+
+        return count
+
+    def truncate(self, table_name: str):
+        with self._lock:
+            self.connection.execute(f'DELETE FROM "{table_name}"')
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Commits the writes made within the context together, or rolls them back if an exception is raised.
+
+        Nested transactions are part of the outermost one. The lock is held for the whole transaction,
+            so writes from other threads cannot be interleaved with it.
+        """
+        with self._lock:
+            if self._transaction_depth > 0:
+                self._transaction_depth += 1
+                try:
+                    yield
+                finally:
+                    self._transaction_depth -= 1
+                return
+
+            self.connection.execute("BEGIN")
+            self._transaction_depth = 1
+            try:
+                yield
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            else:
+                self.connection.execute("COMMIT")
+            finally:
+                self._transaction_depth = 0
+
+    def flush(self):
+        # Writes are committed at the end of their transaction (or immediately outside of one)
+        pass
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+
+def create_storage_backend(
+    backend_name: str = DB_BACKEND, db_path: Optional[str] = None
+) -> StorageBackend:
+    """
+    Creates the storage backend selected in the config ("tinydb" or "sqlite")
+
+    Attributes:
+        backend_name: the name of the backend
+        db_path: the path of the database file (defaults to the backend's path in the config)
+    """
+    if backend_name not in ("sqlite", "tinydb"):
+        raise ValueError(f"Unknown database backend: {backend_name}")
+
+    if db_path is None:
+        db_path = DB_SQLITE_PATH if backend_name == "sqlite" else DB_TINYDB_PATH
+
+    # Make the database file's folder if it does not exist
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+    if backend_name == "sqlite":
+        return SQLiteBackend(db_path)
+    return TinyDBBackend(db_path)
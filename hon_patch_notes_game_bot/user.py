@@ -1,11 +1,24 @@
 #!/usr/bin/python
+from typing import Any, Dict, Iterable
+
+
 class RedditUser:
+    # Slotted, since the database keeps an in-memory RedditUser for every player (see Database.load_user_index())
+    __slots__ = (
+        "name",
+        "can_submit_guess",
+        "is_potential_winner",
+        "num_guesses",
+        "num_correct_guesses",
+    )
+
     def __init__(
         self,
         name: str,
         can_submit_guess: bool = True,
         is_potential_winner: bool = False,
         num_guesses: int = 0,
+        num_correct_guesses: int = 0,
     ):
         """
         Parametrized constructor
@@ -15,3 +28,58 @@ class RedditUser:
         self.can_submit_guess = can_submit_guess
         self.is_potential_winner = is_potential_winner
         self.num_guesses = num_guesses
+        self.num_correct_guesses = num_correct_guesses
+
+    def __repr__(self) -> str:
+        return f"RedditUser({self.to_dict()!r})"
+
+    @classmethod
+    def from_dict(cls, fields: Dict[str, Any]) -> "RedditUser":
+        """
+        Decodes a user from its stored fields (see to_dict())
+
+        Returns:
+            A new RedditUser instance with the same properties as the stored user
+        """
+        return cls(
+            fields["name"],
+            fields["can_submit_guess"],
+            fields["is_potential_winner"],
+            fields["num_guesses"],
+            # Users saved before this field existed have no count (their correct guesses were not tracked)
+            fields.get("num_correct_guesses", 0),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Encodes the user as the fields stored in the user table of the database
+        """
+        return {
+            "name": self.name,
+            "can_submit_guess": self.can_submit_guess,
+            "is_potential_winner": self.is_potential_winner,
+            "num_guesses": self.num_guesses,
+            "num_correct_guesses": self.num_correct_guesses,
+        }
+
+    def copy(self) -> "RedditUser":
+        """
+        Returns a new RedditUser instance with the same properties
+        """
+        return RedditUser(
+            self.name,
+            self.can_submit_guess,
+            self.is_potential_winner,
+            self.num_guesses,
+            self.num_correct_guesses,
+        )
+
+
+def load_users(rows: Iterable[Dict[str, Any]]) -> Dict[str, RedditUser]:
+    """
+    Decodes the rows of the user table in bulk
+
+    Returns:
+        The decoded users, keyed by username
+    """
+    return {row["name"]: RedditUser.from_dict(row) for row in rows}
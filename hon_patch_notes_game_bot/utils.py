@@ -2,12 +2,17 @@
 """
 This module contains standalone utility functions
 """
-import re
 from dateutil import tz
-from dateutil.parser import parse
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
+from hon_patch_notes_game_bot.community_document import (
+    build_community_document,
+    render_template_line,
+)
+from hon_patch_notes_game_bot.game_clock import parse_game_end_time
+from hon_patch_notes_game_bot.guess_parser import find_first_line_number
+from hon_patch_notes_game_bot.line_classifier import LineClassificationTable
 from hon_patch_notes_game_bot.patch_notes_file_handler import PatchNotesFile
 from hon_patch_notes_game_bot.config.config import (
     GAME_END_TIME,
@@ -25,12 +30,11 @@ def get_patch_notes_line_number(commentBody: str) -> Optional[int]:
 
         Returns None if no valid integer can be found
         """
-    comment_first_line = commentBody.partition("\n")[0]
-    number_line_match = re.search(r"\d+", comment_first_line)
-    if number_line_match is None:
+    digits = find_first_line_number(commentBody)
+    if digits is None:
         return None
 
-    return int(number_line_match.group())
+    return int(digits)
 
 
 def is_game_expired(time_string: str) -> bool:
@@ -41,7 +45,7 @@ def is_game_expired(time_string: str) -> bool:
         True if the present time is later than the game end time
         False otherwise
     """
-    game_end_datetime = parse(time_string, fuzzy=True)
+    game_end_datetime = parse_game_end_time(time_string)
     present_time = datetime.now(tz.UTC)
 
     b_game_expired = present_time > game_end_datetime
@@ -51,55 +55,93 @@ def is_game_expired(time_string: str) -> bool:
     return b_game_expired
 
 
+WINNERS_SUBMISSION_HEADER = (
+    "\n# Update\n___\n\nThe game has now ended. Thank you to everyone for playing!\n\n"
+    + "The winners list & potential winners pool have been posted below (auto-generated by the bot).\n\n"
+)
+WINNERS_SUBMISSION_FOOTER = "\n___\n\n"
+
+
+def get_omitted_users_note(omitted_count: int) -> str:
+    """
+    Returns the note shown below a list that was truncated in the submission
+    """
+    return f"\n\n*{omitted_count} more not shown (Reddit character limit)*\n"
+
+
 def output_winners_list_to_file(
-    potential_winners_list: List[str], winners_list: List[str], output_file_path: str
-):
+    potential_winners_list: Iterable[str],
+    winners_list: Iterable[str],
+    output_file_path: str,
+    max_submission_length: Optional[int] = None,
+) -> str:
     """
-    Outputs the list of winners & potential winners to an output file
+    Outputs the list of winners & potential winners to an output file (overwriting it)
+
+    The lists are streamed to the file in a single pass, while the submission content is built alongside.
+    If the submission content would exceed max_submission_length, the lists are truncated in the submission
+        (winners first), with a note of how many users are not shown. The file always contains the full lists.
 
     Returns:
-        String content that was written to the file
+        The winners submission content (to add at the top of the main submission)
 
     Attributes:
         potential_winners_list: the list of potential winners
         winners_list: the list of actual winners
         output_file_path: the path to where the data will be output
-    """
-    with open(output_file_path, "a+") as output_file:
-        # Reference for reading & overwriting a file: https://stackoverflow.com/a/2424410
-        text = output_file.read()
-        output_file.seek(0)
-        output_file.write(text)
-        output_file.truncate()
-
-        # Winners subheading and content
-        file_content = "## Winners\n\n```\n"
-
-        for winner in winners_list:
-            file_content += f"{winner}\n"
-        file_content += "```"
-
-        # Potential Winners subheading and content
-        file_content += "\n## Potential Winners\n\n```\n"
-        for user in potential_winners_list:
-            file_content += f"{user}\n"
-        file_content += "```"
-        output_file.write(file_content)
-
-        winners_submission_content = (
-            "\n# Update\n___\n\nThe game has now ended. Thank you to everyone for playing!\n\n"
-            + "The winners list & potential winners pool have been posted below (auto-generated by the bot).\n\n"
-            + file_content
-            + "\n___\n\n"
+        max_submission_length: the maximum length of the winners submission content (None if unlimited)
+    """
+    sections = [
+        ("## Winners\n\n```\n", winners_list),
+        ("\n## Potential Winners\n\n```\n", potential_winners_list),
+    ]
+
+    # The headings, closing fences & notes are always part of the submission content: the users get the rest
+    remaining_length = None
+    if max_submission_length is not None:
+        remaining_length = (
+            max_submission_length
+            - len(WINNERS_SUBMISSION_HEADER)
+            - len(WINNERS_SUBMISSION_FOOTER)
+            - sum(
+                len(heading) + len("```") + len(get_omitted_users_note(10 ** 12))
+                for heading, _ in sections
+            )
         )
-        return winners_submission_content
+
+    submission_parts = [WINNERS_SUBMISSION_HEADER]
+    with open(output_file_path, "w") as output_file:
+        for heading, users in sections:
+            output_file.write(heading)
+            submission_parts.append(heading)
+
+            omitted_count = 0
+            for user in users:
+                line = f"{user}\n"
+                output_file.write(line)
+                if omitted_count == 0 and (
+                    remaining_length is None or len(line) <= remaining_length
+                ):
+                    submission_parts.append(line)
+                    if remaining_length is not None:
+                        remaining_length -= len(line)
+                else:
+                    omitted_count += 1
+
+            output_file.write("```")
+            submission_parts.append("```")
+            if omitted_count > 0:
+                submission_parts.append(get_omitted_users_note(omitted_count))
+
+    submission_parts.append(WINNERS_SUBMISSION_FOOTER)
+    return "".join(submission_parts)
 
 
 def generate_submission_compiled_patch_notes_template_line(line_number: int):
     """
     For a given line number, construct the template line for the community-compiled patch notes.
     """
-    return f">{str(line_number)} |\n\n"
+    return render_template_line(line_number)
 
 
 def convert_time_string_to_wolframalpha_query_url(time_string: str) -> str:
@@ -114,10 +156,13 @@ def convert_time_string_to_wolframalpha_query_url(time_string: str) -> str:
 
 
 def processed_submission_content(
-    submission_content_path: str, patch_notes_file: PatchNotesFile
+    submission_content_path: str,
+    patch_notes_file: PatchNotesFile,
+    line_classifications: LineClassificationTable,
 ) -> str:
     """
-    Reads the submission_content.md file, then uses data from a PatchNotesFile instance to further process it.
+    Reads the submission_content.md file, then uses data from a PatchNotesFile instance
+        & from its LineClassificationTable to further process it.
     Iterates through a pre-set dictionary's key-value pairs to perform the string replacement processing.
 
     Returns:
@@ -135,6 +180,11 @@ def processed_submission_content(
             "MAX_NUM_GUESSES": str(MAX_NUM_GUESSES),
             "MAX_PERCENT_OF_LINES_REVEALED": str(MAX_PERCENT_OF_LINES_REVEALED),
             "NUM_WINNERS": str(NUM_WINNERS),
+            "VALID_LINE_COUNT": str(line_classifications.valid_line_count),
+            "INVALID_LINE_COUNT": str(
+                line_classifications.invalid_line_count
+                + line_classifications.blank_line_count
+            ),
         }
 
         for source_str, target_str in replacement_dict.items():
@@ -156,20 +206,9 @@ def processed_community_notes_thread_submission_content(
     Returns:
         A processed string containing the submission content
     """
-    with open(submission_content_path, "r") as file:
-        submission_content = file.read()
-        submission_content = submission_content.replace(
-            "#main-reddit-thread", main_submission_url
-        )
-
-        submission_content += "\n\n# Community-compiled Patch Notes\n\nThe patch notes compiled by the community will automatically be updated below (guessed lines that are blank will be marked with `...`):\n\n"  # noqa: E501
-        for line_number in range(1, patch_notes_file.get_total_line_count() + 1):
-            submission_content += generate_submission_compiled_patch_notes_template_line(
-                line_number=line_number
-            )
-
-        submission_content += f"\n\n**Guesses in this thread will not be responded to by the bot. [Visit the main thread instead!]({main_submission_url})**\n\nFeel free to discuss patch changes here liberally (based on the currently revealed notes)! :)"  # noqa: E501
-        return submission_content
+    return build_community_document(
+        submission_content_path, patch_notes_file, main_submission_url
+    ).render()
 
 
 def get_reward_codes_list(
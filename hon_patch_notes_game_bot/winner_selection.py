@@ -0,0 +1,74 @@
+#!/usr/bin/python
+"""
+This module contains the winner selection, which draws the winners from the potential winners.
+
+- The potential winners are streamed: only the `num_winners` candidates with the highest keys so far
+    are kept in memory (weighted reservoir sampling, using the A-Res algorithm of Efraimidis & Spirakis).
+- A candidate's random key is derived from the draw's seed & their username (instead of a shared random generator),
+    so a draw can be reproduced from its seed regardless of the order in which the candidates are read,
+    and any disputed result can be audited by recomputing the keys.
+"""
+import hashlib
+import heapq
+import math
+import secrets
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+
+class WinnerDraw(NamedTuple):
+    seed: str
+    winners: List[str]
+    candidate_count: int
+
+
+def get_draw_key(seed: str, name: str, weight: float = 1) -> float:
+    """
+    Gets the key of a candidate in a draw (the candidates with the highest keys are the winners)
+
+    The key is ln(u) / weight, where u is a uniform number in (0, 1) derived from the seed & the username.
+    This orders the candidates the same way as the A-Res key u ^ (1 / weight), without losing precision.
+    """
+    digest = hashlib.sha256(f"{seed}:{name}".encode("utf-8")).digest()
+    uniform = (int.from_bytes(digest[:8], "big") + 1) / (2 ** 64 + 2)
+    return math.log(uniform) / weight
+
+
+def draw_winners(
+    candidates: Iterable[Tuple[str, float]],
+    num_winners: int,
+    seed: Optional[str] = None,
+) -> WinnerDraw:
+    """
+    Draws a number of unique winners from a stream of candidates
+
+    Attributes:
+        candidates: the (username, weight) pairs of the candidates.
+            A candidate's odds of being drawn are proportional to their weight (candidates weighing 0 or less are skipped).
+        num_winners: the number of winners to draw
+        seed: the seed of the draw (a random seed is generated if None)
+
+    Returns:
+        The draw, with the winners ordered from the highest key to the lowest.
+        Every candidate is a winner if there are 'num_winners' candidates or less.
+    """
+    if seed is None:
+        seed = secrets.token_hex(16)
+
+    reservoir: List[Tuple[float, str]] = []
+    candidate_count = 0
+    for name, weight in candidates:
+        if weight <= 0:
+            continue
+
+        candidate_count += 1
+        if num_winners <= 0:
+            continue
+
+        entry = (get_draw_key(seed, name, weight), name)
+        if len(reservoir) < num_winners:
+            heapq.heappush(reservoir, entry)
+        elif entry > reservoir[0]:
+            heapq.heapreplace(reservoir, entry)
+
+    winners = [name for _, name in sorted(reservoir, reverse=True)]
+    return WinnerDraw(seed=seed, winners=winners, candidate_count=candidate_count)
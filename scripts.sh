@@ -31,6 +31,11 @@ case $1 in
         fi
         ;;
 
+    "migrate")
+        cd hon_patch_notes_game_bot
+        poetry run python migrate.py "${@:2}"
+        ;;
+
     *)
         echo -e "Invalid option.\n"
         echo "Current command list: "
@@ -39,6 +44,7 @@ case $1 in
             reset: removes files in the 'hon_patch_notes_game_bot/cache/' folder
             test: runs flake8 linting tests & pytest unit tests
             winners: gets a list of winners & list of total potential winners. Can include a 2nd arg (integer for the picked number of winners)
+            migrate: copies the database from 'cache/db.json' to 'cache/db.sqlite3'. Can include a 2nd & 3rd arg (source & target paths)
         "
         ;;
 esac
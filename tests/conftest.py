@@ -7,3 +7,25 @@ from tests.test_patch_notes_file_handler import (
     get_patch_notes_file_class_fixture,
 )
 from tests.test_database import setup_and_teardown_test_database
+
+
+class FakeClock:
+    """
+    A manual clock (& sleep function) for the classes that take a clock, e.g. RateLimiter
+    """
+
+    def __init__(self):
+        self.current_time = 1000.0
+        self.sleep_calls = []
+
+    def __call__(self):
+        return self.current_time
+
+    def sleep(self, seconds):
+        self.sleep_calls.append(seconds)
+        self.current_time += seconds
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
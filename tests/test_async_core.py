@@ -0,0 +1,287 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+from unittest import TestCase
+from pytest import mark
+
+from dateutil import tz
+from datetime import datetime, timedelta
+from praw.exceptions import RedditAPIException
+from praw.models import Comment, Submission
+
+from hon_patch_notes_game_bot import core
+from hon_patch_notes_game_bot.async_communications import send_message_to_winners_async
+from hon_patch_notes_game_bot.async_core import AsyncCore, TaskGroup
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.rate_limiter import RateLimiter
+from hon_patch_notes_game_bot.reward_codes import RewardCodeAllocator
+from hon_patch_notes_game_bot.config.config import REWARD_CODES_FILE_PATH
+
+
+async def async_iter(items):
+    for item in items:
+        yield item
+
+
+def make_author(name: str):
+    author = Mock()
+    author.name = name
+    author.has_verified_email = True
+    author.comment_karma = 9001
+    author.link_karma = 0
+    author.created_utc = 1609390800  # December 31, 2020 at 00:00:00
+    author.load = AsyncMock()
+    return author
+
+
+def test_task_group_ordering():
+    async def run():
+        task_group = TaskGroup()
+        calls = []
+
+        async def work(label: str, delay: float):
+            await asyncio.sleep(delay)
+            calls.append(label)
+
+        async def failing_work():
+            raise Exception("Task error")
+
+        # Tasks with the same key run one after another, even if a previous one fails
+        task_group.schedule("a", work("a1", 0.02))
+        task_group.schedule("a", failing_work())
+        task_group.schedule("a", work("a2", 0))
+        task_group.schedule("b", work("b1", 0))
+        assert await task_group.wait() == 4
+        assert calls.index("a1") < calls.index("a2")
+        assert calls[0] == "b1"
+        assert len(task_group) == 0
+
+    asyncio.run(run())
+
+
+def test_send_message_to_winners_async(tmp_path):
+    clock = Mock(return_value=0.0)
+    rate_limiter = RateLimiter(clock=clock)
+    rate_limit_error = RedditAPIException(
+        [["RATELIMIT", "Take a break for 1 second before trying again.", "ratelimit"]]
+    )
+
+    redditors = {name: Mock() for name in ("Winner1", "Winner2")}
+    redditors["Winner1"].message = AsyncMock()
+    redditors["Winner2"].message = AsyncMock(side_effect=[rate_limit_error, None])
+    reddit = Mock()
+    reddit.redditor = AsyncMock(side_effect=lambda name: redditors[name])
+
+    async def fake_sleep(seconds: float):
+        clock.return_value += seconds
+
+    reward_codes_path = tmp_path / "reward_codes.txt"
+    reward_codes_path.write_text("Code1\nCode2\nCode3\n")
+    reward_code_allocator = RewardCodeAllocator(
+        Database(str(tmp_path / "db.json")), str(reward_codes_path)
+    )
+    with patch("hon_patch_notes_game_bot.rate_limiter.asyncio.sleep", fake_sleep):
+        asyncio.run(
+            send_message_to_winners_async(
+                reddit,
+                ["Winner1", "Winner2"],
+                reward_code_allocator,
+                "v1",
+                100,
+                rate_limiter,
+            )
+        )
+
+    # The rate-limited winner is retried once the rate limit duration has passed
+    assert redditors["Winner1"].message.await_count == 1
+    assert redditors["Winner2"].message.await_count == 2
+    assert clock.return_value >= 2
+    assert reward_code_allocator.get_assigned_code("Winner1") == "Code1"
+    assert reward_code_allocator.get_assigned_code("Winner2") == "Code2"
+
+
+@mark.usefixtures(
+    "get_patch_notes_file_class_fixture", "setup_and_teardown_test_database"
+)
+class TestAsyncCore(TestCase):
+    def setUp(self):
+        self.mock_reddit = Mock()
+        self.mock_reddit.inbox.mark_read = AsyncMock()
+        self.mock_submission = Mock()
+        self.mock_submission.id = "main"
+        self.mock_submission.selftext = "Test string"
+        self.mock_submission.edit = AsyncMock()
+        self.mock_community_submission = Mock()
+        self.mock_community_submission.selftext = "Test string"
+        self.mock_community_submission.url = "Community Submission URL"
+        self.mock_community_submission.edit = AsyncMock()
+
+        self.async_core = AsyncCore(
+            reddit=self.mock_reddit,
+            db=self._database,
+            submission=self.mock_submission,
+            community_submission=self.mock_community_submission,
+            patch_notes_file=self._patch_notes_file,
+            comment_class=Comment,
+        )
+        future_date = datetime.now(tz.UTC) + timedelta(days=30)
+        self.async_core.game_end_time = str(future_date)
+
+    def make_comment(self, fullname: str, author, body: str):
+        comment = Mock(spec=Comment)
+        comment.fullname = fullname
+        comment.id = fullname
+        comment.submission = Mock(spec=Submission)
+        comment.submission.id = self.mock_submission.id
+        comment.author = author
+        comment.body = body
+        comment.reply = AsyncMock()
+        return comment
+
+    def test_loop_async(self):
+        author = make_author("AsyncUser1")
+        comment = self.make_comment(
+            "t1_async_comment_1", author, "Patch notes line number: 1"
+        )
+        other_thread_comment = self.make_comment(
+            "t1_async_comment_2", author, "Patch notes line number: 3"
+        )
+        other_thread_comment.submission.id = "other"
+        self.mock_reddit.inbox.unread = Mock(
+            side_effect=lambda limit: async_iter([comment, other_thread_comment])
+        )
+
+        assert asyncio.run(self.async_core.loop_async())
+        assert self.async_core.last_pass_item_count == 1
+        assert self.async_core.db.check_patch_notes_line_number(1)
+        assert self.async_core.db.is_comment_processed("t1_async_comment_1")
+        comment.reply.assert_awaited_once()
+        other_thread_comment.reply.assert_not_awaited()
+        self.mock_community_submission.edit.assert_awaited_with(
+            body=self.async_core.community_document.render()
+        )
+        # Irrelevant items are queued as they are fetched, comments once processed
+        self.mock_reddit.inbox.mark_read.assert_awaited_once_with(
+            [other_thread_comment, comment]
+        )
+        author.load.assert_awaited_once()
+
+        # An already processed comment is only marked as read
+        assert asyncio.run(self.async_core.loop_async())
+        comment.reply.assert_awaited_once()
+        assert self.mock_reddit.inbox.mark_read.await_count == 2
+        self.async_core.db.delete_patch_notes_line_number(1)  # Teardown
+
+        # Exceptions are logged
+        self.mock_reddit.inbox.unread = Mock(side_effect=Exception("Inbox error"))
+        with patch("hon_patch_notes_game_bot.async_core.asyncio.sleep", AsyncMock()):
+            assert asyncio.run(self.async_core.loop_async())
+
+    def test_loop_async_does_not_acknowledge_a_crashed_comment(self):
+        author = make_author("AsyncUser4")
+        comments = [
+            self.make_comment(f"t1_async_crash_{index}", author, "No guess here")
+            for index in range(3)
+        ]
+        self.mock_reddit.inbox.unread = Mock(
+            side_effect=lambda limit: async_iter(comments)
+        )
+        process_comment = self.async_core.process_comment
+
+        def process_or_crash(comment):
+            if comment is comments[1]:
+                raise Exception("Processing error")
+            return process_comment(comment)
+
+        self.async_core.process_comment = process_or_crash
+
+        with patch("hon_patch_notes_game_bot.async_core.asyncio.sleep", AsyncMock()):
+            assert asyncio.run(self.async_core.loop_async())
+
+        # The comments before the crash are acknowledged, but not the crashed one
+        self.mock_reddit.inbox.mark_read.assert_awaited_once_with([comments[0]])
+        assert not self.async_core.db.is_comment_processed(comments[1].fullname)
+
+    def test_matches_sync_engine(self):
+        sync_core = core.Core(
+            reddit=Mock(),
+            db=self._database,
+            submission=Mock(),
+            community_submission=Mock(
+                selftext="Test string", url=self.mock_community_submission.url
+            ),
+            patch_notes_file=self._patch_notes_file,
+        )
+        guesses = [
+            ("AsyncUser2", "Patch notes line number: 5"),
+            ("AsyncUser3", "Patch notes line number: 9"),
+            ("AsyncUser2", "Patch notes line number: 9"),
+            ("AsyncUser2", "Patch notes line number: 9001"),
+        ]
+
+        # Sync engine
+        sync_replies = []
+        for name, body in guesses:
+            sync_comment = Mock(spec=Comment)
+            sync_comment.author = make_author(name)
+            sync_comment.body = body
+            sync_comment.reply = Mock()
+            sync_core.process_comment(sync_comment)
+            sync_core.reply_dispatcher.wait()
+            sync_replies.append(sync_comment.reply.call_args)
+        assert all(sync_replies[:-1])  # Out of guesses: the last guess is ignored
+
+        # Reset the game state
+        for line_number in (5, 9):
+            self._database.delete_patch_notes_line_number(line_number)
+        for name in ("AsyncUser2", "AsyncUser3"):
+            self._database.backend.remove("user", name)
+        self._database.load_user_index()
+
+        # Asyncio engine
+        comments = [
+            self.make_comment(f"t1_async_match_{index}", make_author(name), body)
+            for index, (name, body) in enumerate(guesses)
+        ]
+        self.mock_reddit.inbox.unread = Mock(
+            side_effect=lambda limit: async_iter(comments)
+        )
+        assert asyncio.run(self.async_core.loop_async())
+        assert [comment.reply.await_args for comment in comments] == sync_replies
+
+        sync_core.shutdown()
+        for line_number in (5, 9):
+            self._database.delete_patch_notes_line_number(line_number)  # Teardown
+
+    def test_load_redditors(self):
+        cached_author = make_author("CachedAsyncUser")
+        self.async_core.eligibility_cache.get_profile(cached_author)
+        new_author = make_author("NewAsyncUser")
+        disallowed_author = make_author("ElementUser")
+        comments = [
+            self.make_comment("t1_a", cached_author, ""),
+            self.make_comment("t1_b", new_author, ""),
+            self.make_comment("t1_c", new_author, ""),
+            self.make_comment("t1_d", disallowed_author, ""),
+        ]
+
+        asyncio.run(self.async_core.load_redditors(comments))
+        cached_author.load.assert_not_awaited()
+        new_author.load.assert_awaited_once()
+        disallowed_author.load.assert_not_awaited()
+
+    def test_perform_post_game_actions_async(self):
+        self.async_core.reward_codes_filepath = f"tests/{REWARD_CODES_FILE_PATH}"
+        redditor = Mock(message=AsyncMock())
+        self.mock_reddit.redditor = AsyncMock(return_value=redditor)
+        asyncio.run(self.async_core.perform_post_game_actions_async())
+        self.mock_submission.edit.assert_awaited_once()
+        sent_message_count = redditor.message.await_count
+        assert sent_message_count > 0
+
+        # After a restart, the staff members & winners are not messaged again
+        self.mock_submission.selftext = self.mock_submission.edit.await_args.kwargs[
+            "body"
+        ]
+        asyncio.run(self.async_core.perform_post_game_actions_async())
+        assert redditor.message.await_count == sent_message_count
+        self._database.backend.truncate("outbound_message")  # Teardown
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+from requests.adapters import HTTPAdapter
+
+from hon_patch_notes_game_bot.client import (
+    RETRY_STATUS_CODES,
+    RequestTimingStats,
+    create_http_session,
+    get_endpoint,
+)
+from hon_patch_notes_game_bot.rate_limiter import RateLimiter
+
+
+def test_get_endpoint():
+    assert (
+        get_endpoint("GET", "https://oauth.reddit.com/message/unread/?limit=100")
+        == "GET /message/unread"
+    )
+    assert (
+        get_endpoint(
+            "GET",
+            "https://oauth.reddit.com/r/HeroesofNewerth/comments/abc123/some_title/",
+        )
+        == "GET /r/{subreddit}/comments/{id}"
+    )
+    assert (
+        get_endpoint("GET", "https://oauth.reddit.com/user/ElementUser/about/")
+        == "GET /user/{name}/about"
+    )
+    assert get_endpoint("POST", "https://oauth.reddit.com/api/comment/") == (
+        "POST /api/comment"
+    )
+
+
+def test_request_timing_stats():
+    timing_stats = RequestTimingStats()
+    timing_stats.record("POST /api/comment", 0.5)
+    timing_stats.record("POST /api/comment", 1.5, is_error=True)
+    timing_stats.record("GET /message/unread", 0.1)
+
+    stats = timing_stats.get("POST /api/comment")
+    assert stats.request_count == 2
+    assert stats.error_count == 1
+    assert stats.average_seconds == 1.0
+    assert stats.max_seconds == 1.5
+    assert timing_stats.get("GET /api/v1/me") is None
+
+    # Slowest endpoint first
+    assert timing_stats.summary().splitlines()[0].startswith("POST /api/comment: 2")
+
+
+def test_response_hook():
+    timing_stats = RequestTimingStats()
+    response = Mock()
+    response.request.method = "GET"
+    response.request.url = "https://oauth.reddit.com/message/unread/"
+    response.elapsed = timedelta(milliseconds=250)
+    response.status_code = 503
+
+    timing_stats.response_hook(response)
+    stats = timing_stats.get("GET /message/unread")
+    assert stats.request_count == 1
+    assert stats.error_count == 1
+    assert stats.total_seconds == 0.25
+
+
+def test_create_http_session():
+    rate_limiter = RateLimiter()
+    timing_stats = RequestTimingStats()
+    http_session = create_http_session(
+        rate_limiter, timing_stats, pool_size=5, max_retries=2, backoff_factor=0.1
+    )
+
+    assert rate_limiter.response_hook in http_session.hooks["response"]
+    assert timing_stats.response_hook in http_session.hooks["response"]
+
+    adapter = http_session.get_adapter("https://oauth.reddit.com")
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter._pool_maxsize == 5
+
+    # Server errors are retried for idempotent requests only
+    retry = adapter.max_retries
+    assert retry.total == 2
+    assert retry.status_forcelist == RETRY_STATUS_CODES
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("POST", 503)
+    assert not retry.is_retry("GET", 404)
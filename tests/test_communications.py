@@ -4,7 +4,7 @@ from pytest import mark
 from praw.exceptions import RedditAPIException
 
 from hon_patch_notes_game_bot import communications
-from hon_patch_notes_game_bot.utils import get_reward_codes_list
+from hon_patch_notes_game_bot.reward_codes import RewardCodeAllocator
 from hon_patch_notes_game_bot.config.config import (
     COMMUNITY_SUBMISSION_CONTENT_PATH,
     GOLD_COIN_REWARD,
@@ -62,8 +62,8 @@ class TestCommunications(TestCase):
                 communications.send_message_to_winners(
                     mock_reddit,
                     winners_list=["User1", "User2"],
-                    reward_codes_list=get_reward_codes_list(
-                        f"tests/{REWARD_CODES_FILE_PATH}"
+                    reward_code_allocator=RewardCodeAllocator(
+                        self._database, f"tests/{REWARD_CODES_FILE_PATH}"
                     ),
                     version_string="4.9.3",
                     gold_coin_reward=GOLD_COIN_REWARD,
@@ -92,6 +92,39 @@ class TestCommunications(TestCase):
         self.mock_reddit.redditor.side_effect = Exception()
         assert_test(self.mock_reddit)
 
+        # Teardown
+        self._database.backend.truncate("reward_code_assignment")
+        self._database.backend.truncate("metadata")
+
+    def test_send_message_to_winners_after_restart(self):
+        self.mock_reddit.redditor = Mock()
+
+        def send():
+            communications.send_message_to_winners(
+                self.mock_reddit,
+                winners_list=["User1", "User2"],
+                reward_code_allocator=RewardCodeAllocator(
+                    self._database, f"tests/{REWARD_CODES_FILE_PATH}"
+                ),
+                version_string="4.9.3",
+                gold_coin_reward=GOLD_COIN_REWARD,
+                database=self._database,
+            )
+
+        send()
+        assert self.mock_reddit.redditor.call_count == 2
+
+        # Winners that were already messaged are skipped, and keep their reward code
+        send()
+        assert self.mock_reddit.redditor.call_count == 2
+        assert sorted(
+            message["reward_code"] for message in self._database.get_outbound_messages()
+        ) == ["REWARD_CODE_1", "REWARD_CODE_2"]
+
+        # Teardown
+        for table_name in ("outbound_message", "reward_code_assignment", "metadata"):
+            self._database.backend.truncate(table_name)
+
     def test_init_submissions(self):
         submission_content_path = f"./tests/{SUBMISSION_CONTENT_PATH}"
         community_submission_content_path = (
@@ -0,0 +1,77 @@
+from pytest import mark
+
+from hon_patch_notes_game_bot.community_document import (
+    CommunityDocument,
+    build_community_document,
+    get_template_lines,
+    render_template_line,
+)
+from hon_patch_notes_game_bot.config.config import COMMUNITY_SUBMISSION_CONTENT_PATH
+
+
+def test_render_template_line():
+    assert render_template_line(123) == ">123 |\n\n"
+    assert render_template_line(123, "Line content\n") == ">123 | Line content\n\n"
+
+
+def test_fill_and_render():
+    document = CommunityDocument(
+        total_line_count=3, header="Header\n\n", footer="Footer"
+    )
+    assert document.fill(2, "Line content\n")
+    assert not document.fill(2, "Line content")
+    assert not document.fill(4, "Out of range")
+    assert document.get(2) == "Line content"
+    assert document.render() == "Header\n\n>1 |\n\n>2 | Line content\n\n>3 |\n\nFooter"
+
+    document.clear()
+    assert document.get(2) is None
+    assert document.render() == "Header\n\n>1 |\n\n>2 |\n\n>3 |\n\nFooter"
+
+
+def test_get_template_lines():
+    assert get_template_lines(2) == ("", ">1 |\n\n", ">2 |\n\n")
+    assert get_template_lines(2) is get_template_lines(2)
+
+    # Documents never modify the shared template lines
+    document = CommunityDocument(total_line_count=2)
+    document.fill(1, "First")
+    assert get_template_lines(2)[1] == ">1 |\n\n"
+
+
+def test_from_text():
+    document = CommunityDocument(
+        total_line_count=3, header="Header\n\n", footer="Footer"
+    )
+    document.fill(1, "First")
+    document.fill(3, "...")
+
+    parsed_document = CommunityDocument.from_text(document.render(), 3)
+    assert parsed_document.header == "Header\n\n"
+    assert parsed_document.footer == "Footer"
+    assert parsed_document.get(1) == "First"
+    assert parsed_document.get(2) is None
+    assert parsed_document.get(3) == "..."
+    assert parsed_document.render() == document.render()
+
+
+def test_from_text_without_template_lines():
+    document = CommunityDocument.from_text("Test string", 3)
+    assert document.render() == "Test string>1 |\n\n>2 |\n\n>3 |\n\n"
+
+
+@mark.usefixtures("get_patch_notes_file_class_fixture")
+class TestBuildCommunityDocument:
+    def test_build_community_document(self):
+        main_submission_url = "Main Submission URL"
+        document = build_community_document(
+            f"./tests/{COMMUNITY_SUBMISSION_CONTENT_PATH}",
+            self._patch_notes_file,
+            main_submission_url,
+        )
+        assert (
+            document.total_line_count == self._patch_notes_file.get_total_line_count()
+        )
+        assert main_submission_url in document.header
+        assert main_submission_url in document.footer
+        assert render_template_line(1) in document.render()
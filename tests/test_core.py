@@ -12,7 +12,8 @@ from prawcore.exceptions import ServerError
 from hon_patch_notes_game_bot import core
 from hon_patch_notes_game_bot.user import RedditUser
 from hon_patch_notes_game_bot.config.config import (
-    MIN_ACCOUNT_AGE_DAYS,
+    MARK_READ_BATCH_SIZE,
+    MAX_NUM_GUESSES,
     REWARD_CODES_FILE_PATH,
 )
 from hon_patch_notes_game_bot.utils import get_reward_codes_list
@@ -82,18 +83,11 @@ class TestCore(TestCase):
         self.mock_author.name = "I_do_not_exist_asjdoiajsdiodwjowjdwq"
         assert self.core.get_user_from_database(self.mock_author)
 
-    def test_is_account_too_new(self):
-        # "Old" user (passes the check)
-        self.mock_author.created_utc = 1609390800  # December 31, 2020 at 00:00:00
-        assert not self.core.is_account_too_new(self.mock_author, MIN_ACCOUNT_AGE_DAYS)
-
-        # "New" user (fails the check)
-        self.mock_author.created_utc = datetime.utcnow().timestamp()
-        assert self.core.is_account_too_new(self.mock_author, MIN_ACCOUNT_AGE_DAYS)
-
     def test_safe_comment_reply(self):
         # Regular use case
         assert self.core.safe_comment_reply(self.mock_comment, "Test Body") is None
+        self.core.reply_dispatcher.wait()
+        self.mock_comment.reply.assert_called_with(body="Test Body")
 
         # Exceptions
         self.mock_comment.reply.side_effect = RedditAPIException(
@@ -108,8 +102,18 @@ class TestCore(TestCase):
             )
             is None
         )
+        assert self.core.community_document.get(1) == "Test content line"
+        self.mock_community_submission.edit.assert_called_with(
+            body=self.core.community_document.render()
+        )
 
     def test_is_disallowed_to_post(self):
+        # Disable the eligibility cache, so that every check sees the updated account stats
+        self.core.eligibility_cache.ttl_seconds = 0
+        self.mock_author.comment_karma = 9999
+        self.mock_author.link_karma = 9999
+        self.mock_author.created_utc = 1609390800  # December 31, 2020 at 00:00:00
+
         # Disallowed users set condition
         self.mock_author.name = "ElementUser"
         assert self.core.is_disallowed_to_post(self.mock_author, self.mock_comment)
@@ -127,7 +131,7 @@ class TestCore(TestCase):
         self.mock_author.comment_karma = 9999
         self.mock_author.link_karma = 9999
 
-        # is_account_too_new() condition is True
+        # The account is too new (see eligibility.is_account_too_new())
         self.mock_author.created_utc = datetime.utcnow().timestamp()
         assert self.core.is_disallowed_to_post(self.mock_author, self.mock_comment)
         self.mock_author.created_utc = 1609390800  # December 31, 2020 at 00:00:00
@@ -138,21 +142,44 @@ class TestCore(TestCase):
     def test_fix_corrupted_community_submission_edit(self):
         assert self.core.fix_corrupted_community_submission_edit() is None
 
+    def test_process_comment_without_guess(self):
+        # Comments without a number never reach the eligibility checks & the database
+        author = Mock()
+        author.name = "NoGuessUser"
+        comment = Mock(body="No guess", author=author)
+        assert self.core.process_comment(comment)
+        comment.reply.assert_not_called()
+        assert not self.core.db.user_exists("NoGuessUser")
+        assert self.core.eligibility_cache.misses == 0
+
+    def test_process_comment_with_out_of_range_guess(self):
+        # Out-of-range guesses get a reply, but are not counted & do not add the user to the database
+        author = Mock()
+        author.name = "OutOfRangeUser"
+        comment = Mock(body="Line 99999", author=author)
+
+        with patch.object(
+            self.core, "is_disallowed_to_post", return_value=False
+        ), patch.object(self.core, "safe_comment_reply") as mock_reply:
+            assert self.core.process_comment(comment)
+
+        mock_reply.assert_called_once()
+        reply_text = mock_reply.call_args[0][1]
+        assert "does not exist in the patch notes" in reply_text
+        assert f"{MAX_NUM_GUESSES} guess(es) left" in reply_text
+        assert not self.core.db.user_exists("OutOfRangeUser")
+
+    def test_has_game_ended(self):
+        self.core.game_end_time = "September 1, 1990, 00:00:00 am UTC"
+        assert self.core.has_game_ended()
+        self.core.game_end_time = "December 31, 9001, 00:00:00 am UTC"
+        assert not self.core.has_game_ended()
+        assert self.core.game_end_time == "December 31, 9001, 00:00:00 am UTC"
+
     def test_perform_post_game_actions(self):
         self.core.reward_codes_filepath = f"tests/{REWARD_CODES_FILE_PATH}"
         assert self.core.perform_post_game_actions() is None
 
-    def test_update_patch_notes_table_in_db(self):
-        patch_notes_line_number = 1
-
-        assert self.core.update_patch_notes_table_in_db(patch_notes_line_number)
-
-        # If patch notes line number is already guessed (which it will be after the above test)
-        assert not self.core.update_patch_notes_table_in_db(patch_notes_line_number)
-
-        # Teardown step
-        self.core.db.delete_patch_notes_line_number(patch_notes_line_number)
-
     def test_process_guess_for_user(self):
         def assert_test(patch_notes_line_number):
             assert self.core.process_guess_for_user(
@@ -177,6 +204,11 @@ class TestCore(TestCase):
         assert_test(patch_notes_line_number)
         self.core.db.delete_patch_notes_line_number(patch_notes_line_number)
 
+        # Line number that does not exist in the patch notes
+        patch_notes_line_number = 9001
+        assert_test(patch_notes_line_number)
+        self.core.db.delete_patch_notes_line_number(patch_notes_line_number)
+
         # User cannot submit guess case
         patch_notes_line_number = 1
         self.dummy_user.can_submit_guess = False
@@ -208,6 +240,41 @@ class TestCore(TestCase):
         assert_test(patch_notes_line_number)
         self.core.db.delete_patch_notes_line_number(patch_notes_line_number)
 
+    @patch("time.sleep")
+    def test_loop_does_not_acknowledge_a_crashed_comment(self, sleep_func):
+        comments = []
+        for index in range(MARK_READ_BATCH_SIZE + 5):
+            comment = Mock(spec=Comment)
+            comment.fullname = f"t1_{index}"
+            comment.submission = self.mock_submission
+            comment.author = self.mock_author
+            comment.body = "No guess here"
+            comments.append(comment)
+        self.mock_submission.id = 694201
+        self.mock_reddit.inbox = Mock()
+        self.mock_reddit.inbox.unread = Mock(return_value=comments)
+        self.core.game_end_time = str(datetime.now(tz.UTC) + timedelta(days=30))
+
+        # Crash on the comment that completes a batch of items to mark as read
+        crashed_comment = comments[MARK_READ_BATCH_SIZE - 1]
+        process_comment = self.core.process_comment
+
+        def process_or_crash(comment):
+            if comment is crashed_comment:
+                raise Exception("Processing error")
+            return process_comment(comment)
+
+        self.core.process_comment = process_or_crash
+        assert self.core.loop()
+
+        marked_read_items = [
+            item
+            for call in self.mock_reddit.inbox.mark_read.call_args_list
+            for item in call.args[0]
+        ]
+        assert marked_read_items == comments[: MARK_READ_BATCH_SIZE - 1]
+        assert not self.core.db.is_comment_processed(crashed_comment.fullname)
+
     @patch("hon_patch_notes_game_bot.core.Core")
     @patch("time.sleep")
     def test_loop(self, mock_core, sleep_func=Mock()):
@@ -217,6 +284,7 @@ class TestCore(TestCase):
         self.mock_reddit.inbox = Mock()
         self.mock_comment = Mock(spec=Comment)
         self.mock_comment.submission = Mock(spec=Submission)
+        self.mock_comment.fullname = "t1_test_comment"
 
         # Set submission.id fields to be the same on both mocks
         self.mock_comment.submission.id = 694201
@@ -225,6 +293,7 @@ class TestCore(TestCase):
         self.mock_comment.body = f"Patch notes line number: {patch_notes_line_number}"
         self.mock_author.has_verified_email = True
         self.mock_author.comment_karma = 9001
+        self.mock_author.link_karma = 0
         self.mock_author.created_utc = 1609390800  # December 31, 2020 at 00:00:00
         self.mock_reddit.inbox.unread = Mock(return_value=[self.mock_comment])
 
@@ -236,8 +305,16 @@ class TestCore(TestCase):
         future_date = datetime.now(tz.UTC) + timedelta(days=30)
         self.core.game_end_time = str(future_date)
         assert self.core.loop()
+        assert self.core.last_pass_item_count == 1
+        assert self.core.db.is_comment_processed(self.mock_comment.fullname)
+        self.mock_reddit.inbox.mark_read.assert_called_with([self.mock_comment])
         self.core.db.delete_patch_notes_line_number(patch_notes_line_number)  # Teardown
 
+        # An already processed comment (e.g. not marked as read before a crash) is only marked as read
+        assert self.core.loop()
+        assert not self.core.db.check_patch_notes_line_number(patch_notes_line_number)
+        assert self.mock_reddit.inbox.mark_read.call_count == 2
+
         # Exception tests
         mock_response = Mock(spec=Response)
         mock_response.status_code = 503
@@ -246,6 +323,7 @@ class TestCore(TestCase):
         # Server error exception
         self.mock_reddit.inbox.unread.side_effect = ServerError(mock_response)
         assert self.core.loop()
+        mock_core.assert_not_called()  # The HTTP session retries server errors instead
         self.core.db.delete_patch_notes_line_number(patch_notes_line_number)  # Teardown
 
         # General exception
@@ -1,11 +1,11 @@
 import os
 import shutil
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pytest import mark
 
 from hon_patch_notes_game_bot.database import Database
 from hon_patch_notes_game_bot.user import RedditUser
-from tinydb import Query
 
 
 @pytest.fixture(scope="class")
@@ -33,9 +33,9 @@ class TestDataBase:
         self._database.insert_submission_url(
             tag="test_entry", submission_url=url_string
         )
-        assert self._database.db.table("submission").search(Query().url == url_string)
+        assert self._database.get_submission_url("test_entry") == url_string
         # Remove entry from database afterwards
-        self._database.db.table("submission").remove(Query().url == url_string)
+        assert self._database.backend.remove("submission", "test_entry")
 
     def test_get_submission_url(self):
         url_string = "https://www.reddit.com/r/HeroesofNewerth/comments/in14hz/game_486_patch_notes_guessing_game/"
@@ -64,8 +64,8 @@ class TestDataBase:
         reddit_user = self._database.convert_db_user_to_RedditUser(db_user)
 
         # Cannot iterate over an object's attributes directly,
-        # but can make a dictionary of their attributes via vars()
-        reddit_user_attributes = vars(reddit_user)
+        # but can make a dictionary of their attributes via to_dict()
+        reddit_user_attributes = reddit_user.to_dict()
 
         for key in db_user:
             assert db_user[key] == reddit_user_attributes[key]
@@ -81,6 +81,37 @@ class TestDataBase:
         new_db_user = self._database.get_user("S2Sliferjam")
         assert new_db_user["num_guesses"] == updated_num_guesses
 
+    def test_get_reddit_user(self):
+        reddit_user = self._database.get_reddit_user("S2Sliferjam")
+        assert reddit_user.to_dict() == self._database.get_user("S2Sliferjam")
+        assert self._database.get_reddit_user("random_user_1923812asd") is None
+
+        # The returned user is a copy of the indexed user
+        reddit_user.num_guesses += 1
+        assert self._database.get_user("S2Sliferjam")["num_guesses"] != (
+            reddit_user.num_guesses
+        )
+
+    def test_user_index_is_coherent(self):
+        username = "random_user_that_is_indexed_1923812asd"
+        self._database.add_user(RedditUser(name=username, num_guesses=1))
+        assert self._database.get_user(username)["num_guesses"] == 1
+
+        self._database.update_user(RedditUser(name=username, num_guesses=2))
+        assert self._database.get_user(username)["num_guesses"] == 2
+
+        # The index should match what is stored in the user table after a rebuild
+        self._database.load_user_index()
+        assert self._database.get_user(username)["num_guesses"] == 2
+
+    def test_user_lookup_without_index(self):
+        database = Database(db_path=self._database.db_path, index_users=False)
+        assert database.user_exists("S2Sliferjam")
+        assert database.get_user("S2Sliferjam")
+        assert not database.user_exists(
+            "random_user_that_doesnt_exist_89213u893u13u132u139u31983u13dasdadsadsa"
+        )
+
     def test_check_patch_notes_line_number(self):
         assert self._database.check_patch_notes_line_number(69)
 
@@ -91,9 +122,38 @@ class TestDataBase:
         added_line_number = 77777
         self._database.add_patch_notes_line_number(added_line_number)
         assert self._database.check_patch_notes_line_number(added_line_number)
-        self._database.db.table("patch_notes_line_tracker").remove(
-            Query().id == added_line_number
+        assert self._database.delete_patch_notes_line_number(added_line_number)
+        assert not self._database.check_patch_notes_line_number(added_line_number)
+
+    def test_apply_guess(self):
+        username = "random_user_that_guesses_1923812asd"
+        self._database.add_user(RedditUser(name=username))
+
+        applied_guess = self._database.apply_guess(
+            RedditUser(name=username), 77777, is_correct=True, max_num_guesses=2
+        )
+        assert applied_guess.accepted and applied_guess.line_claimed
+        assert applied_guess.user.is_potential_winner
+        assert self._database.check_patch_notes_line_number(77777)
+
+        # A guess on a line that was already guessed is counted, but does not make the user a winner again
+        applied_guess = self._database.apply_guess(
+            RedditUser(name=username), 77777, is_correct=True, max_num_guesses=2
         )
+        assert applied_guess.accepted and not applied_guess.line_claimed
+        assert applied_guess.user.num_correct_guesses == 1
+        assert not applied_guess.user.can_submit_guess
+
+        # The stored state is used (the user object passed in is stale)
+        applied_guess = self._database.apply_guess(
+            RedditUser(name=username), 77778, is_correct=True, max_num_guesses=2
+        )
+        assert not applied_guess.accepted
+        assert not self._database.check_patch_notes_line_number(77778)
+        assert self._database.get_user(username)["num_guesses"] == 2
+
+        # Teardown step
+        self._database.delete_patch_notes_line_number(77777)
 
     def test_get_entry_count_in_patch_notes_line_tracker(self):
         entry_count = self._database.get_entry_count_in_patch_notes_line_tracker()
@@ -101,10 +161,37 @@ class TestDataBase:
         ## We know the number of lines in the test database
         assert entry_count == 102
 
+    def test_processed_comments(self):
+        comment_id = "t1_processed_comment"
+        assert not self._database.is_comment_processed(comment_id)
+        self._database.add_processed_comment(comment_id)
+        self._database.add_processed_comment(comment_id)
+        assert self._database.is_comment_processed(comment_id)
+        assert [
+            entry
+            for entry in self._database.backend.all("processed_comment")
+            if entry["id"] == comment_id
+        ] == [{"id": comment_id}]
+
+    def test_metadata(self):
+        assert self._database.get_metadata("test_key") is None
+        self._database.set_metadata("test_key", 1)
+        self._database.set_metadata("test_key", 2)
+        assert self._database.get_metadata("test_key") == 2
+        assert self._database.backend.count("metadata") == 1
+        self._database.backend.truncate("metadata")  # Teardown
+
     def test_get_potential_winners_list(self):
         potential_winners_list = self._database.get_potential_winners_list()
         assert len(potential_winners_list) > 0
 
+    def test_iter_potential_winners(self):
+        potential_winners = list(self._database.iter_potential_winners())
+        assert all(user.is_potential_winner for user in potential_winners)
+        assert [
+            user.name for user in potential_winners
+        ] == self._database.get_potential_winners_list()
+
     def test_get_random_winners_from_list(self):
         num_winners = 10
         potential_winners_list = self._database.get_potential_winners_list()
@@ -124,3 +211,66 @@ class TestDataBase:
         )
         assert len(random_winners_list) < overly_large_num_winners
 
+
+class TestWriteBehindMiddleware:
+    def test_writes_are_batched(self, tmp_path):
+        database = Database(
+            db_path=str(tmp_path / "db.json"),
+            max_write_delay_seconds=3600,
+            max_pending_writes=3,
+        )
+
+        database.add_patch_notes_line_number(1)
+        database.add_patch_notes_line_number(2)
+        assert database.backend.storage.pending_ops == 2
+        assert database.backend.storage.flush_count == 0
+
+        # Reaching the max pending write count forces a flush
+        database.add_patch_notes_line_number(3)
+        assert database.backend.storage.pending_ops == 0
+        assert database.backend.storage.flush_count == 1
+
+    def test_buffered_writes_are_persisted(self, tmp_path):
+        db_path = str(tmp_path / "db.json")
+        database = Database(
+            db_path=db_path, max_write_delay_seconds=3600, max_pending_writes=100
+        )
+        database.add_user(RedditUser(name="buffered_user"))
+        assert not Database(db_path=db_path).user_exists("buffered_user")
+
+        database.flush()
+        assert Database(db_path=db_path).user_exists("buffered_user")
+
+        database.update_user(RedditUser(name="buffered_user", num_guesses=1))
+        database.close()
+        assert Database(db_path=db_path).get_user("buffered_user")["num_guesses"] == 1
+
+    def test_max_delay_forces_flush(self, tmp_path):
+        database = Database(
+            db_path=str(tmp_path / "db.json"),
+            max_write_delay_seconds=0,
+            max_pending_writes=100,
+        )
+        database.add_patch_notes_line_number(1)
+        assert database.backend.storage.pending_ops == 0
+
+
+def test_concurrent_guesses_claim_a_line_once(tmp_path):
+    database = Database(db_path=str(tmp_path / "db.json"), total_line_count=10)
+    usernames = [f"user{index}" for index in range(8)]
+    for username in usernames:
+        database.add_user(RedditUser(name=username))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        applied_guesses = list(
+            executor.map(
+                lambda username: database.apply_guess(
+                    RedditUser(name=username), 5, is_correct=True
+                ),
+                usernames,
+            )
+        )
+
+    assert sum(applied_guess.line_claimed for applied_guess in applied_guesses) == 1
+    assert len(database.get_potential_winners_list()) == 1
+    database.close()
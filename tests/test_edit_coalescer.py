@@ -0,0 +1,79 @@
+from unittest.mock import Mock
+
+from hon_patch_notes_game_bot.edit_coalescer import SubmissionEditCoalescer
+
+
+def get_coalescer(clock):
+    submission = Mock()
+    body = {"text": "Body 0"}
+    coalescer = SubmissionEditCoalescer(
+        submission, lambda: body["text"], min_interval_seconds=30, clock=clock
+    )
+    return coalescer, submission, body
+
+
+# ============
+# Unit tests
+# ============
+
+
+def test_edits_are_coalesced_within_interval(fake_clock):
+    coalescer, submission, body = get_coalescer(fake_clock)
+
+    # The first edit is published immediately
+    assert coalescer.request_edit()
+    submission.edit.assert_called_once_with(body="Body 0")
+
+    # Edits within the interval are held back
+    for index in range(1, 50):
+        body["text"] = f"Body {index}"
+        assert not coalescer.request_edit()
+    assert submission.edit.call_count == 1
+    assert coalescer.has_pending_edit
+
+    # Publishing sends only the latest body
+    assert coalescer.publish()
+    submission.edit.assert_called_with(body="Body 49")
+    assert coalescer.edits_requested == 50
+    assert coalescer.edits_published == 2
+    assert coalescer.edits_saved == 48
+
+    # Nothing left to publish
+    assert not coalescer.publish()
+
+
+def test_edit_is_published_after_interval(fake_clock):
+    coalescer, submission, _ = get_coalescer(fake_clock)
+
+    assert coalescer.request_edit()
+    fake_clock.current_time += 30
+    assert coalescer.request_edit()
+    assert submission.edit.call_count == 2
+
+
+def test_safe_publish_keeps_edit_pending_on_error(fake_clock):
+    coalescer, submission, _ = get_coalescer(fake_clock)
+    assert coalescer.request_edit()
+    assert not coalescer.request_edit()
+
+    submission.edit.side_effect = Exception("Server error")
+    assert not coalescer.safe_publish()
+    assert coalescer.has_pending_edit
+
+    submission.edit.side_effect = None
+    assert coalescer.safe_publish()
+    assert not coalescer.has_pending_edit
+
+
+def test_request_edit_keeps_edit_pending_on_error(fake_clock):
+    coalescer, submission, _ = get_coalescer(fake_clock)
+
+    # A failed edit does not raise to the guess being processed
+    submission.edit.side_effect = Exception("Server error")
+    assert not coalescer.request_edit()
+    assert coalescer.has_pending_edit
+    assert coalescer.edits_published == 0
+
+    submission.edit.side_effect = None
+    assert coalescer.publish()
+    assert not coalescer.has_pending_edit
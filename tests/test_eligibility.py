@@ -0,0 +1,120 @@
+from unittest.mock import Mock, patch
+from pytest import mark
+
+from hon_patch_notes_game_bot.eligibility import (
+    EligibilityCache,
+    EligibilityVerdict,
+    RedditorProfile,
+    get_eligibility_verdict,
+    is_account_too_new,
+)
+from hon_patch_notes_game_bot.config.config import (
+    MIN_ACCOUNT_AGE_DAYS,
+    MIN_COMMENT_KARMA,
+    MIN_LINK_KARMA,
+)
+
+NOW = 1700000000.0
+OLD_ACCOUNT_CREATED_UTC = 1609390800.0  # December 31, 2020 at 00:00:00
+
+
+def make_profile(**kwargs) -> RedditorProfile:
+    fields = dict(
+        name="User1",
+        has_verified_email=True,
+        comment_karma=MIN_COMMENT_KARMA,
+        link_karma=0,
+        created_utc=OLD_ACCOUNT_CREATED_UTC,
+        fetched_at=NOW,
+    )
+    fields.update(kwargs)
+    return RedditorProfile(**fields)
+
+
+def test_is_account_too_new():
+    # "Old" user (passes the check)
+    assert not is_account_too_new(OLD_ACCOUNT_CREATED_UTC, MIN_ACCOUNT_AGE_DAYS, NOW)
+
+    # "New" user (fails the check)
+    assert is_account_too_new(NOW, MIN_ACCOUNT_AGE_DAYS, NOW)
+
+
+def test_get_eligibility_verdict():
+    assert get_eligibility_verdict(make_profile(), NOW) == EligibilityVerdict.ELIGIBLE
+    assert (
+        get_eligibility_verdict(make_profile(has_verified_email=False), NOW)
+        == EligibilityVerdict.UNVERIFIED_EMAIL
+    )
+    assert (
+        get_eligibility_verdict(make_profile(comment_karma=0), NOW)
+        == EligibilityVerdict.LOW_KARMA
+    )
+    assert (
+        get_eligibility_verdict(
+            make_profile(comment_karma=0, link_karma=MIN_LINK_KARMA), NOW
+        )
+        == EligibilityVerdict.ELIGIBLE
+    )
+
+    # The account age is measured against the current time
+    new_account = make_profile(created_utc=NOW - 60)
+    assert get_eligibility_verdict(new_account, NOW) == (
+        EligibilityVerdict.ACCOUNT_TOO_NEW
+    )
+    later = NOW + MIN_ACCOUNT_AGE_DAYS * 86400
+    assert get_eligibility_verdict(new_account, later) == EligibilityVerdict.ELIGIBLE
+
+
+@mark.usefixtures("setup_and_teardown_test_database")
+class TestEligibilityCache:
+    def make_redditor(self, name: str):
+        redditor = patch("praw.models.Redditor")
+        redditor.name = name
+        redditor.has_verified_email = True
+        redditor.comment_karma = 9001
+        redditor.link_karma = 0
+        redditor.created_utc = OLD_ACCOUNT_CREATED_UTC
+        return redditor
+
+    def test_cache_hit(self):
+        clock = Mock(return_value=NOW)
+        cache = EligibilityCache(self._database, ttl_seconds=3600, clock=clock)
+        redditor = self.make_redditor("CachedUser")
+
+        assert cache.get_verdict(redditor) == EligibilityVerdict.ELIGIBLE
+        assert cache.misses == 1
+
+        # Changes to the account are not seen until the cached stats expire
+        redditor.has_verified_email = False
+        assert cache.get_verdict(redditor) == EligibilityVerdict.ELIGIBLE
+        assert cache.hits == 1
+
+        clock.return_value = NOW + 3600
+        assert cache.get_verdict(redditor) == EligibilityVerdict.UNVERIFIED_EMAIL
+        assert cache.misses == 2
+
+        # The verdict is persisted along with the account stats
+        cached_profile = self._database.get_redditor_profile("CachedUser")
+        assert cached_profile["verdict"] == EligibilityVerdict.UNVERIFIED_EMAIL.value
+        assert cached_profile["fetched_at"] == NOW + 3600
+        assert self._database.backend.count("redditor_profile") == 1
+
+    def test_rejected_user_is_not_fetched_again(self):
+        clock = Mock(return_value=NOW)
+        cache = EligibilityCache(self._database, ttl_seconds=3600, clock=clock)
+        redditor = self.make_redditor("RejectedUser")
+        redditor.comment_karma = 0
+        assert cache.get_verdict(redditor) == EligibilityVerdict.LOW_KARMA
+
+        # A Redditor whose stats would need a network call to load
+        unloaded_redditor = patch("praw.models.Redditor")
+        unloaded_redditor.name = "RejectedUser"
+        assert cache.get_verdict(unloaded_redditor) == EligibilityVerdict.LOW_KARMA
+
+    def test_cache_disabled(self):
+        cache = EligibilityCache(self._database, ttl_seconds=0)
+        redditor = self.make_redditor("UncachedUser")
+        cache.get_verdict(redditor)
+        cache.get_verdict(redditor)
+        assert cache.hits == 0
+        assert cache.misses == 2
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+from dateutil import tz
+from unittest.mock import Mock
+
+from hon_patch_notes_game_bot.game_clock import GameClock, parse_game_end_time
+
+
+def test_parse_game_end_time():
+    game_end_datetime = parse_game_end_time("November 27, 2021, 4:00 am UTC")
+    assert game_end_datetime == datetime(2021, 11, 27, 4, tzinfo=tz.UTC)
+    assert parse_game_end_time("2021-11-27 04:00:00") == game_end_datetime
+
+
+def test_game_clock():
+    now = datetime(2021, 11, 27, 3, 59, tzinfo=tz.UTC)
+    clock = Mock(return_value=1000.0)
+    game_clock = GameClock(
+        "November 27, 2021, 4:00 am UTC", now=lambda: now, clock=clock
+    )
+    assert not game_clock.is_expired()
+    assert game_clock.seconds_remaining == 60
+
+    # Only the monotonic clock is read after the deadline is anchored
+    now += timedelta(days=1)
+    clock.return_value += 60
+    assert not game_clock.is_expired()
+    clock.return_value += 1
+    assert game_clock.is_expired()
+    assert game_clock.seconds_remaining == 0
+
+    # Setting another end time anchors a new deadline
+    game_clock.set_game_end_time(str(now + timedelta(hours=1)))
+    assert not game_clock.is_expired()
+    assert game_clock.seconds_remaining == 3600
@@ -0,0 +1,29 @@
+from hon_patch_notes_game_bot.guess_parser import GuessParser, find_first_line_number
+
+
+def test_find_first_line_number():
+    assert find_first_line_number("Line #123, or 456") == "123"
+    assert find_first_line_number("No number\n123") is None
+    assert find_first_line_number("") is None
+
+
+def test_parse():
+    guess_parser = GuessParser(total_line_count=730)
+    assert guess_parser.parse("Patch notes line number: 1") == 1
+    assert guess_parser.parse("730\n\nMy guess") == 730
+    assert guess_parser.parse("0730") == 730
+    assert guess_parser.parse("Just a comment") is None
+
+    # Line numbers outside of the patch notes' line range
+    assert guess_parser.parse("0") is None
+    assert guess_parser.parse("731") is None
+    assert guess_parser.parse("9" * 10000) is None
+
+
+def test_is_out_of_range():
+    guess_parser = GuessParser(total_line_count=730)
+    assert guess_parser.is_out_of_range("Line #0")
+    assert guess_parser.is_out_of_range("731")
+    assert guess_parser.is_out_of_range("9" * 10000)
+    assert not guess_parser.is_out_of_range("730")
+    assert not guess_parser.is_out_of_range("No guess")
@@ -0,0 +1,246 @@
+from unittest.mock import Mock, patch
+from unittest import TestCase
+from pytest import mark
+
+from praw.models import Comment, Message, MoreComments, Submission
+
+from hon_patch_notes_game_bot.ingestion import (
+    InboxIngestion,
+    STREAM_HIGH_WATER_MARK_KEY,
+    SubmissionStreamIngestion,
+)
+from hon_patch_notes_game_bot.config.config import MARK_READ_BATCH_SIZE
+
+BOT_USERNAME = "PatchNotesBot"
+SUBMISSION_FULLNAME = "t3_main"
+
+
+def make_comment(
+    fullname: str,
+    author_name: str = "User1",
+    parent_id: str = SUBMISSION_FULLNAME,
+    link_id: str = SUBMISSION_FULLNAME,
+    created_utc: float = 1000.0,
+):
+    comment = Mock(spec=Comment)
+    comment.fullname = fullname
+    comment.author = Mock()
+    comment.author.name = author_name
+    comment.parent_id = parent_id
+    comment.link_id = link_id
+    comment.created_utc = created_utc
+    return comment
+
+
+class TestInboxIngestion(TestCase):
+    def setUp(self):
+        self.mock_reddit = patch("praw.Reddit")
+        self.mock_reddit.inbox = Mock()
+        self.mock_submission = Mock(spec=Submission)
+        self.mock_submission.id = "main"
+        self.ingestion = InboxIngestion(self.mock_reddit, self.mock_submission)
+
+    def test_fetch_comments(self):
+        main_comment = Mock(spec=Comment)
+        main_comment.submission = self.mock_submission
+        other_comment = Mock(spec=Comment)
+        other_comment.submission = Mock(spec=Submission)
+        other_comment.submission.id = "other"
+        message = Mock(spec=Message)
+        self.mock_reddit.inbox.unread = Mock(
+            return_value=[main_comment, other_comment, message]
+        )
+
+        # Only the main submission's comments are yielded, but every item is acknowledged
+        assert list(self.ingestion.fetch_comments()) == [main_comment]
+        assert self.ingestion.pending_acknowledgements == 2
+
+        # The yielded comments are only acknowledged once handled
+        self.ingestion.mark_handled(main_comment)
+        assert self.ingestion.pending_acknowledgements == 3
+        self.ingestion.acknowledge()
+        self.mock_reddit.inbox.mark_read.assert_called_once_with(
+            [other_comment, message, main_comment]
+        )
+        assert self.ingestion.pending_acknowledgements == 0
+
+        # Nothing to acknowledge
+        self.ingestion.acknowledge()
+        assert self.mock_reddit.inbox.mark_read.call_count == 1
+
+    def test_acknowledge_in_batches(self):
+        items = [Mock(spec=Message) for _ in range(MARK_READ_BATCH_SIZE + 1)]
+        self.mock_reddit.inbox.unread = Mock(return_value=items)
+        list(self.ingestion.fetch_comments())
+
+        self.ingestion.acknowledge()
+        assert self.mock_reddit.inbox.mark_read.call_count == 2
+        self.mock_reddit.inbox.mark_read.assert_called_with(items[-1:])
+
+        # Errors are logged instead of raised
+        self.mock_reddit.inbox.unread = Mock(return_value=items[:1])
+        list(self.ingestion.fetch_comments())
+        self.mock_reddit.inbox.mark_read.side_effect = Exception("Mark read error")
+        self.ingestion.acknowledge()
+        assert self.ingestion.pending_acknowledgements == 0
+
+
+class FakeCommentForest(list):
+    """
+    The top-level comments of a submission, newest first
+    """
+
+    def __init__(self, top_level_comments, hidden_comments=()):
+        super().__init__(top_level_comments)
+        self.hidden_comments = list(hidden_comments)
+        if self.hidden_comments:
+            self.append(Mock(spec=MoreComments))
+        self.replace_more = Mock(side_effect=self._load_hidden_comments)
+
+    def _load_hidden_comments(self, limit):
+        del self[-1]
+        self.extend(self.hidden_comments)
+        self.hidden_comments = []
+
+
+@mark.usefixtures("setup_and_teardown_test_database")
+class TestSubmissionStreamIngestion(TestCase):
+    def setUp(self):
+        self.mock_reddit = Mock()
+        self.mock_submission = Mock(spec=Submission)
+        self.mock_submission.id = "main"
+        self.mock_submission.fullname = SUBMISSION_FULLNAME
+        self.mock_submission.subreddit = Mock()
+        self.forests: list = []
+        self.mock_reddit.submission = Mock(side_effect=self.poll_submission)
+
+        # The replies to the bot's comments in its inbox, newest first
+        self.inbox_replies: list = []
+        self.mock_reddit.inbox.comment_replies = Mock(
+            side_effect=lambda limit: iter(self.inbox_replies)
+        )
+
+    def poll_submission(self, id):
+        polled_submission = Mock()
+        polled_submission.comments = (
+            self.forests.pop(0) if self.forests else FakeCommentForest([])
+        )
+        return polled_submission
+
+    def make_ingestion(self, **kwargs) -> SubmissionStreamIngestion:
+        return SubmissionStreamIngestion(
+            self.mock_reddit,
+            self.mock_submission,
+            self._database,
+            BOT_USERNAME,
+            **kwargs,
+        )
+
+    def fetch_and_handle(self, ingestion: SubmissionStreamIngestion) -> list:
+        comments = list(ingestion.fetch_comments())
+        for comment in comments:
+            ingestion.mark_handled(comment)
+        return comments
+
+    def test_fetch_comments(self):
+        rate_limiter = Mock()
+        ingestion = self.make_ingestion(rate_limiter=rate_limiter)
+        bot_comment = make_comment("t1_bot", author_name=BOT_USERNAME, created_utc=1)
+        top_level_comment = make_comment("t1_top", created_utc=2)
+        nested_reply_to_bot = make_comment(
+            "t1_nested_reply", parent_id="t1_deep_bot", created_utc=3
+        )
+        other_thread_reply = make_comment(
+            "t1_other_thread", parent_id="t1_other_bot", link_id="t3_other"
+        )
+
+        # Top-level comments are polled from the main submission, replies to the bot from the inbox.
+        #   Both are yielded oldest first.
+        self.forests.append(FakeCommentForest([top_level_comment, bot_comment]))
+        self.inbox_replies = [nested_reply_to_bot, other_thread_reply]
+        assert list(ingestion.fetch_comments()) == [
+            top_level_comment,
+            nested_reply_to_bot,
+        ]
+        self.mock_reddit.submission.assert_called_once_with(id="main")
+        self.mock_submission.subreddit.comments.assert_not_called()
+        assert ingestion.pending_acknowledgements == 0
+        assert rate_limiter.acquire.call_count == 2
+
+        # Unhandled comments are fetched again, handled ones are not
+        self.forests.append(FakeCommentForest([top_level_comment, bot_comment]))
+        assert self.fetch_and_handle(ingestion) == [
+            top_level_comment,
+            nested_reply_to_bot,
+        ]
+        assert ingestion.pending_acknowledgements == 2
+        self.forests.append(FakeCommentForest([top_level_comment, bot_comment]))
+        assert list(ingestion.fetch_comments()) == []
+
+    def test_replies_are_read_down_to_the_high_water_mark(self):
+        self._database.set_metadata(STREAM_HIGH_WATER_MARK_KEY, 1000.0)
+        ingestion = self.make_ingestion()
+        new_reply = make_comment("t1_new", parent_id="t1_bot", created_utc=2000.0)
+        old_reply = make_comment("t1_old", parent_id="t1_bot", created_utc=900.0)
+        older_reply = make_comment("t1_older", parent_id="t1_bot", created_utc=800.0)
+        read_replies = []
+
+        def comment_replies(limit):
+            for reply in [new_reply, old_reply, older_reply]:
+                read_replies.append(reply)
+                yield reply
+
+        # The inbox listing is not read past the first reply older than the mark
+        self.mock_reddit.inbox.comment_replies = Mock(side_effect=comment_replies)
+        assert list(ingestion.fetch_comments()) == [new_reply]
+        assert read_replies == [new_reply, old_reply]
+        self._database.set_metadata(STREAM_HIGH_WATER_MARK_KEY, None)  # Teardown
+
+    def test_hidden_comments_are_loaded(self):
+        self._database.set_metadata(STREAM_HIGH_WATER_MARK_KEY, 1000.0)
+        ingestion = self.make_ingestion()
+        burst = [
+            make_comment(f"t1_burst_{index}", created_utc=2000.0 - index)
+            for index in range(3)
+        ]
+        old_comment = make_comment("t1_old", created_utc=900.0)
+
+        # The loaded comments are all newer than the high-water mark: the hidden ones are loaded too
+        forest = FakeCommentForest(burst[:2], hidden_comments=[burst[2], old_comment])
+        self.forests.append(forest)
+        assert list(ingestion.fetch_comments()) == burst[::-1]
+        forest.replace_more.assert_called_once_with(limit=1)
+
+        # Hidden comments that are older than the high-water mark are not loaded
+        forest = FakeCommentForest(
+            [*burst, old_comment], hidden_comments=[make_comment("t1_older")]
+        )
+        self.forests.append(forest)
+        list(ingestion.fetch_comments())
+        forest.replace_more.assert_not_called()
+        self._database.set_metadata(STREAM_HIGH_WATER_MARK_KEY, None)  # Teardown
+
+    def test_high_water_mark(self):
+        ingestion = self.make_ingestion()
+        self.forests.append(
+            FakeCommentForest([make_comment("t1_new", created_utc=2000.0)])
+        )
+        comments = list(ingestion.fetch_comments())
+        assert len(comments) == 1
+
+        # The high-water mark only advances once the comment is handled, & is only persisted once acknowledged
+        assert ingestion.high_water_mark == 0.0
+        ingestion.mark_handled(comments[0])
+        assert self._database.get_metadata(STREAM_HIGH_WATER_MARK_KEY) is None
+        ingestion.acknowledge()
+        assert self._database.get_metadata(STREAM_HIGH_WATER_MARK_KEY) == 2000.0
+        assert ingestion.pending_acknowledgements == 0
+
+        # After a restart, older comments are skipped
+        restarted_ingestion = self.make_ingestion()
+        assert restarted_ingestion.high_water_mark == 2000.0
+        old_comment = make_comment("t1_old", created_utc=1500.0)
+        new_comment = make_comment("t1_newer", created_utc=2500.0)
+        self.forests.append(FakeCommentForest([new_comment, old_comment]))
+        assert list(restarted_ingestion.fetch_comments()) == [new_comment]
+        self._database.set_metadata(STREAM_HIGH_WATER_MARK_KEY, None)  # Teardown
@@ -0,0 +1,48 @@
+from pytest import mark
+
+from hon_patch_notes_game_bot.line_classifier import (
+    LineClassificationTable,
+    LineOutcome,
+)
+from hon_patch_notes_game_bot.config.config import BLANK_LINE_REPLACEMENT
+
+
+@mark.usefixtures("get_patch_notes_file_class_fixture")
+class TestLineClassificationTable:
+    def setup_method(self):
+        self.table = LineClassificationTable(self._patch_notes_file)
+
+    def test_length(self):
+        assert len(self.table) == self._patch_notes_file.get_total_line_count()
+
+    def test_valid_line(self):
+        # Since the test file is static, we know that line 1 has actual content
+        classification = self.table.classify(1)
+        assert classification.outcome is LineOutcome.VALID
+        assert classification.reveal_text == classification.line_content.rstrip()
+
+    def test_invalid_line(self):
+        # Since the test file is static, we know that line 2 contains an invalid string
+        classification = self.table.classify(2)
+        assert classification.outcome is LineOutcome.INVALID
+        assert classification.invalid_string in classification.line_content
+
+    def test_blank_line(self):
+        classification = self.table.classify(4)
+        assert classification.outcome is LineOutcome.BLANK
+        assert classification.reveal_text == BLANK_LINE_REPLACEMENT
+
+    def test_out_of_range_line(self):
+        assert self.table.classify(0).outcome is LineOutcome.OUT_OF_RANGE
+        assert self.table.classify(731).outcome is LineOutcome.OUT_OF_RANGE
+
+    def test_line_counts(self):
+        assert self.table.blank_line_count + self.table.invalid_line_count == len(
+            self._patch_notes_file.get_list_of_blank_line_numbers()
+        )
+        assert (
+            self.table.valid_line_count
+            + self.table.invalid_line_count
+            + self.table.blank_line_count
+            == len(self.table)
+        )
@@ -0,0 +1,41 @@
+from hon_patch_notes_game_bot.line_tracker import GuessedLineTracker
+
+# ============
+# Unit tests
+# ============
+
+
+def test_add_and_contains():
+    tracker = GuessedLineTracker(size=16)
+    assert 5 not in tracker
+    assert tracker.add(5)
+    assert 5 in tracker
+    assert not tracker.add(5)
+    assert len(tracker) == 1
+
+
+def test_remove():
+    tracker = GuessedLineTracker(size=16, line_numbers=[1, 2, 3])
+    assert tracker.remove(2)
+    assert not tracker.remove(2)
+    assert 2 not in tracker
+    assert len(tracker) == 2
+
+
+def test_grows_past_initial_size():
+    tracker = GuessedLineTracker(size=8)
+    assert 69420 not in tracker
+    assert tracker.add(69420)
+    assert 69420 in tracker
+    assert len(tracker) == 1
+
+
+def test_iterates_in_ascending_order():
+    tracker = GuessedLineTracker(line_numbers=[730, 1, 64, 9])
+    assert list(tracker) == [1, 9, 64, 730]
+
+
+def test_invalid_line_numbers():
+    tracker = GuessedLineTracker()
+    assert -1 not in tracker
+    assert "1" not in tracker
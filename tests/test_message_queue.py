@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import Mock
+from pytest import mark
+from praw.exceptions import RedditAPIException
+
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.message_queue import (
+    DispatchResult,
+    MessageStatus,
+    OutboundMessageQueue,
+)
+
+RATE_LIMIT_ERROR = RedditAPIException(
+    [["RATELIMIT", "Take a break for 4 minutes before trying again.", None]]
+)
+
+
+def make_reddit(side_effects: dict):
+    """
+    Creates a mock Reddit instance, whose redditors' message() calls use the given side effects (by username)
+    """
+    redditors: dict = {}
+
+    def redditor(name: str):
+        if name not in redditors:
+            redditors[name] = Mock()
+            redditors[name].message = Mock(side_effect=side_effects.get(name))
+        return redditors[name]
+
+    reddit = Mock()
+    reddit.redditor = Mock(side_effect=redditor)
+    return reddit, redditors
+
+
+def test_enqueue_is_idempotent():
+    message_queue = OutboundMessageQueue(Mock())
+    assert message_queue.enqueue("winner:1:User1", "User1", "Subject", "Body", "Code1")
+    assert not message_queue.enqueue("winner:1:User1", "User1", "Subject", "Body")
+    assert len(message_queue) == 1
+    assert message_queue.get("winner:1:User1")["reward_code"] == "Code1"
+
+
+def test_dispatch_with_retries():
+    reddit, redditors = make_reddit(
+        {
+            "RateLimitedOnce": [RATE_LIMIT_ERROR, None],
+            "AlwaysRateLimited": RATE_LIMIT_ERROR,
+            "Broken": Exception("General error"),
+        }
+    )
+    sleep = Mock()
+    message_queue = OutboundMessageQueue(
+        reddit, num_workers=3, max_attempts=3, sleep=sleep
+    )
+    for name in ("User1", "RateLimitedOnce", "AlwaysRateLimited", "Broken"):
+        message_queue.enqueue(f"winner:1:{name}", name, "Subject", f"Body {name}")
+
+    assert message_queue.dispatch() == DispatchResult(sent=2, failed=2, pending=0)
+
+    # Errors other than rate limits are not retried, rate limits are retried in rounds up to the max attempts
+    assert redditors["User1"].message.call_count == 1
+    assert redditors["Broken"].message.call_count == 1
+    assert redditors["RateLimitedOnce"].message.call_count == 2
+    assert redditors["AlwaysRateLimited"].message.call_count == 3
+    sleep.assert_called_with(4 * 60 + 1)
+    assert sleep.call_count == 2
+    redditors["User1"].message.assert_called_with(
+        subject="Subject", message="Body User1"
+    )
+    assert (
+        message_queue.get("winner:1:AlwaysRateLimited")["status"]
+        == MessageStatus.FAILED.value
+    )
+
+
+@mark.usefixtures("setup_and_teardown_test_database")
+class TestPersistedQueue:
+    def test_restart(self):
+        reddit, redditors = make_reddit({"CrashedUser": Exception("Crash")})
+        message_queue = OutboundMessageQueue(reddit, self._database)
+        message_queue.enqueue("staff:1:SentUser", "SentUser", "Subject", "Body")
+        message_queue.enqueue("staff:1:CrashedUser", "CrashedUser", "Subject", "Body")
+        message_queue.dispatch()
+
+        # After a restart, sent messages are neither queued nor sent again
+        restarted_queue = OutboundMessageQueue(reddit, self._database)
+        assert len(restarted_queue) == 2
+        assert not restarted_queue.enqueue(
+            "staff:1:SentUser", "SentUser", "Subject", "Body"
+        )
+        restarted_queue.dispatch()
+        assert redditors["SentUser"].message.call_count == 1
+        self._database.backend.truncate("outbound_message")  # Teardown
+
+
+def test_outcomes_are_persisted_during_a_round(tmp_path):
+    db_path = str(tmp_path / "db.json")
+    database = Database(db_path, max_pending_writes=100)
+    reddit, redditors = make_reddit({"Crash": SystemExit})
+    message_queue = OutboundMessageQueue(reddit, database, num_workers=1)
+    message_queue.enqueue("staff:1:SentUser", "SentUser", "Subject", "Body")
+    message_queue.enqueue("staff:1:Crash", "Crash", "Subject", "Body")
+
+    # The bot crashes in the middle of the round (without flushing the database)
+    with pytest.raises(SystemExit):
+        message_queue.dispatch()
+
+    # The message that was sent before the crash is not sent again after a restart
+    restarted_queue = OutboundMessageQueue(reddit, Database(db_path))
+    assert len(restarted_queue) == 2
+    assert restarted_queue.get("staff:1:SentUser")["status"] == MessageStatus.SENT.value
+    assert restarted_queue.get("staff:1:Crash")["status"] == MessageStatus.PENDING.value
@@ -0,0 +1,26 @@
+from hon_patch_notes_game_bot.migrate import main, migrate
+from hon_patch_notes_game_bot.storage import SQLiteBackend, TinyDBBackend
+
+
+def test_migrate(tmp_path):
+    source = TinyDBBackend(str(tmp_path / "db.json"))
+    source.upsert("user", {"name": "user1", "num_guesses": 1})
+    source.upsert("metadata", {"key": "winner_draw", "value": {"seed": "abc"}})
+    source.upsert("patch_notes_line_tracker", {"id": 5})
+    target = SQLiteBackend(str(tmp_path / "db.sqlite3"))
+
+    copied_counts = migrate(source, target)
+    assert copied_counts["user"] == 1
+    assert copied_counts["processed_comment"] == 0
+    assert target.get("user", "user1") == {"name": "user1", "num_guesses": 1}
+    assert target.get("metadata", "winner_draw")["value"] == {"seed": "abc"}
+
+    # Migrating again replaces the documents instead of duplicating them
+    migrate(source, target)
+    assert target.count("patch_notes_line_tracker") == 1
+    source.close()
+    target.close()
+
+
+def test_main_without_source(tmp_path):
+    assert main(["migrate.py", str(tmp_path / "missing.json")]) == 1
@@ -37,3 +37,20 @@ class TestPatchNotesFileHandler:
     def test_get_version_string(self):
         # Since the test file is static, we know it has 730 lines
         assert self._patch_notes_file.get_version_string() == "4.8.5"
+
+    def test_get_out_of_range_line_number(self):
+        assert self._patch_notes_file.get_content_from_line_number(0) is None
+        assert self._patch_notes_file.get_content_from_line_number(731) is None
+
+    def test_reload(self, tmp_path):
+        patch_notes_path = tmp_path / "patch_notes.txt"
+        patch_notes_path.write_text("Version 1.0.0\n\nFirst change")
+        patch_notes_file = PatchNotesFile(str(patch_notes_path))
+        assert patch_notes_file.get_total_line_count() == 3
+        assert patch_notes_file.get_content_from_line_number(3) == "First change\n"
+
+        patch_notes_path.write_text("Version 1.0.1\n-------\n")
+        patch_notes_file.reload()
+        assert patch_notes_file.get_total_line_count() == 2
+        assert patch_notes_file.get_version_string() == "1.0.1"
+        assert patch_notes_file.get_list_of_blank_line_numbers() == [2]
@@ -0,0 +1,39 @@
+from hon_patch_notes_game_bot.poll_interval import AdaptivePollInterval
+
+
+def test_backs_off_while_idle():
+    poll_interval = AdaptivePollInterval(
+        initial_seconds=10, min_seconds=2, max_seconds=60, backoff_factor=2
+    )
+    assert poll_interval.current_seconds == 10
+
+    assert poll_interval.record_pass(0) == 20
+    assert poll_interval.record_pass(0) == 40
+    assert poll_interval.record_pass(0) == 60  # Capped
+    assert poll_interval.record_pass(0) == 60
+    assert poll_interval.idle_passes == 4
+
+
+def test_shortens_while_busy():
+    poll_interval = AdaptivePollInterval(
+        initial_seconds=10, min_seconds=2, max_seconds=60, backoff_factor=2
+    )
+    assert poll_interval.record_pass(0) == 20
+    assert poll_interval.record_pass(5) == 2
+    assert poll_interval.record_pass(1) == 2
+    assert poll_interval.record_pass(0) == 4
+    assert poll_interval.busy_passes == 2
+
+
+def test_bounds():
+    # The initial interval is clamped between the minimum & maximum
+    assert AdaptivePollInterval(initial_seconds=1, min_seconds=2).current_seconds == 2
+    assert (
+        AdaptivePollInterval(initial_seconds=100, max_seconds=60).current_seconds == 60
+    )
+
+    # A backoff factor below 1 would shorten the interval while idle
+    poll_interval = AdaptivePollInterval(
+        initial_seconds=10, min_seconds=2, max_seconds=60, backoff_factor=0.5
+    )
+    assert poll_interval.record_pass(0) == 10
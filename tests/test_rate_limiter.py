@@ -0,0 +1,86 @@
+from hon_patch_notes_game_bot.rate_limiter import (
+    RateLimiter,
+    RequestPriority,
+    parse_rate_limit_seconds,
+)
+
+
+def get_rate_limiter(clock, requests_per_minute=60, burst_size=10):
+    return RateLimiter(
+        requests_per_minute=requests_per_minute,
+        burst_size=burst_size,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+# ============
+# Unit tests
+# ============
+
+
+def test_parse_rate_limit_seconds():
+    message = "Looks like you've been doing that a lot. Take a break for {} before trying again."
+    assert parse_rate_limit_seconds(message.format("4 minutes")) == 241
+    assert parse_rate_limit_seconds(message.format("47 seconds")) == 48
+    assert parse_rate_limit_seconds(message.format("4 minutes 47 seconds")) == 288
+    assert parse_rate_limit_seconds(message.format("1 minute")) == 61
+    assert parse_rate_limit_seconds("") is None
+
+
+def test_burst_then_paced(fake_clock):
+    rate_limiter = get_rate_limiter(fake_clock)
+
+    # The full burst is available immediately
+    for _ in range(10):
+        rate_limiter.acquire(RequestPriority.REPLY)
+    assert fake_clock.sleep_calls == []
+
+    # Afterwards, requests are paced at 1 request per second
+    rate_limiter.acquire(RequestPriority.REPLY)
+    assert sum(fake_clock.sleep_calls) == 1
+
+
+def test_low_priority_requests_leave_a_reserve(fake_clock):
+    rate_limiter = get_rate_limiter(fake_clock)
+
+    # Private messages cannot use the reserved half of the bucket
+    for _ in range(5):
+        assert rate_limiter.try_acquire(RequestPriority.PRIVATE_MESSAGE) == 0
+    assert rate_limiter.try_acquire(RequestPriority.PRIVATE_MESSAGE) > 0
+
+    # Replies can still use the reserve
+    for _ in range(5):
+        assert rate_limiter.try_acquire(RequestPriority.REPLY) == 0
+    assert rate_limiter.try_acquire(RequestPriority.REPLY) > 0
+
+
+def test_penalize(fake_clock):
+    rate_limiter = get_rate_limiter(fake_clock)
+    rate_limiter.penalize(240)
+    assert rate_limiter.try_acquire(RequestPriority.REPLY) == 240
+
+    rate_limiter.acquire(RequestPriority.REPLY)
+    assert sum(fake_clock.sleep_calls) >= 240
+
+
+def test_update_from_headers(fake_clock):
+    rate_limiter = get_rate_limiter(fake_clock, requests_per_minute=600)
+
+    # Remaining requests are spread over the rest of the window
+    rate_limiter.update_from_headers(
+        {"x-ratelimit-remaining": "100", "x-ratelimit-reset": "200"}
+    )
+    assert rate_limiter.rate_per_second == 0.5
+
+    # No remaining requests blocks until the window resets
+    rate_limiter.update_from_headers(
+        {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "30"}
+    )
+    assert rate_limiter.try_acquire(RequestPriority.REPLY) == 30
+
+    # Responses without rate limit headers are ignored
+    rate_limiter.update_from_headers({})
+    rate_limiter.update_from_headers(
+        {"x-ratelimit-remaining": "invalid", "x-ratelimit-reset": "30"}
+    )
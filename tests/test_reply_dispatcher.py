@@ -0,0 +1,64 @@
+import threading
+import time
+
+from hon_patch_notes_game_bot.reply_dispatcher import ReplyDispatcher
+
+# ============
+# Unit tests
+# ============
+
+
+def test_items_with_same_key_run_in_order():
+    dispatcher = ReplyDispatcher(num_workers=4)
+    results = []
+
+    def work_item(index):
+        # Earlier items sleep longer, so any reordering would be visible
+        time.sleep((10 - index) / 1000)
+        results.append(index)
+
+    for index in range(10):
+        dispatcher.submit(
+            key="comment_id", work_item=lambda index=index: work_item(index)
+        )
+
+    assert dispatcher.wait() == 10
+    assert results == list(range(10))
+    dispatcher.shutdown()
+
+
+def test_items_run_on_worker_threads():
+    dispatcher = ReplyDispatcher(num_workers=2)
+    thread_names = set()
+
+    for key in range(10):
+        dispatcher.submit(
+            key=key,
+            work_item=lambda: thread_names.add(threading.current_thread().name),
+        )
+    dispatcher.shutdown()
+
+    assert len(thread_names) == 2
+    assert threading.current_thread().name not in thread_names
+
+
+def test_failures_are_logged_and_do_not_stop_other_items():
+    dispatcher = ReplyDispatcher(num_workers=1)
+    results = []
+
+    def failing_work_item():
+        raise Exception("Reply failed")
+
+    dispatcher.submit(key="a", work_item=failing_work_item)
+    dispatcher.submit(key="a", work_item=lambda: results.append("sent"))
+    assert dispatcher.wait() == 2
+    assert results == ["sent"]
+    dispatcher.shutdown()
+
+
+def test_inline_dispatch():
+    dispatcher = ReplyDispatcher(num_workers=0)
+    results = []
+    dispatcher.submit(key="a", work_item=lambda: results.append("sent"))
+    assert results == ["sent"]
+    assert dispatcher.wait() == 0
@@ -0,0 +1,79 @@
+from unittest.mock import Mock, patch
+
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.reward_codes import (
+    REWARD_CODES_CURSOR_KEY,
+    RewardCodeAllocator,
+)
+
+
+def make_allocator(tmp_path, database: Database) -> RewardCodeAllocator:
+    reward_codes_path = tmp_path / "reward_codes.txt"
+    if not reward_codes_path.exists():
+        reward_codes_path.write_text("Code1\n\n  \nCode2\r\nCode3")
+    return RewardCodeAllocator(database, str(reward_codes_path))
+
+
+def test_assign(tmp_path):
+    database = Database(str(tmp_path / "db.json"))
+    allocator = make_allocator(tmp_path, database)
+
+    # Blank lines are skipped & a winner always gets the same code back
+    assert allocator.assign("User1") == "Code1"
+    assert allocator.assign("User2") == "Code2"
+    assert allocator.assign("User1") == "Code1"
+    assert allocator.get_assigned_code("User2") == "Code2"
+    assert allocator.get_assigned_code("User3") is None
+    assert allocator.assigned_count == 2
+
+    # Restart: the cursor & the assignments are reloaded from the database
+    database.flush()
+    database = Database(str(tmp_path / "db.json"))
+    allocator = make_allocator(tmp_path, database)
+    assert allocator.assign("User2") == "Code2"
+    assert allocator.assign("User3") == "Code3"
+
+    # No codes left
+    assert allocator.assign("User4") is None
+    assert allocator.get_assigned_code("User4") is None
+    assert database.get_reward_code_assignments() == {
+        "User1": "Code1",
+        "User2": "Code2",
+        "User3": "Code3",
+    }
+
+
+def test_assign_from_another_file(tmp_path):
+    database = Database(str(tmp_path / "db.json"))
+    database.set_metadata(
+        REWARD_CODES_CURSOR_KEY, {"path": "old_reward_codes.txt", "offset": 9001}
+    )
+    allocator = make_allocator(tmp_path, database)
+    assert allocator.assign("User1") == "Code1"
+
+    # A missing codes file has no codes
+    allocator.reward_codes_path = str(tmp_path / "missing_reward_codes.txt")
+    assert allocator.assign("User2") is None
+
+
+def test_cursor_is_written_before_the_assignment(tmp_path):
+    database = Database(str(tmp_path / "db.json"))
+    allocator = make_allocator(tmp_path, database)
+
+    # If only the first write is persisted, a code is skipped rather than handed out twice
+    writes = Mock()
+    with patch.object(
+        database, "set_metadata", wraps=database.set_metadata
+    ) as set_metadata, patch.object(
+        database,
+        "add_reward_code_assignment",
+        wraps=database.add_reward_code_assignment,
+    ) as add_reward_code_assignment:
+        writes.attach_mock(set_metadata, "set_metadata")
+        writes.attach_mock(add_reward_code_assignment, "add_reward_code_assignment")
+        assert allocator.assign("User1") == "Code1"
+
+    assert [name for name, _, _ in writes.mock_calls] == [
+        "set_metadata",
+        "add_reward_code_assignment",
+    ]
@@ -0,0 +1,157 @@
+import pytest
+
+from hon_patch_notes_game_bot import storage
+from hon_patch_notes_game_bot.database import Database
+from hon_patch_notes_game_bot.storage import (
+    SQLiteBackend,
+    StorageBackend,
+    TinyDBBackend,
+    create_storage_backend,
+)
+from hon_patch_notes_game_bot.user import RedditUser
+
+
+@pytest.fixture(params=["tinydb", "sqlite", "sqlite_without_upsert"])
+def backend(request, tmp_path, monkeypatch):
+    if request.param == "sqlite_without_upsert":
+        # SQLite versions older than 3.24
+        monkeypatch.setattr(storage, "SQLITE_SUPPORTS_UPSERT", False)
+    if request.param.startswith("sqlite"):
+        backend = SQLiteBackend(str(tmp_path / "db.sqlite3"))
+    else:
+        backend = TinyDBBackend(str(tmp_path / "db.json"))
+    yield backend
+    backend.close()
+
+
+def count_stored_documents(db_path, table_name):
+    backend = TinyDBBackend(db_path)
+    count = backend.count(table_name)
+    backend.close()
+    return count
+
+
+def test_keyed_operations(backend):
+    assert backend.get("user", "user1") is None
+    backend.upsert("user", {"name": "user1", "num_guesses": 1})
+    backend.upsert("user", {"name": "user2", "num_guesses": 2})
+    assert backend.get("user", "user1") == {"name": "user1", "num_guesses": 1}
+
+    # Upserting a document with an existing key replaces it instead of adding a duplicate
+    backend.upsert("user", {"name": "user1", "num_guesses": 3})
+    assert backend.get("user", "user1")["num_guesses"] == 3
+    assert backend.count("user") == 2
+    assert [document["name"] for document in backend.all("user")] == [
+        "user1",
+        "user2",
+    ]
+
+    assert backend.remove("user", "user1")
+    assert not backend.remove("user", "user1")
+    assert backend.get("user", "user1") is None
+
+    backend.truncate("user")
+    assert backend.count("user") == 0
+
+
+def test_upsert_replaces_the_document(backend):
+    backend.upsert("outbound_message", {"key": "a", "status": "failed", "error": "X"})
+    backend.upsert("outbound_message", {"key": "a", "status": "sent"})
+    assert backend.get("outbound_message", "a") == {"key": "a", "status": "sent"}
+    assert backend.all("outbound_message") == [{"key": "a", "status": "sent"}]
+
+
+def test_sqlite_transaction(tmp_path):
+    db_path = str(tmp_path / "db.sqlite3")
+    backend = SQLiteBackend(db_path)
+    with backend.transaction():
+        backend.upsert("processed_comment", {"id": "abc"})
+        with backend.transaction():
+            backend.upsert("patch_notes_line_tracker", {"id": 1})
+
+    with pytest.raises(RuntimeError):
+        with backend.transaction():
+            backend.upsert("processed_comment", {"id": "def"})
+            raise RuntimeError
+
+    assert backend.get("processed_comment", "abc") is not None
+    assert backend.get("processed_comment", "def") is None
+    backend.close()
+
+    # Committed writes are persisted
+    backend = SQLiteBackend(db_path)
+    assert backend.count("processed_comment") == 1
+    assert backend.get("patch_notes_line_tracker", 1) == {"id": 1}
+    backend.close()
+
+
+def test_tinydb_transaction(tmp_path):
+    db_path = str(tmp_path / "db.json")
+    backend = TinyDBBackend(db_path, max_pending_writes=1)
+    backend.upsert("user", {"name": "user1", "num_guesses": 1})
+    backend.upsert("user", {"name": "user2", "num_guesses": 2})
+
+    # The writes of a transaction are flushed together, when it ends
+    with backend.transaction():
+        backend.upsert("processed_comment", {"id": "abc"})
+        with backend.transaction():
+            backend.upsert("patch_notes_line_tracker", {"id": 1})
+        assert count_stored_documents(db_path, "processed_comment") == 0
+    assert count_stored_documents(db_path, "processed_comment") == 1
+
+    # The writes of a failed transaction are undone before they are flushed
+    with pytest.raises(RuntimeError):
+        with backend.transaction():
+            backend.upsert("user", {"name": "user1", "num_guesses": 3})
+            backend.upsert("user", {"name": "user3", "num_guesses": 1})
+            backend.remove("user", "user2")
+            backend.truncate("patch_notes_line_tracker")
+            raise RuntimeError
+
+    backend.close()
+    backend = TinyDBBackend(db_path)
+    assert backend.all("user") == [
+        {"name": "user1", "num_guesses": 1},
+        {"name": "user2", "num_guesses": 2},
+    ]
+    assert backend.get("patch_notes_line_tracker", 1) == {"id": 1}
+    backend.close()
+
+
+def test_database_with_sqlite_backend(tmp_path):
+    database = Database(
+        backend=SQLiteBackend(str(tmp_path / "db.sqlite3")), total_line_count=10
+    )
+    database.add_user(RedditUser("user1"))
+    database.add_patch_notes_line_number(5)
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.add_patch_notes_line_number(6)
+            database.add_processed_comment("abc")
+            raise RuntimeError
+
+    # The rolled back writes are not in the indexes either
+    assert database.user_exists("user1")
+    assert database.check_patch_notes_line_number(5)
+    assert not database.check_patch_notes_line_number(6)
+    assert not database.is_comment_processed("abc")
+    assert database.get_entry_count_in_patch_notes_line_tracker() == 1
+    database.close()
+
+
+def test_create_storage_backend(tmp_path):
+    backend = create_storage_backend("sqlite", str(tmp_path / "cache" / "db.sqlite3"))
+    assert isinstance(backend, SQLiteBackend)
+    backend.close()
+
+    with pytest.raises(ValueError):
+        create_storage_backend("mysql")
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class IncompleteBackend(StorageBackend):
+        def all(self, table_name):
+            return []
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
@@ -1,5 +1,5 @@
 import pytest
-from hon_patch_notes_game_bot.user import RedditUser
+from hon_patch_notes_game_bot.user import RedditUser, load_users
 
 
 @pytest.fixture
@@ -32,3 +32,42 @@ def test_user_is_potential_winner(reddit_user):
 
 def test_user_num_guesses(reddit_user):
     assert reddit_user.num_guesses == 0
+
+
+def test_user_num_correct_guesses(reddit_user):
+    assert reddit_user.num_correct_guesses == 0
+
+
+def test_user_is_slotted(reddit_user):
+    assert not hasattr(reddit_user, "__dict__")
+    with pytest.raises(AttributeError):
+        reddit_user.unknown_field = True
+
+
+def test_user_codec(reddit_user):
+    fields = reddit_user.to_dict()
+    assert fields == {
+        "name": "Test Name",
+        "can_submit_guess": True,
+        "is_potential_winner": False,
+        "num_guesses": 0,
+        "num_correct_guesses": 0,
+    }
+    assert RedditUser.from_dict(fields).to_dict() == fields
+
+    # Users saved before num_correct_guesses existed
+    del fields["num_correct_guesses"]
+    assert RedditUser.from_dict(fields).num_correct_guesses == 0
+
+
+def test_user_copy(reddit_user):
+    user_copy = reddit_user.copy()
+    user_copy.num_guesses += 1
+    assert reddit_user.num_guesses == 0
+    assert user_copy.to_dict()["name"] == reddit_user.name
+
+
+def test_load_users(reddit_user):
+    users = load_users([reddit_user.to_dict(), RedditUser("Other Name").to_dict()])
+    assert list(users) == ["Test Name", "Other Name"]
+    assert users["Other Name"].can_submit_guess
@@ -1,6 +1,7 @@
 import os
 import re
 import hon_patch_notes_game_bot.utils as util
+from hon_patch_notes_game_bot.line_classifier import LineClassificationTable
 
 # ============
 # Unit tests
@@ -34,6 +35,50 @@ def test_output_winners_list_to_file():
     )
     assert os.path.exists(output_file_path)
 
+    # The file is overwritten & always contains the full lists
+    potential_winners_list = [f"User{index}" for index in range(1000)]
+    submission_content = util.output_winners_list_to_file(
+        potential_winners_list=potential_winners_list,
+        winners_list=winners_list,
+        output_file_path=output_file_path,
+        max_submission_length=1000,
+    )
+    with open(output_file_path, "r") as output_file:
+        file_content = output_file.read()
+    assert file_content.count("## Winners") == 1
+    assert "User999\n" in file_content
+
+    # The submission content is truncated to fit
+    assert len(submission_content) <= 1000
+    assert submission_content.startswith(util.WINNERS_SUBMISSION_HEADER)
+    assert "## Winners\n\n```\na\nb\nc\n```" in submission_content
+    assert "User0\n" in submission_content
+    assert "User999\n" not in submission_content
+    assert "more not shown" in submission_content
+
+    # Teardown
+    util.output_winners_list_to_file(
+        potential_winners_list=["a", "b", "c", "d", "e"],
+        winners_list=winners_list,
+        output_file_path=output_file_path,
+    )
+
+
+def test_processed_submission_content(get_patch_notes_file):
+    line_classifications = LineClassificationTable(get_patch_notes_file)
+    submission_content = util.processed_submission_content(
+        "tests/config/submission_content.md",
+        get_patch_notes_file,
+        line_classifications,
+    )
+
+    # Every placeholder of the template is replaced
+    assert "`VALID_LINE_COUNT`" not in submission_content
+    assert "`INVALID_LINE_COUNT`" not in submission_content
+    assert f"{line_classifications.valid_line_count} lines have content" in (
+        submission_content
+    )
+
 
 def test_generate_submission_compiled_patch_notes_template_line():
     line_number = 123
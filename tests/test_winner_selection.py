@@ -0,0 +1,35 @@
+from hon_patch_notes_game_bot.winner_selection import draw_winners, get_draw_key
+
+
+def test_draw_winners():
+    candidates = [(f"User{index}", 1) for index in range(100)]
+    draw = draw_winners(iter(candidates), num_winners=10, seed="seed")
+    assert draw.seed == "seed"
+    assert draw.candidate_count == 100
+    assert len(set(draw.winners)) == 10
+
+    # The draw is reproducible from its seed, regardless of the order of the candidates
+    assert draw_winners(reversed(candidates), 10, "seed").winners == draw.winners
+    assert draw_winners(candidates, 10, "other seed").winners != draw.winners
+    assert draw.winners[0] == max(
+        (name for name, _ in candidates), key=lambda name: get_draw_key("seed", name)
+    )
+
+    # Random seed
+    assert draw_winners(candidates, 10).seed != draw_winners(candidates, 10).seed
+
+    # Every candidate wins if there are not enough candidates
+    assert sorted(draw_winners(candidates[:5], 10, "seed").winners) == [
+        name for name, _ in candidates[:5]
+    ]
+    assert draw_winners(candidates, 0, "seed").winners == []
+
+
+def test_draw_winners_weighted():
+    candidates = [("Heavy", 1000), ("Light", 1), ("Skipped", 0)]
+    heavy_win_count = sum(
+        draw_winners(candidates, 1, f"seed{index}").winners == ["Heavy"]
+        for index in range(100)
+    )
+    assert heavy_win_count > 90
+    assert draw_winners(candidates, 3, "seed").candidate_count == 2